@@ -1,7 +1,9 @@
 #!flask/bin/python
 from flask import Flask, request, jsonify
 from flask_restful import Resource, Api
+import click
 from cache import init_cache
+from helpers import init_db
 from resources import init_resource_endpoints
 from config import base_config
 import json as json
@@ -18,6 +20,7 @@ with application.app_context():
     application.config.from_object(base_config)
     init_api()
     init_cache()
+    init_db()
     init_resource_endpoints()
 
     @application.errorhandler(InvalidUsage)
@@ -26,6 +29,24 @@ with application.app_context():
         response.status_code = error.status_code
         return response
 
+# Pre-warm the hottest v4 cache keys, e.g. `FLASK_APP=app flask warm-cache --workers 4` after CACHE_INVALIDATE_HOUR.
+@application.cli.command('warm-cache')
+@click.option('--workers', default=4, help='Number of requests warmed concurrently.')
+@click.option('--year', default=None, help="Season to warm, defaults to the leaderboard's default season.")
+@click.option('--players/--no-players', default=True, help='Include active player pages.')
+def warm_cache_command(workers, year, players):
+    from cache.warmup import get_warmup_paths, warm_cache
+
+    paths = get_warmup_paths(year, players)
+    click.echo(f'Warming {len(paths)} requests with {workers} workers')
+    results = warm_cache(paths, workers, click.echo)
+
+    failed = [result for result in results if result[1] != 200]
+    slowest = sorted(results, key=lambda result: result[2], reverse=True)[:10]
+    click.echo(f'Warmed {len(results) - len(failed)}/{len(results)} requests in {sum(result[2] for result in results):.1f}s of query time')
+    for path, status, elapsed, timings, error in slowest:
+        click.echo(f'  slowest {1000 * elapsed:10.1f}ms {path}')
+
 if __name__ == '__main__':
     apiport = application.config.get('API_PORT')
     # db_connection = get_connection()
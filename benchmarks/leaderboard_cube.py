@@ -0,0 +1,143 @@
+##
+# Parity check for the v4 leaderboard cube (leaderboard/cube.py).
+# Builds the cube of --year in process and, for every tab of the pitch, pitcher and hitter leaderboards, compares the
+# frame it returns with the one the leaderboard SQL returns for a sample of date ranges: the full season, every month,
+# both halves and --ranges random arbitrary_start/arbitrary_end windows, each with and without a few split filters.
+# Mismatching columns are printed and the exit status is 1 if there are any, so run it after changing a statistic.
+# Requests the cube declines (it returns None and the leaderboard uses SQL) are only counted.
+#
+# Needs the usual PL_DB_* environment variables:
+#   python benchmarks/leaderboard_cube.py --year 2022 --ranges 10
+##
+import argparse
+import os
+import random
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import application
+from helpers import fetch_dataframe
+from leaderboard import LeaderboardCube
+from resources.leaderboard import Leaderboard
+
+DEFAULT_ARGS = {
+    'leaderboard': 'pitcher', 'tab': 'overview', 'handedness': 'NA', 'opponent_handedness': 'NA', 'league': 'NA',
+    'division': 'NA', 'team': 'NA', 'home_away': 'NA', 'year': '2022', 'month': 'NA', 'half': 'NA',
+    'arbitrary_start': 'NA', 'arbitrary_end': 'NA'
+}
+FILTERS = [
+    {},
+    {'handedness': 'R'},
+    {'opponent_handedness': 'L', 'home_away': 'Home'}
+]
+
+def get_leaderboard(args):
+    resource = Leaderboard()
+    resource.tab = args['tab']
+    resource.query_year = args['year']
+    resource.set_constants(args['year'])
+    resource.replace_constants()
+    return resource
+
+def get_ranges(cube, count, seed):
+    periods = cube.cubes['pitching'].periods
+    yield {}
+    for month in sorted(periods['month_played'], key=int):
+        yield {'month': month}
+    for half in ['First', 'Second']:
+        yield {'half': half}
+
+    first, last = cube.cubes['pitching'].first_day, cube.cubes['pitching'].last_day
+    generator = random.Random(seed)
+    for _ in range(count):
+        start, end = sorted(generator.randint(first, last) for _ in range(2))
+        yield {
+            'arbitrary_start': str(np.datetime64(start, 'D')),
+            'arbitrary_end': str(np.datetime64(end, 'D'))
+        }
+
+def get_requests(cube, year, count, seed):
+    resource = Leaderboard()
+    ranges = list(get_ranges(cube, count, seed))
+    for leaderboard in ['pitch', 'pitcher', 'hitter']:
+        for tab in resource.tab_display_fields[leaderboard]:
+            if (tab in ['games_overview_standard', 'projections']):
+                continue
+            for window in ranges:
+                for filters in FILTERS:
+                    yield {**DEFAULT_ARGS, 'leaderboard': leaderboard, 'tab': tab, 'year': year, **window, **filters}
+
+# Labels of the columns that differ between the two frames, matched up on the group columns
+def compare(cube_frame, sql_frame, keys):
+    if (len(cube_frame) != len(sql_frame) or list(cube_frame.columns) != list(sql_frame.columns)):
+        return ['<rows or columns>']
+
+    cube_frame = cube_frame.sort_values(keys).reset_index(drop=True)
+    sql_frame = sql_frame.sort_values(keys).reset_index(drop=True)
+
+    mismatches = list()
+    for label in cube_frame.columns:
+        left, right = cube_frame[label], sql_frame[label]
+        if (label in keys or not pd.api.types.is_numeric_dtype(left)):
+            equal = left.fillna('').astype(str).to_numpy() == right.fillna('').astype(str).to_numpy()
+        else:
+            left = left.to_numpy(dtype=float)
+            right = pd.to_numeric(right, errors='coerce').to_numpy(dtype=float)
+            equal = np.isclose(left, right, rtol=1e-12, atol=0, equal_nan=True)
+        if (not equal.all()):
+            mismatches.append(label)
+
+    return mismatches
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--year', default='2022')
+    parser.add_argument('--ranges', type=int, default=10, help='Random arbitrary date ranges to check')
+    parser.add_argument('--seed', type=int, default=0)
+    options = parser.parse_args()
+
+    with application.test_request_context('/v4/leaderboard'):
+        resource = get_leaderboard({**DEFAULT_ARGS, 'year': options.year})
+        start = time.perf_counter()
+        cube = LeaderboardCube(options.year, resource.data_version(), resource.get_cube_measures())
+        print(f'Cube built in {time.perf_counter() - start:.1f}s')
+
+        totals = {'cube': 0.0, 'sql': 0.0}
+        checked, declined, failed = 0, 0, 0
+        for args in get_requests(cube, options.year, options.ranges, options.seed):
+            query_type = args['leaderboard']
+            resource = get_leaderboard(args)
+            cols = resource.cols = resource.get_cols(**args)
+
+            start = time.perf_counter()
+            cube_frame = cube.get_leaderboard(query_type, cols, resource.get_conditions(**args), resource.get_query_params(**args))
+            elapsed = time.perf_counter() - start
+            if (cube_frame is None):
+                declined += 1
+                continue
+
+            start = time.perf_counter()
+            sql_frame = fetch_dataframe(*resource.get_query(query_type, **args))
+            totals['sql'] += time.perf_counter() - start
+            totals['cube'] += elapsed
+            checked += 1
+
+            keys = [label for label, sql in cols.items() if sql in cube.cubes['pitching' if query_type != 'hitter' else 'hitting'].cell_columns]
+            mismatches = compare(cube_frame, sql_frame, keys)
+            if (mismatches):
+                failed += 1
+                filters = {arg: value for arg, value in args.items() if value != 'NA' and arg not in ['leaderboard', 'tab', 'year']}
+                print(f"MISMATCH {query_type}/{args['tab']} {filters}: {', '.join(mismatches)}")
+
+    print(f'{checked} requests checked, {failed} mismatched, {declined} declined by the cube')
+    if (checked):
+        print(f"Per request: cube {1000 * totals['cube'] / checked:8.3f}ms   SQL {1000 * totals['sql'] / checked:8.3f}ms")
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
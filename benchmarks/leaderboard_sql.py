@@ -0,0 +1,108 @@
+##
+# Benchmark for the v4 leaderboard SQL compiler.
+# Compares, per request, the Python time spent building the SQL (cold compile vs shape cache hit) and the time
+# Postgres spends parsing and planning it when values are inlined (every filter combination is new text) vs when it
+# runs as a server-side prepared statement. Only EXPLAIN is run, the leaderboards themselves are not executed.
+#
+# Needs the usual PL_DB_* environment variables:
+#   python benchmarks/leaderboard_sql.py --repeat 20
+##
+import argparse
+import itertools
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import application
+from helpers import get_connection, get_prepared_statement
+from resources.leaderboard import Leaderboard
+
+DEFAULT_ARGS = {
+    'leaderboard': 'pitcher', 'tab': 'overview', 'handedness': 'NA', 'opponent_handedness': 'NA', 'league': 'NA',
+    'division': 'NA', 'team': 'NA', 'home_away': 'NA', 'year': '2022', 'month': 'NA', 'half': 'NA',
+    'arbitrary_start': 'NA', 'arbitrary_end': 'NA'
+}
+FILTERS = [
+    {},
+    {'handedness': 'R'},
+    {'handedness': 'L', 'home_away': 'Home'},
+    {'league': 'AL', 'division': 'East'},
+    {'month': '6'},
+    {'half': 'Second', 'opponent_handedness': 'L'}
+]
+planning_time = re.compile(r'Planning Time: ([0-9.]+) ms')
+
+def get_requests(year):
+    for leaderboard, tab, filters in itertools.product(['pitcher', 'pitch', 'hitter'], ['overview', 'standard', 'statcast'], FILTERS):
+        yield {**DEFAULT_ARGS, 'leaderboard': leaderboard, 'tab': tab, 'year': year, **filters}
+
+def get_leaderboard(args):
+    resource = Leaderboard()
+    resource.tab = args['tab']
+    resource.query_year = args['year']
+    resource.set_constants(args['year'])
+    resource.replace_constants()
+    return resource
+
+def explain(cursor, sql, params=None):
+    start = time.perf_counter()
+    cursor.execute(f'EXPLAIN (SUMMARY TRUE) {sql}', params)
+    elapsed = time.perf_counter() - start
+    plan = '\n'.join(row[0] for row in cursor.fetchall())
+    return float(planning_time.search(plan).group(1)), 1000 * elapsed
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--year', default='2022')
+    parser.add_argument('--repeat', type=int, default=10, help='Executions per request shape')
+    options = parser.parse_args()
+
+    totals = {'compile': 0.0, 'cached': 0.0, 'inline_plan': 0.0, 'inline_wall': 0.0, 'prepared_plan': 0.0, 'prepared_wall': 0.0}
+    count = 0
+
+    with application.test_request_context('/v4/leaderboard'):
+        connection = get_connection()
+        with connection.cursor() as cursor:
+            for args in get_requests(options.year):
+                resource = get_leaderboard(args)
+                query_type = args['leaderboard']
+
+                start = time.perf_counter()
+                query = resource.compile_query(query_type, resource.get_table(args), **args)
+                totals['compile'] += time.perf_counter() - start
+
+                resource.get_query(query_type, **args)
+                start = time.perf_counter()
+                query, params = resource.get_query(query_type, **args)
+                totals['cached'] += time.perf_counter() - start
+
+                name, text, names = get_prepared_statement(query)
+                cursor.execute('DEALLOCATE ALL')
+                cursor.execute(f'PREPARE {name} AS {text}')
+                execute = f"EXECUTE {name} ({', '.join(['%s'] * len(names))})" if names else f'EXECUTE {name}'
+                values = [params.get(param) for param in names]
+                inline = cursor.mogrify(query, params).decode('utf-8')
+
+                for _ in range(options.repeat):
+                    plan, wall = explain(cursor, inline)
+                    totals['inline_plan'] += plan
+                    totals['inline_wall'] += wall
+
+                    plan, wall = explain(cursor, execute, values)
+                    totals['prepared_plan'] += plan
+                    totals['prepared_wall'] += wall
+                    count += 1
+
+            cursor.execute('DEALLOCATE ALL')
+
+    shapes = count / options.repeat
+    print(f'{int(shapes)} request shapes x {options.repeat} executions')
+    print(f"SQL build per request:    compile {1000 * totals['compile'] / shapes:8.3f}ms   shape cache {1000 * totals['cached'] / shapes:8.3f}ms")
+    print(f"Planning per request:     inline  {totals['inline_plan'] / count:8.3f}ms   prepared    {totals['prepared_plan'] / count:8.3f}ms")
+    print(f"EXPLAIN round trip:       inline  {totals['inline_wall'] / count:8.3f}ms   prepared    {totals['prepared_wall'] / count:8.3f}ms")
+
+if __name__ == '__main__':
+    main()
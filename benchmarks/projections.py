@@ -0,0 +1,71 @@
+##
+# Benchmark for the v4 leaderboard projections tab.
+# Times the rate stat formatting (the old row by row iterrows loop vs Leaderboard.format_projections) on a synthetic
+# frame the size of a draft season projection set, then full /v4/leaderboard?tab=projections requests through the
+# test client with the cache bypassed vs served from the cache.
+#
+# The request timings need the usual PL_DB_* environment variables, --format-only skips them:
+#   python benchmarks/projections.py --rows 5000 --repeat 20
+##
+import argparse
+import os
+import random
+import sys
+import time
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from app import application
+from resources.leaderboard import Leaderboard
+
+def get_frame(lb_type, rows):
+    columns = Leaderboard.projection_formats[lb_type]
+    return pd.DataFrame({column: [Decimal(f'{random.uniform(0, 6):.4f}') for _ in range(rows)] for column in columns})
+
+# The formatting Leaderboard.get_lb_projections used to do
+def format_iterrows(df, lb_type):
+    for i, row in df.iterrows():
+        for column, decimals in Leaderboard.projection_formats[lb_type].items():
+            df.at[i, column] = f'{{:.{decimals}f}}'.format(row.get(column))
+    return df
+
+def time_call(call, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    return 1000 * (time.perf_counter() - start) / repeat
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000, help='Projection rows per leaderboard')
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--format-only', action='store_true', help='Skip the requests against the database')
+    options = parser.parse_args()
+
+    resource = Leaderboard()
+    for lb_type in ['pitcher', 'hitter']:
+        frame = get_frame(lb_type, options.rows)
+        loop = time_call(lambda: format_iterrows(frame.copy(), lb_type), options.repeat)
+        vectorized = time_call(lambda: resource.format_projections(frame.copy(), lb_type), options.repeat)
+        print(f'{lb_type:8} formatting {options.rows} rows:  iterrows {loop:9.3f}ms   vectorized {vectorized:9.3f}ms')
+
+    if (options.format_only):
+        return
+
+    client = application.test_client()
+    for lb_type in ['pitcher', 'hitter']:
+        path = f'/v4/leaderboard?leaderboard={lb_type}&tab=projections'
+
+        application.config['BYPASS_CACHE'] = True
+        uncached = time_call(lambda: client.get(path), options.repeat)
+
+        application.config['BYPASS_CACHE'] = False
+        client.get(path)
+        cached = time_call(lambda: client.get(path), options.repeat)
+        print(f'{lb_type:8} request:                  uncached {uncached:9.3f}ms   cached     {cached:9.3f}ms')
+
+if __name__ == '__main__':
+    main()
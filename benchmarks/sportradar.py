@@ -0,0 +1,94 @@
+##
+# Benchmark for the SportRadar client Roundup uses.
+# Starts the fake API from benchmarks/sportradar_server.py in process and times downloading a day's summary plus the
+# play-by-play feed of every game the old way (a new HTTPS connection per call, one game after the other) vs the
+# pooled keep-alive client fetching the feeds concurrently (helpers/sportradar.py), with an empty and a warm cache.
+# Then --users concurrent roundups share the upstream cache and the number of calls that reached the API is printed.
+# No API key or database needed:
+#   python benchmarks/sportradar.py --games 15 --latency 0.3 --repeat 3 --users 50
+#
+# Add --error-rate 0.1 to see the pooled client retry the failed requests.
+##
+import argparse
+import http.client
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import application
+from benchmarks.sportradar_server import get_parser, get_server
+from helpers import fetch_sportradar, fetch_sportradar_many
+
+SUMMARY = '/mlb/tracking/v7/en/games/2022/06/01/summary.json?api_key=benchmark'
+PLAY_BY_PLAY = '/mlb/tracking/v7/en/games/{}/pbp.json?api_key=benchmark'
+
+# What SportRadarEndpoints.retrieve_sport_radar_data used to do, over plain HTTP for the fake API
+def fetch_serial(host, port):
+    def fetch(endpoint):
+        conn = http.client.HTTPConnection(host, port)
+        conn.request('GET', endpoint)
+        data = json.loads(conn.getresponse().read().decode('utf-8'))
+        conn.close()
+        return data
+
+    summary = fetch(SUMMARY)
+    return {row['game']['id']: fetch(PLAY_BY_PLAY.format(row['game']['id'])) for row in summary['league']['games']}
+
+def fetch_pooled():
+    summary = fetch_sportradar(SUMMARY)
+    return fetch_sportradar_many({row['game']['id']: PLAY_BY_PLAY.format(row['game']['id']) for row in summary['league']['games']})
+
+def time_call(call, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    return 1000 * (time.perf_counter() - start) / repeat
+
+def main():
+    parser = get_parser()
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--workers', type=int, default=8, help='SPORTRADAR_WORKERS for the pooled client')
+    parser.add_argument('--users', type=int, default=50, help='Concurrent roundups sharing the cache')
+    options = parser.parse_args()
+
+    server = get_server(options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+
+    application.config['SPORTRADAR_URL'] = f'http://{host}:{port}'
+    application.config['SPORTRADAR_WORKERS'] = options.workers
+    with application.app_context():
+        if (options.error_rate == 0):
+            serial = time_call(lambda: fetch_serial(host, port), options.repeat)
+            print(f'{options.games} games, serial:  {serial:9.1f}ms')
+
+        def fetch_uncached():
+            application.cache.clear()
+            fetch_pooled()
+        pooled = time_call(fetch_uncached, options.repeat)
+        print(f'{options.games} games, pooled:  {pooled:9.1f}ms')
+
+        cached = time_call(fetch_pooled, options.repeat)
+        print(f'{options.games} games, cached:  {cached:9.1f}ms')
+
+    def fetch_user():
+        with application.app_context():
+            fetch_pooled()
+
+    application.cache.clear()
+    handler = server.RequestHandlerClass
+    handler.requests = 0
+    with ThreadPoolExecutor(max_workers=options.users) as users:
+        for future in [users.submit(fetch_user) for _ in range(options.users)]:
+            future.result()
+    print(f'{options.users} concurrent roundups: {handler.requests} upstream requests')
+
+    server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,111 @@
+##
+# Fake SportRadar API for running Roundup and benchmarks/sportradar.py offline.
+# Serves a daily summary with --games in progress games and a play-by-play feed per game with canned pitches, each
+# response delayed by --latency seconds. --error-rate answers that share of requests with a 503 to exercise the
+# client's retries. Responses carry an ETag and unchanged feeds are answered with a 304 when revalidated. Point the app
+# at it with SPORTRADAR_URL:
+#   python benchmarks/sportradar_server.py --port 8089 --games 15 --latency 0.3
+#   SPORTRADAR_URL=http://127.0.0.1:8089 flask run
+##
+import argparse
+import hashlib
+import json
+import random
+import re
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+
+def get_team(game, side):
+    return {
+        'id': f'{game}-{side}',
+        'abbr': f'{side[0].upper()}{game:02d}',
+        'starting_pitcher': {'id': f'{game}-{side}-sp', 'preferred_name': 'Pitcher', 'last_name': f'{side} {game}'},
+        'statistics': {'pitching': {'starters': {'ip_2': 5.1, 'er': 2, 'ktotal': 6, 'bb': 1, 'h': 4, 'pitch_count': 80}}},
+        'lineup': [{'position': 1, 'inning': 0, 'id': f'{game}-{side}-sp'}],
+        'players': []
+    }
+
+def get_summary(games):
+    return {'league': {'games': [{'game': {
+        'id': f'game-{game}',
+        'reference': str(600000 + game),
+        'scheduled': '2022-06-01T23:05:00+00:00',
+        'status': 'inprogress',
+        'outcome': {'current_inning': 5},
+        'home': get_team(game, 'home'),
+        'away': get_team(game, 'away')
+    }} for game in range(games)]}}
+
+def get_play_by_play(game, innings=9, at_bats=4, pitches=4):
+    def pitch(side, number):
+        return {
+            'type': 'pitch',
+            'pitcher': {'id': f'{game}-{side}-sp', 'pitch_speed': 94.1, 'pitch_type': 'FA'},
+            'flags': {'is_ab_over': number == pitches - 1},
+            'outcome_id': 'kKS'
+        }
+    def half(side, half_inning):
+        return {'half': half_inning, 'events': [
+            {'at_bat': {'description': 'Strikes out swinging.', 'events': [pitch(side, n) for n in range(pitches)]}}
+            for _ in range(at_bats)
+        ]}
+    return {'game': {'id': f'game-{int(game)}', 'status': 'inprogress', 'innings': [
+        {'number': number, 'halfs': [half('home', 'T'), half('away', 'B')]} for number in range(1, innings + 1)
+    ]}}
+
+def get_handler(options):
+    summary = json.dumps(get_summary(options.games)).encode('utf-8')
+
+    class SportRadarHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        requests = 0
+
+        def do_GET(self):
+            SportRadarHandler.requests += 1
+            time.sleep(options.latency)
+            if (random.random() < options.error_rate):
+                return self.send_body(503, b'{"message": "Service Unavailable"}')
+
+            play_by_play = re.search(r'/games/game-(\d+)/pbp\.json', self.path)
+            if (play_by_play):
+                return self.send_body(200, json.dumps(get_play_by_play(play_by_play.group(1))).encode('utf-8'))
+            if (re.search(r'/games/\d+/\d+/\d+/summary\.json', self.path)):
+                return self.send_body(200, summary)
+            self.send_body(404, b'{"message": "Not Found"}')
+
+        def send_body(self, status, body):
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if (status == 200 and self.headers.get('If-None-Match') == etag):
+                status, body = 304, b''
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return SportRadarHandler
+
+def get_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--games', type=int, default=15, help='Games in the daily summary')
+    parser.add_argument('--latency', type=float, default=0.3, help='Seconds before every response')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests answered with a 503')
+    return parser
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+def get_server(options):
+    return ThreadingHTTPServer((options.host, options.port), get_handler(options))
+
+if __name__ == '__main__':
+    options = get_parser().parse_args()
+    print(f'Serving a fake SportRadar API on http://{options.host}:{options.port}')
+    get_server(options).serve_forever()
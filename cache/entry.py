@@ -0,0 +1,42 @@
+from flask import current_app
+import time
+
+##
+# Cache entries carry a soft expiry next to the value.
+# The backend timeout is the hard TTL: fresh + stale seconds from CACHE_POLICIES. Once fresh_until has passed the
+# value is still served while a background refresh recomputes it (see refresh.py).
+##
+class CacheEntry():
+    def __init__(self, value, fresh_until):
+        self.value = value
+        self.fresh_until = fresh_until
+
+    def is_fresh(self):
+        return time.time() < self.fresh_until
+
+def get_lock_key(cache_key):
+    return f'{cache_key}-lock'
+
+# Policies are looked up by resource, the prefix of every cache key (e.g. `Player-stats-12345`).
+def get_cache_policy(cache_key):
+    policies = current_app.config.get('CACHE_POLICIES')
+    resource_type = cache_key.split('-', 1)[0]
+    return policies.get(resource_type, policies.get('default'))
+
+def get_cache_entry(cache_key):
+    entry = current_app.cache.get(cache_key)
+    if (entry is None or isinstance(entry, CacheEntry)):
+        return entry
+
+    # Values written before entries were introduced have no soft expiry.
+    return CacheEntry(entry, float('inf'))
+
+# timeout is the caller's freshness (or a function of the value returning it), used unless the policy sets its own.
+def set_cache_entry(cache_key, value, timeout):
+    if (callable(timeout)):
+        timeout = timeout(value)
+    policy = get_cache_policy(cache_key)
+    fresh = int(policy.get('fresh') or timeout)
+    stale = int(policy.get('stale') or 0)
+
+    current_app.cache.set(cache_key, CacheEntry(value, time.time() + fresh), fresh + stale)
@@ -0,0 +1,56 @@
+from flask import current_app, request, g, has_request_context
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+from .entry import get_lock_key, set_cache_entry
+import threading
+import os
+
+##
+# Background refresh of stale cache entries.
+# One executor per worker process, created lazily and keyed on the pid like the connection pools so a forked worker
+# never inherits its parent's threads. A refresh runs in a fresh copy of the request (or app) context that triggered
+# it and holds the key's lock so concurrent stale hits only schedule it once.
+##
+refresh_executors = dict()
+refresh_executors_lock = threading.Lock()
+
+def get_refresh_executor():
+    pid = os.getpid()
+
+    if (pid not in refresh_executors):
+        with refresh_executors_lock:
+            if (pid not in refresh_executors):
+                refresh_executors.clear()
+                refresh_executors[pid] = ThreadPoolExecutor(
+                    max_workers=int(current_app.config.get('CACHE_REFRESH_WORKERS')),
+                    thread_name_prefix='cache-refresh'
+                )
+
+    return refresh_executors[pid]
+
+def schedule_refresh(cache_key, fetch, timeout):
+    lock_key = get_lock_key(cache_key)
+    token = uuid4().hex
+    if (not current_app.cache.add(lock_key, token, timeout=int(current_app.config.get('CACHE_LOCK_TTL')))):
+        # Another request or worker is already refreshing this key.
+        return
+
+    app = current_app._get_current_object()
+    environ = dict(request.environ) if has_request_context() else None
+    get_refresh_executor().submit(refresh_cache, app, environ, cache_key, lock_key, token, fetch, timeout)
+
+def refresh_cache(app, environ, cache_key, lock_key, token, fetch, timeout):
+    context = app.request_context(environ) if environ else app.app_context()
+
+    with context:
+        try:
+            # Recompute stale keys the value is built from instead of reusing them, see singleflight.py
+            g.cache_no_stale = True
+            result = fetch()
+            if (result is not None):
+                set_cache_entry(cache_key, result, timeout)
+        except Exception:
+            app.logger.exception(f'Background refresh of {cache_key} failed')
+        finally:
+            if (app.cache.get(lock_key) == token):
+                app.cache.delete(lock_key)
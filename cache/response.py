@@ -0,0 +1,98 @@
+from flask import current_app, request, Response
+from flask_restful.representations.json import output_json
+from functools import wraps
+from urllib.parse import urlencode
+from .cache import cache_timeout, cache_invalidate_hour
+from .singleflight import fetch_cached
+import gzip
+
+# Brotli is optional, without it 'br' falls back to gzip.
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+##
+# Pre-serialized response cache.
+# When CACHE_SERIALIZED_RESPONSES is set, the JSON body a resource's get() produces is stored in the cache as bytes
+# (compressed with CACHE_RESPONSE_COMPRESSION, 'gzip' or 'br', if set). A hit is written straight into the response
+# without unpickling a dict and re-encoding it. Clients that do not accept the stored encoding get the decompressed
+# body. `version(resource)` returns a data version to key the body on, see version.py.
+##
+def cached_response(timeout=None, version=None):
+    def decorator(get):
+        @wraps(get)
+        def wrapper(self, *args, **kwargs):
+            if (current_app.config.get('BYPASS_CACHE') or not current_app.config.get('CACHE_SERIALIZED_RESPONSES') or request.content_length):
+                return get(self, *args, **kwargs)
+
+            passthrough = list()
+
+            def fetch():
+                result = get(self, *args, **kwargs)
+
+                # Only plain 200 payloads are cached, tuples with status codes and Response objects pass through.
+                if (isinstance(result, (tuple, Response))):
+                    passthrough.append(result)
+                    return None
+
+                return serialize_response(result)
+
+            cache_key = get_response_cache_key(self.__class__.__name__, version(self) if version else None)
+            cached = fetch_cached(cache_key, fetch, get_response_timeout(timeout))
+            if (passthrough):
+                return passthrough[0]
+
+            return make_cached_response(*cached)
+        return wrapper
+    return decorator
+
+# timeout is seconds, a callable returning seconds or None for the daily CACHE_INVALIDATE_HOUR rollover.
+def get_response_timeout(timeout):
+    if (callable(timeout)):
+        return timeout()
+    return timeout if timeout else cache_timeout(cache_invalidate_hour())
+
+def get_response_cache_key(resource_type, data_version=None):
+    query_string = urlencode(sorted(request.args.items(multi=True)))
+    if (data_version):
+        return f'{resource_type}-response-{data_version}-{request.path}?{query_string}'
+    return f'{resource_type}-response-{request.path}?{query_string}'
+
+def get_response_encoding():
+    encoding = current_app.config.get('CACHE_RESPONSE_COMPRESSION')
+    if (encoding == 'br' and brotli is None):
+        encoding = 'gzip'
+    return encoding if encoding in ['gzip', 'br'] else None
+
+# Encode with the same representation flask_restful would have used, returns (encoding, body)
+def serialize_response(data):
+    body = output_json(data, 200).get_data()
+    encoding = get_response_encoding()
+
+    if (encoding == 'gzip'):
+        body = gzip.compress(body, 6)
+    elif (encoding == 'br'):
+        body = brotli.compress(body, quality=5)
+
+    return (encoding, body)
+
+def decompress_response(encoding, body):
+    if (encoding == 'gzip'):
+        return gzip.decompress(body)
+    if (encoding == 'br'):
+        return brotli.decompress(body)
+    return body
+
+def make_cached_response(encoding, body):
+    if (encoding and encoding not in request.accept_encodings):
+        body = decompress_response(encoding, body)
+        encoding = None
+
+    response = Response(body, status=200, mimetype='application/json')
+    if (encoding):
+        response.headers['Content-Encoding'] = encoding
+    if (get_response_encoding()):
+        response.vary.add('Accept-Encoding')
+
+    return response
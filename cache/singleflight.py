@@ -0,0 +1,107 @@
+from flask import current_app, g
+from contextlib import contextmanager
+from uuid import uuid4
+from .entry import get_lock_key, get_cache_entry, set_cache_entry
+from .refresh import schedule_refresh
+import threading
+import time
+
+##
+# Single-flight cache fills.
+# On a miss only one caller computes a key: threads within a worker queue on an in-process lock and workers
+# coordinate through a lock key added to the shared cache (SETNX on redis). Everyone else polls for the value until
+# the lock holder finishes, gives up, or CACHE_LOCK_WAIT runs out, in which case they compute it themselves.
+# CACHE_LOCK_TTL bounds how long a crashed worker can hold a key.
+#
+# Stale entries (past their soft TTL, see entry.py) are returned immediately and refreshed in the background.
+# Background refreshes set g.cache_no_stale, under which stale entries count as misses: a refreshed value is stored
+# as fresh, so the keys it is built from have to be current too.
+# Setting g.cache_refresh recomputes every key the request touches (used by the warm-cache command), once per
+# run when g.cache_refreshed is a set shared by the run's requests. Fills are timed into g.cache_timings when it
+# exists.
+##
+local_locks = dict()
+local_locks_guard = threading.Lock()
+
+@contextmanager
+def local_lock(cache_key):
+    with local_locks_guard:
+        entry = local_locks.setdefault(cache_key, [threading.Lock(), 0])
+        entry[1] += 1
+
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with local_locks_guard:
+            entry[1] -= 1
+            if (entry[1] == 0):
+                del local_locks[cache_key]
+
+# Return the cached value for cache_key, calling fetch() exactly once cluster wide on a miss.
+# fetch() returning None is not cached. With allow_stale=False a stale entry is recomputed before returning.
+def fetch_cached(cache_key, fetch, timeout, allow_stale=True):
+    refresh = g.get('cache_refresh', False)
+    no_stale = g.get('cache_no_stale', False) or not allow_stale
+
+    entry = None if refresh else get_cache_entry(cache_key)
+    if (is_usable(entry, no_stale)):
+        if (not entry.is_fresh()):
+            schedule_refresh(cache_key, fetch, timeout)
+        return entry.value
+
+    with local_lock(cache_key):
+        # Keys shared by several warm-up requests are only recomputed by the first one
+        refreshed = g.get('cache_refreshed')
+        if (refresh and refreshed is not None):
+            refresh = cache_key not in refreshed
+            refreshed.add(cache_key)
+
+        entry = None if refresh else get_cache_entry(cache_key)
+        if (is_usable(entry, no_stale)):
+            return entry.value
+
+        lock_key = get_lock_key(cache_key)
+        token = uuid4().hex
+        if (current_app.cache.add(lock_key, token, timeout=int(current_app.config.get('CACHE_LOCK_TTL')))):
+            try:
+                return fill_cache(cache_key, fetch, timeout)
+            finally:
+                if (current_app.cache.get(lock_key) == token):
+                    current_app.cache.delete(lock_key)
+
+        result = wait_for_cache(cache_key, lock_key, no_stale)
+        if (result is not None):
+            return result
+
+        return fill_cache(cache_key, fetch, timeout)
+
+def is_usable(entry, no_stale):
+    return (entry is not None and (not no_stale or entry.is_fresh()))
+
+def fill_cache(cache_key, fetch, timeout):
+    start = time.perf_counter()
+    result = fetch()
+    if (result is not None):
+        set_cache_entry(cache_key, result, timeout)
+
+    if ('cache_timings' in g):
+        g.cache_timings.append((cache_key, time.perf_counter() - start))
+
+    return result
+
+def wait_for_cache(cache_key, lock_key, no_stale=False):
+    poll = float(current_app.config.get('CACHE_LOCK_POLL'))
+    deadline = time.monotonic() + float(current_app.config.get('CACHE_LOCK_WAIT'))
+
+    while (time.monotonic() < deadline):
+        time.sleep(poll)
+        entry = get_cache_entry(cache_key)
+        if (is_usable(entry, no_stale)):
+            return entry.value
+        # Lock released, either the value landed since the last read or the holder failed.
+        if (current_app.cache.get(lock_key) is None):
+            entry = get_cache_entry(cache_key)
+            return entry.value if is_usable(entry, no_stale) else None
+
+    return None
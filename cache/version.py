@@ -0,0 +1,36 @@
+from flask import current_app
+import threading
+import time
+
+##
+# Data versions for cache keys.
+# A data version is a short string that changes whenever the underlying tables are reloaded (e.g. the max
+# game_played plus the tables' write counters). Resources put it in their cache keys so entries can live until the
+# data changes instead of expiring on a fixed TTL. The version is read at most once per CACHE_DATA_VERSION_TTL
+# seconds across all workers (through the shared cache) and memoized per process in between.
+##
+data_versions = dict()
+data_versions_lock = threading.Lock()
+
+def get_data_version(name, fetch):
+    ttl = float(current_app.config.get('CACHE_DATA_VERSION_TTL'))
+    now = time.monotonic()
+
+    memo = data_versions.get(name)
+    if (memo is not None and now - memo[1] < ttl):
+        return memo[0]
+
+    with data_versions_lock:
+        memo = data_versions.get(name)
+        if (memo is not None and now - memo[1] < ttl):
+            return memo[0]
+
+        cache_key = f'DataVersion-{name}'
+        version = current_app.cache.get(cache_key)
+        if (version is None):
+            version = str(fetch())
+            current_app.cache.set(cache_key, version, max(1, int(ttl)))
+
+        data_versions[name] = (version, now)
+
+    return version
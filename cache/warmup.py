@@ -0,0 +1,82 @@
+from flask import current_app, g
+from concurrent.futures import ThreadPoolExecutor
+from helpers import fetch_dataframe
+from resources.leaderboard import Leaderboard
+import time
+
+##
+# Cache pre-warming.
+# Builds the hottest v4 requests and dispatches them through the app in-process with g.cache_refresh set, so every
+# cache key a request touches is recomputed and stored. Keys several requests share (e.g. a player's bio) are only
+# recomputed once per run, the set of them is passed in g.cache_refreshed. Run after the CACHE_INVALIDATE_HOUR rollover with
+# `flask warm-cache` (see app.py).
+#
+# The season defaults to the one the leaderboard serves without a `year` arg. Response keys include the raw query
+# string, so the leaderboards are warmed both with and without an explicit year.
+##
+WARMUP_PLAYER_QUERY_TYPES = ['bio', 'career', 'stats', 'gamelogs', 'ranks']
+WARMUP_LEADERBOARDS = ['pitcher', 'pitch', 'hitter']
+WARMUP_LEADERBOARD_TABS = ['overview', 'standard', 'statcast', 'batted_ball', 'batted_ball_2', 'approach', 'plate_discipline', 'projections']
+WARMUP_STANDINGS_QUERY_TYPES = ['division', 'league']
+
+def get_active_player_ids():
+    players = fetch_dataframe("SELECT mlb_player_id FROM players WHERE status = 'A' ORDER BY mlb_player_id")
+    return players['mlb_player_id'].astype(int).tolist()
+
+def get_default_year():
+    return Leaderboard.leaderboard_kwargs['year'].missing
+
+def get_warmup_paths(year=None, include_players=True):
+    year = year if year else get_default_year()
+    paths = list()
+
+    paths.append('/v4/league')
+    paths.append(f'/v4/league/averages/{year}')
+
+    for query_type in WARMUP_STANDINGS_QUERY_TYPES:
+        paths.append(f'/v4/standings/{query_type}')
+
+    # The default leaderboard, as requested by the front end
+    paths.append('/v4/leaderboard')
+    for leaderboard in WARMUP_LEADERBOARDS:
+        for tab in WARMUP_LEADERBOARD_TABS:
+            paths.append(f'/v4/leaderboard?leaderboard={leaderboard}&tab={tab}')
+            paths.append(f'/v4/leaderboard?leaderboard={leaderboard}&tab={tab}&year={year}')
+
+    if (include_players):
+        for player_id in get_active_player_ids():
+            for query_type in WARMUP_PLAYER_QUERY_TYPES:
+                paths.append(f'/v4/player/{query_type}/{player_id}')
+
+    return paths
+
+# Dispatch one warm-up request, returns (path, status, seconds, [(cache_key, seconds)], error)
+def warm_path(app, path, refreshed):
+    start = time.perf_counter()
+
+    with app.test_request_context(path):
+        g.cache_refresh = True
+        g.cache_refreshed = refreshed
+        g.cache_timings = list()
+        try:
+            response = app.full_dispatch_request()
+            status, error = response.status_code, None
+        except Exception as e:
+            status, error = 500, repr(e)
+
+        return (path, status, time.perf_counter() - start, g.cache_timings, error)
+
+def warm_cache(paths, workers=4, report=print):
+    app = current_app._get_current_object()
+    results = list()
+    refreshed = set()
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cache-warmup') as executor:
+        for result in executor.map(lambda path: warm_path(app, path, refreshed), paths):
+            path, status, elapsed, timings, error = result
+            report(f'{status} {1000 * elapsed:10.1f}ms {path}' + (f' {error}' if error else ''))
+            for cache_key, key_elapsed in timings:
+                report(f'    {1000 * key_elapsed:10.1f}ms {cache_key}')
+            results.append(result)
+
+    return results
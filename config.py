@@ -1,3 +1,4 @@
+import json
 import os
 
 class base_config():
@@ -8,7 +9,51 @@ class base_config():
     PL_DB_DATABASE_LEGACY = os.environ.get('PL_DB_DATABASE_LEGACY', 'pitcher-list')
     PL_DB_USER = os.environ.get('PL_DB_USER')
     PL_DB_PW = os.environ.get('PL_DB_PW')
+    PL_DB_POOL_MIN = os.environ.get('PL_DB_POOL_MIN', 1)
+    PL_DB_POOL_MAX = os.environ.get('PL_DB_POOL_MAX', 6)
+    PL_DB_POOL_TIMEOUT = os.environ.get('PL_DB_POOL_TIMEOUT', 10)
+    PL_DB_POOL_PING_AFTER = os.environ.get('PL_DB_POOL_PING_AFTER', 30)
     BYPASS_CACHE = os.environ.get('BYPASS_CACHE', False)
     CACHE_INVALIDATE_HOUR = os.environ.get('CACHE_INVALIDATE_HOUR', 10)
+    CACHE_SERIALIZED_RESPONSES = os.environ.get('CACHE_SERIALIZED_RESPONSES', False)
+    CACHE_RESPONSE_COMPRESSION = os.environ.get('CACHE_RESPONSE_COMPRESSION', '')
+    CACHE_LOCK_TTL = os.environ.get('CACHE_LOCK_TTL', 120)
+    CACHE_LOCK_WAIT = os.environ.get('CACHE_LOCK_WAIT', 60)
+    CACHE_LOCK_POLL = os.environ.get('CACHE_LOCK_POLL', 0.1)
+    CACHE_REFRESH_WORKERS = os.environ.get('CACHE_REFRESH_WORKERS', 2)
+    CACHE_DATA_VERSION_TTL = os.environ.get('CACHE_DATA_VERSION_TTL', 60)
+    DIMENSION_CACHE_TTL = os.environ.get('DIMENSION_CACHE_TTL', 3600)
+    PARALLEL_FETCH_WORKERS = os.environ.get('PARALLEL_FETCH_WORKERS', 4)
+    PARALLEL_FETCH_DEADLINE = os.environ.get('PARALLEL_FETCH_DEADLINE', 30)
+    SPORTRADAR_URL = os.environ.get('SPORTRADAR_URL', 'https://api.sportradar.us')
+    SPORTRADAR_WORKERS = os.environ.get('SPORTRADAR_WORKERS', 8)
+    SPORTRADAR_CONNECT_TIMEOUT = os.environ.get('SPORTRADAR_CONNECT_TIMEOUT', 5)
+    SPORTRADAR_TIMEOUT = os.environ.get('SPORTRADAR_TIMEOUT', 15)
+    SPORTRADAR_RETRIES = os.environ.get('SPORTRADAR_RETRIES', 3)
+    SPORTRADAR_BACKOFF = os.environ.get('SPORTRADAR_BACKOFF', 0.5)
+    SPORTRADAR_LIVE_TTL = os.environ.get('SPORTRADAR_LIVE_TTL', 5)
+    SPORTRADAR_SUMMARY_TTL = os.environ.get('SPORTRADAR_SUMMARY_TTL', 15)
+    SPORTRADAR_CLOSED_TTL = os.environ.get('SPORTRADAR_CLOSED_TTL', 86400)
+    ROUNDUP_INCREMENTAL_PBP = os.environ.get('ROUNDUP_INCREMENTAL_PBP', False)
+    LEADERBOARD_CACHE_TIMEOUT = os.environ.get('LEADERBOARD_CACHE_TIMEOUT', 86400)
+    LEADERBOARD_CONSTANTS_TTL = os.environ.get('LEADERBOARD_CONSTANTS_TTL', 3600)
+    LEADERBOARD_PREPARED_STATEMENTS = os.environ.get('LEADERBOARD_PREPARED_STATEMENTS', False)
+    LEADERBOARD_CUBE = os.environ.get('LEADERBOARD_CUBE', False)
+    LEADERBOARD_CUBE_YEAR = os.environ.get('LEADERBOARD_CUBE_YEAR')
+    # Seconds before a failed cube build is retried for the same data version
+    LEADERBOARD_CUBE_RETRY = os.environ.get('LEADERBOARD_CUBE_RETRY', 600)
+    # Per resource soft (`fresh`) and additional stale window (`stale`) in seconds. A `fresh` of None keeps the
+    # resource's own timeout. Overrides are merged in from a JSON object in CACHE_POLICIES.
+    CACHE_POLICIES = {
+        'default': {'fresh': None, 'stale': 3600},
+        'Player': {'fresh': None, 'stale': 21600},
+        'Team': {'fresh': None, 'stale': 21600},
+        'League': {'fresh': None, 'stale': 21600},
+        'Standings': {'fresh': None, 'stale': 3600},
+        'Leaderboard': {'fresh': None, 'stale': 1800},
+        'Roundup': {'fresh': None, 'stale': 120},
+        'SportRadar': {'fresh': None, 'stale': 120},
+        **json.loads(os.environ.get('CACHE_POLICIES', '{}'))
+    }
     REDIS_URL = os.environ.get('REDIS_URL', '')
     API_PORT = os.environ.get('API_PORT', '8080')
\ No newline at end of file
@@ -0,0 +1,12 @@
+##
+# Gunicorn settings, read from the working directory by `gunicorn wsgi` (see Procfile).
+# The app is imported once in the master and the workers are forked from it. Everything prefetched before the fork
+# (dimension tables, leaderboard constants) is shared copy-on-write instead of being loaded by every worker on boot.
+##
+preload_app = True
+
+def when_ready(server):
+    from app import application
+    from resources import prefetch_resources
+
+    prefetch_resources(application)
@@ -1,4 +1,9 @@
 from .metrics import *
 from .db import *
+from .parallel import *
 from .util import *
+from .sql import *
+from .dimensions import *
 from .teams import *
+from .constants import *
+from .sportradar import *
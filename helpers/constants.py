@@ -0,0 +1,45 @@
+from flask import current_app
+from helpers import fetch_dataframe
+import threading
+import time
+
+##
+# Per season estimator and league average constants used by the leaderboard SQL.
+# Process wide registry keyed by year. Entries are reloaded after LEADERBOARD_CONSTANTS_TTL seconds or as soon as the
+# caller's data version changes, and can be preloaded at startup for every supported season.
+##
+year_constants = dict()
+year_constants_lock = threading.Lock()
+
+def fetch_year_constants(year):
+    pitch_estimator = fetch_dataframe('select * from pitch_estimator_constants pec where year = %s', [year])
+    league_averages = fetch_dataframe('select * from mv_league_stats_averages mlsa where mlsa.year_played = %s and mlsa."position" = \'ALL\'', [year])
+
+    return {
+        'pitch_estimator': {field: str(value) for field, value in pitch_estimator.iloc[0].items()},
+        'league_averages': {field: str(value) for field, value in league_averages.iloc[0].items()}
+    }
+
+def get_year_constants(year, version=None):
+    key = str(year)
+    ttl = float(current_app.config.get('LEADERBOARD_CONSTANTS_TTL'))
+
+    entry = year_constants.get(key)
+    if (entry is not None and time.monotonic() - entry['loaded'] < ttl and entry['version'] == version):
+        return entry['constants']
+
+    with year_constants_lock:
+        entry = year_constants.get(key)
+        if (entry is None or time.monotonic() - entry['loaded'] >= ttl or entry['version'] != version):
+            entry = {'constants': fetch_year_constants(key), 'version': version, 'loaded': time.monotonic()}
+            year_constants[key] = entry
+
+    return entry['constants']
+
+def preload_year_constants(years, version=None):
+    for year in years:
+        try:
+            get_year_constants(year, version)
+        except (IndexError, KeyError):
+            # Season has no constants yet, it is loaded on first use instead.
+            continue
@@ -1,34 +1,238 @@
 from flask import g, current_app
+from psycopg2 import pool as pg_pool
 import psycopg2
+import psycopg2.errors
 import pandas as pd
+import hashlib
+import threading
+import re
+import time
+import os
 
-def get_connection(is_legacy = False):
-    if is_legacy:
-        if('legacy_db' not in g):
-            pl_host = current_app.config.get('PL_DB_HOST')
-            pl_db = current_app.config.get('PL_DB_DATABASE_LEGACY')
-            pl_user = current_app.config.get('PL_DB_USER')
-            pl_password = current_app.config.get('PL_DB_PW')
-            g.legacy_db = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-        return g.legacy_db
-    else:
-        if ('db' not in g):
-            pl_host = current_app.config.get('PL_DB_HOST')
-            pl_db = current_app.config.get('PL_DB_DATABASE')
-            pl_user = current_app.config.get('PL_DB_USER')
-            pl_password = current_app.config.get('PL_DB_PW')
-            g.db = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-        return g.db
+##
+# Process wide connection pools.
+# One bounded pool per database per gunicorn worker. Pools are created lazily on first checkout and are keyed on
+# the worker's pid so that a pool opened before a fork is never shared with a child process.
+##
+db_pools = dict()
+db_pools_lock = threading.Lock()
+
+class ConnectionPool():
+    def __init__(self, dbname, minconn, maxconn, checkout_timeout, ping_after):
+        self.dbname = dbname
+        self.maxconn = maxconn
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+        self.pid = os.getpid()
+        self.pool = pg_pool.ThreadedConnectionPool(
+            minconn,
+            maxconn,
+            host=current_app.config.get('PL_DB_HOST'),
+            port=5432,
+            dbname=dbname,
+            user=current_app.config.get('PL_DB_USER'),
+            password=current_app.config.get('PL_DB_PW')
+        )
+        # ThreadedConnectionPool raises as soon as it is exhausted, the semaphore makes callers queue instead.
+        self.slots = threading.BoundedSemaphore(maxconn)
+        self.stats_lock = threading.Lock()
+        self.last_used = dict()
+        # Names of the server-side prepared statements that exist on each connection.
+        self.prepared = dict()
+        self.in_use = 0
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.discarded = 0
+        self.checkout_time_total = 0.0
+        self.checkout_time_max = 0.0
+
+    def getconn(self):
+        start = time.perf_counter()
+
+        if (not self.slots.acquire(blocking=False)):
+            with self.stats_lock:
+                self.waits += 1
+            if (not self.slots.acquire(timeout=self.checkout_timeout)):
+                with self.stats_lock:
+                    self.timeouts += 1
+                raise pg_pool.PoolError(f'Timed out after {self.checkout_timeout}s waiting for a {self.dbname} connection')
+
+        try:
+            conn = self.pool.getconn()
+            if (not self.is_healthy(conn)):
+                self.last_used.pop(id(conn), None)
+                self.prepared.pop(id(conn), None)
+                self.pool.putconn(conn, close=True)
+                with self.stats_lock:
+                    self.discarded += 1
+                conn = self.pool.getconn()
+            if (not conn.autocommit):
+                conn.autocommit = True
+        except Exception:
+            self.slots.release()
+            raise
+
+        elapsed = time.perf_counter() - start
+        with self.stats_lock:
+            self.in_use += 1
+            self.checkouts += 1
+            self.checkout_time_total += elapsed
+            self.checkout_time_max = max(self.checkout_time_max, elapsed)
+
+        return conn
+
+    def putconn(self, conn):
+        try:
+            close = bool(conn.closed)
+            if (close):
+                self.last_used.pop(id(conn), None)
+                self.prepared.pop(id(conn), None)
+            else:
+                self.last_used[id(conn)] = time.monotonic()
+            self.pool.putconn(conn, close=close)
+        finally:
+            with self.stats_lock:
+                self.in_use -= 1
+            self.slots.release()
+
+    def get_prepared(self, conn):
+        return self.prepared.setdefault(id(conn), set())
+
+    # Connections idle for longer than ping_after seconds are pinged before being handed out.
+    def is_healthy(self, conn):
+        if (conn.closed):
+            return False
+
+        idle_since = self.last_used.get(id(conn))
+        if (idle_since is not None and (time.monotonic() - idle_since) < self.ping_after):
+            return True
+
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute('SELECT 1;')
+        except psycopg2.Error:
+            return False
+
+        return True
+
+    def stats(self):
+        with self.stats_lock:
+            return {
+                'database': self.dbname,
+                'pid': self.pid,
+                'max_size': self.maxconn,
+                'open': len(self.pool._pool) + len(self.pool._used),
+                'in_use': self.in_use,
+                'idle': len(self.pool._pool),
+                'checkouts': self.checkouts,
+                'waits': self.waits,
+                'timeouts': self.timeouts,
+                'discarded': self.discarded,
+                'checkout_ms_avg': round(1000 * self.checkout_time_total / self.checkouts, 3) if self.checkouts else 0,
+                'checkout_ms_max': round(1000 * self.checkout_time_max, 3)
+            }
+
+    def closeall(self):
+        self.pool.closeall()
+
+def get_database_name(is_legacy = False, database = None):
+    if (database):
+        return database
+    return current_app.config.get('PL_DB_DATABASE_LEGACY' if is_legacy else 'PL_DB_DATABASE')
+
+def get_pool(is_legacy = False, database = None):
+    dbname = get_database_name(is_legacy, database)
+    pid = os.getpid()
+    key = (pid, dbname)
+
+    if (key not in db_pools):
+        with db_pools_lock:
+            if (key not in db_pools):
+                # Drop anything inherited from a parent process without closing the parent's sockets.
+                for stale_key in [k for k in db_pools if k[0] != pid]:
+                    del db_pools[stale_key]
+
+                db_pools[key] = ConnectionPool(
+                    dbname,
+                    int(current_app.config.get('PL_DB_POOL_MIN')),
+                    int(current_app.config.get('PL_DB_POOL_MAX')),
+                    float(current_app.config.get('PL_DB_POOL_TIMEOUT')),
+                    float(current_app.config.get('PL_DB_POOL_PING_AFTER'))
+                )
+
+    return db_pools[key]
+
+def get_pool_stats():
+    pid = os.getpid()
+    return [pool.stats() for key, pool in list(db_pools.items()) if key[0] == pid]
+
+# Close this process' pools, e.g. in the gunicorn master before it forks the workers
+def close_pools():
+    pid = os.getpid()
+    with db_pools_lock:
+        for key in [key for key in db_pools if key[0] == pid]:
+            db_pools.pop(key).closeall()
+
+# Check out a pooled connection for the lifetime of the current app context.
+# `database` names a database other than pl7/legacy on the same host (e.g. baseballsavant).
+def get_connection(is_legacy = False, database = None):
+    dbname = get_database_name(is_legacy, database)
+
+    if ('db_connections' not in g):
+        g.db_connections = dict()
+
+    if (dbname not in g.db_connections):
+        conn = get_pool(database=dbname).getconn()
+        g.db_connections[dbname] = conn
+        # Contexts with a deadline (parallel fetch tasks, see parallel.py) have Postgres cancel their queries once it
+        # passes, so an abandoned task does not hold on to its connection
+        if ('statement_deadline' in g):
+            set_statement_timeout(conn, g.statement_deadline)
+
+    return g.db_connections[dbname]
+
+def set_statement_timeout(conn, deadline):
+    timeout = max(1, int(1000 * (deadline - time.monotonic())))
+    with conn.cursor() as cursor:
+        cursor.execute('SET statement_timeout = %s', [timeout])
+
+# Return any connections checked out by this app context to their pools.
+def release_connections(exception=None):
+    connections = g.pop('db_connections', dict())
+    for dbname, conn in connections.items():
+        if ('statement_deadline' in g and not conn.closed):
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute('RESET statement_timeout')
+            except psycopg2.Error:
+                pass
+        get_pool(database=dbname).putconn(conn)
+
+def init_db():
+    current_app.teardown_appcontext(release_connections)
+
+    # A request with parallel fetches holds its own connection plus one per parallel task
+    workers = int(current_app.config.get('PARALLEL_FETCH_WORKERS'))
+    if (int(current_app.config.get('PL_DB_POOL_MAX')) < workers + 1):
+        current_app.logger.warning(f'PL_DB_POOL_MAX should be at least PARALLEL_FETCH_WORKERS + 1 ({workers + 1}), parallel fetches will queue for connections')
 
 # Fetch a raw Pandas DataFrame object from the DB for a given SQL query.
-def fetch_dataframe(query, query_var=None, is_legacy=False):
-    db_connection = get_connection(is_legacy)
+# query_var is a list of positional or a dict of named parameters. With prepare=True (named parameters only) the query
+# runs as a server-side prepared statement on the pooled connection so Postgres parses and plans it once.
+def fetch_dataframe(query, query_var=None, is_legacy=False, database=None, prepare=False):
+    if (prepare and type(query_var) is dict):
+        return fetch_prepared_dataframe(query, query_var, is_legacy, database)
+
+    db_connection = get_connection(is_legacy, database)
 
     # Manage cursor conext and ensure cursor closes after leaving context but allow connection to remain open.
     with db_connection.cursor() as cursor:
-    
+
         cursor_list = list()
-        if (query_var):
+        if (type(query_var) is dict):
+            cursor_list = query_var
+        elif (query_var):
             if (type(query_var) is list):
                 cursor_list.extend(query_var)
             else:
@@ -46,3 +250,59 @@ def fetch_dataframe(query, query_var=None, is_legacy=False):
         cursor.close()
         return result
 
+##
+# Server-side prepared statements.
+# A query written with %(name)s placeholders is converted once to PREPARE syntax ($1, $2, ...) and named after a hash
+# of its text. Statements are prepared lazily on each pooled connection and re-prepared if Postgres dropped or
+# invalidated them (e.g. after a table the statement reads was replaced by the nightly load).
+##
+prepared_statements = dict()
+named_parameter = re.compile(r'%\((\w+)\)s|%%')
+
+def get_prepared_statement(query):
+    statement = prepared_statements.get(query)
+    if (statement is None):
+        names = list()
+
+        def number(match):
+            if (match.group(0) == '%%'):
+                return '%'
+            if (match.group(1) not in names):
+                names.append(match.group(1))
+            return f'${names.index(match.group(1)) + 1}'
+
+        text = named_parameter.sub(number, query)
+        name = 'pl_' + hashlib.sha1(query.encode('utf-8')).hexdigest()[:20]
+        statement = prepared_statements[query] = (name, text, names)
+
+    return statement
+
+def fetch_prepared_dataframe(query, query_var, is_legacy=False, database=None):
+    dbname = get_database_name(is_legacy, database)
+    db_connection = get_connection(is_legacy, database)
+    prepared = get_pool(database=dbname).get_prepared(db_connection)
+    name, text, names = get_prepared_statement(query)
+
+    execute = f"EXECUTE {name} ({', '.join(['%s'] * len(names))})" if names else f'EXECUTE {name}'
+    values = [query_var.get(param) for param in names]
+
+    with db_connection.cursor() as cursor:
+        if (name not in prepared):
+            cursor.execute(f'PREPARE {name} AS {text}')
+            prepared.add(name)
+
+        try:
+            cursor.execute(execute, values)
+        except (psycopg2.errors.InvalidSqlStatementName, psycopg2.errors.FeatureNotSupported):
+            prepared.discard(name)
+            try:
+                cursor.execute(f'DEALLOCATE {name}')
+            except psycopg2.Error:
+                pass
+            cursor.execute(f'PREPARE {name} AS {text}')
+            prepared.add(name)
+            cursor.execute(execute, values)
+
+        rows = cursor.fetchall()
+        colnames = [desc[0] for desc in cursor.description]
+        return pd.DataFrame(rows, columns=colnames)
@@ -0,0 +1,117 @@
+from flask import current_app
+from cache import get_data_version
+from helpers import fetch_dataframe
+import pandas as pd
+import numpy as np
+import threading
+import time
+
+##
+# In-memory players/teams dimension tables.
+# Every worker keeps one snapshot of the players and teams tables as hash indexed arrays so resources can join team
+# info onto a result (or map SportRadar ids to MLB ids) with a vectorized lookup instead of a query and a merge. The
+# snapshot is reloaded after DIMENSION_CACHE_TTL seconds or as soon as the tables' write counters change (checked
+# at most every CACHE_DATA_VERSION_TTL seconds, see cache/version.py).
+##
+dimension_tables = dict()
+dimension_tables_lock = threading.Lock()
+
+dimension_version_query = """select concat(sum(n_tup_ins), '.', sum(n_tup_upd), '.', sum(n_tup_del)) as version
+                             from pg_stat_user_tables where relname in ('players', 'teams')"""
+
+class DimensionTables():
+    def __init__(self, players, teams, version):
+        self.version = version
+        self.loaded = time.monotonic()
+        self.teams = teams
+
+        players = players.drop_duplicates(subset=['mlb_player_id'])
+        self.mlb_player_ids = pd.Index(players['mlb_player_id'])
+
+        sportradar = players.dropna(subset=['sportradar_player_id']).drop_duplicates(subset=['sportradar_player_id'])
+        self.sportradar_player_ids = pd.Index(sportradar['sportradar_player_id'])
+        self.sportradar_mlb_player_ids = sportradar['mlb_player_id'].to_numpy()
+        self.sportradar_lookup = dict(zip(sportradar['sportradar_player_id'], sportradar['mlb_player_id'].tolist()))
+        self.sportradar_misses = set()
+
+        # Position of each player's current team in self.teams, -1 for players without a (known) team.
+        # The trailing NaN makes position -1 read as missing.
+        self.player_teams = pd.Index(teams['team_id']).get_indexer(players['current_team_id'])
+        self.team_abbreviations = np.append(teams['abbreviation'].to_numpy(dtype=object), np.nan)
+        self.team_names = np.append(teams['team_name'].to_numpy(dtype=object), np.nan)
+
+    def is_expired(self, version):
+        return (self.version != version or time.monotonic() - self.loaded >= float(current_app.config.get('DIMENSION_CACHE_TTL')))
+
+    # Positions of the players' current teams, -1 where the player or team is unknown
+    def get_team_positions(self, mlb_player_ids):
+        players = self.mlb_player_ids.get_indexer(mlb_player_ids)
+        return np.where(players >= 0, np.append(self.player_teams, -1)[players], -1)
+
+    def get_mlb_player_ids(self, sportradar_player_ids):
+        positions = self.sportradar_player_ids.get_indexer(sportradar_player_ids)
+        return np.where(positions >= 0, np.append(self.sportradar_mlb_player_ids, None)[positions], None)
+
+    # Single player fallback for SportRadar ids added to players after the snapshot was loaded (e.g. a new call up).
+    # Hits are added to the lookup and misses remembered, so every id is queried at most once per snapshot.
+    def find_mlb_player_id(self, sportradar_player_id):
+        if (sportradar_player_id in self.sportradar_lookup):
+            return self.sportradar_lookup[sportradar_player_id]
+        if (sportradar_player_id in self.sportradar_misses):
+            return None
+
+        players = fetch_dataframe('select mlb_player_id from players where sportradar_player_id = %s limit 1', [sportradar_player_id])
+        if (len(players) == 0):
+            self.sportradar_misses.add(sportradar_player_id)
+            return None
+
+        mlb_player_id = players['mlb_player_id'].tolist()[0]
+        self.sportradar_lookup[sportradar_player_id] = mlb_player_id
+        return mlb_player_id
+
+def fetch_dimension_tables(version):
+    players = fetch_dataframe('select mlb_player_id, sportradar_player_id, current_team_id from players')
+    teams = fetch_dataframe('select team_id, abbreviation, team_name, mlb_team_id, league, division from teams')
+
+    return DimensionTables(players, teams, version)
+
+def get_dimension_tables():
+    version = get_data_version('Dimensions', lambda: fetch_dataframe(dimension_version_query)['version'][0])
+
+    tables = dimension_tables.get('tables')
+    if (tables is not None and not tables.is_expired(version)):
+        return tables
+
+    with dimension_tables_lock:
+        tables = dimension_tables.get('tables')
+        if (tables is None or tables.is_expired(version)):
+            tables = dimension_tables['tables'] = fetch_dimension_tables(version)
+
+    return tables
+
+# Add player_team_abb, player_team and mlb_player_id for the players' current teams, the same columns (and NaN for
+# players without a team) a left merge against players join teams produced.
+def join_player_teams(frame, on='player_id'):
+    tables = get_dimension_tables()
+    player_ids = frame[on].to_numpy()
+    teams = tables.get_team_positions(player_ids)
+    found = teams >= 0
+
+    frame = frame.copy()
+    frame['player_team_abb'] = tables.team_abbreviations[teams]
+    frame['player_team'] = tables.team_names[teams]
+    frame['mlb_player_id'] = player_ids if found.all() else np.where(found, player_ids, np.nan)
+
+    return frame
+
+# Map SportRadar player ids to MLB player ids, None where unknown
+def get_mlb_player_ids(sportradar_player_ids):
+    return get_dimension_tables().get_mlb_player_ids(sportradar_player_ids)
+
+# SportRadar player id -> MLB player id for every player in the snapshot
+def get_sportradar_player_lookup():
+    return get_dimension_tables().sportradar_lookup
+
+# MLB player id of one SportRadar player, querying players for ids the snapshot does not know yet
+def find_mlb_player_id(sportradar_player_id):
+    return get_dimension_tables().find_mlb_player_id(sportradar_player_id)
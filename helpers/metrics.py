@@ -1,571 +1,467 @@
 import pandas as pd
 import numpy as np
-import math
+
+##
+# Array aware division shared by every metric below.
+# Inputs may be scalars, NumPy arrays or pandas Series (including object columns of Decimal/None from psycopg2).
+# A zero denominator gives NaN and NaN inputs propagate. Scalars come back as float, arrays as ndarray and Series
+# as a Series on the input's index.
+##
+def as_values(value):
+    if isinstance(value, pd.Series):
+        return pd.to_numeric(value, errors='coerce').to_numpy(dtype=float)
+    return np.asarray(value, dtype=float)
+
+
+def ratio(numerator, denominator, scale=1, guard=None, like=None):
+    num = as_values(numerator)
+    den = as_values(denominator)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = num / den if scale == 1 else scale * (num / den)
+
+    undefined = (den == 0)
+    if guard is not None:
+        guard_values = as_values(guard)
+        undefined = undefined | (guard_values == 0) | np.isnan(guard_values)
+
+    result = np.where(undefined, np.nan, result)
+
+    for value in (like, numerator, denominator):
+        if isinstance(value, pd.Series):
+            return pd.Series(result, index=value.index)
+
+    if np.ndim(result) == 0:
+        return float(result)
+
+    return result
+
 
 
 # Advanced Tab
 def velocity(num_velocity, total_velocity):
-
-    if num_velocity == 0 or math.isnan(num_velocity):
-        return float('NaN')
-    elif math.isnan(total_velocity):
-        return float('NaN')
-    else:
-        return total_velocity / num_velocity
+    return ratio(total_velocity, num_velocity)
 
 
 def barrelpercentage(num_barrel, num_bbe):
-
-    if num_bbe == 0 or math.isnan(num_bbe):
-        return float('NaN')
-    elif math.isnan(num_barrel):
-        return float('NaN')
-    else:
-        return 100 * (num_barrel / num_bbe)
+    return ratio(num_barrel, num_bbe, 100)
 
 
 def foulpercentage(num_foul, num_pitches):
-
-    if num_pitches == 0:
-        return float('NaN')
-    else:
-        return 100 * (num_foul / num_pitches)
+    return ratio(num_foul, num_pitches, 100)
 
 
 def pluspercentage(num_plus, num_pitches):
-
-    if num_pitches == 0:
-        return float('NaN')
-    else:
-        return 100 * (num_plus / num_pitches)
+    return ratio(num_plus, num_pitches, 100)
 
 
 def firstpitchswingpercentage(num_first_pitch_swing, num_ab):
-
-    if num_ab == 0 or math.isnan(num_ab):
-        return float('NaN')
-    else:
-        return 100 * (num_first_pitch_swing / num_ab)
+    return ratio(num_first_pitch_swing, num_ab, 100)
 
 
 def earlyocontactpercentage(num_early_o_contact, num_o_contact):
-
-    if num_o_contact == 0 or math.isnan(num_o_contact):
-        return float('NaN')
-    else:
-        return 100 * (num_early_o_contact / num_o_contact)
+    return ratio(num_early_o_contact, num_o_contact, 100)
 
 
 def lateocontactpercentage(num_late_o_contact, num_o_contact):
-
-    if num_o_contact == 0 or math.isnan(num_o_contact):
-        return float('NaN')
-    else:
-        return 100 * (num_late_o_contact / num_o_contact)
+    return ratio(num_late_o_contact, num_o_contact, 100)
 
 
 def launchspeed(num_launch_speed, total_launch_speed):
-
-    if num_launch_speed == 0 or math.isnan(num_launch_speed):
-        return float('NaN')
-    elif math.isnan(total_launch_speed):
-        return float('NaN')
-    else:
-        return total_launch_speed / float(num_launch_speed)
+    return ratio(total_launch_speed, num_launch_speed)
 
 
 def launchangle(num_launch_angle, total_launch_angle):
-
-    if num_launch_angle == 0 or math.isnan(num_launch_angle):
-        return float('NaN')
-    elif math.isnan(total_launch_angle):
-        return float('NaN')
-    else:
-        return total_launch_angle / float(num_launch_angle)
+    return ratio(total_launch_angle, num_launch_angle)
 
 
 def releaseextension(num_release_extension, total_release_extension):
-
-    if num_release_extension == 0 or math.isnan(num_release_extension):
-        return float('NaN')
-    elif math.isnan(total_release_extension):
-        return float('NaN')
-    else:
-        return total_release_extension / float(num_release_extension)
+    return ratio(total_release_extension, num_release_extension)
 
 
 def spinrate(num_spin_rate, total_spin_rate):
-
-    if num_spin_rate == 0 or math.isnan(num_spin_rate):
-        return float('NaN')
-    elif math.isnan(total_spin_rate):
-        return float('NaN')
-    else:
-        return total_spin_rate / float(num_spin_rate)
+    return ratio(total_spin_rate, num_spin_rate)
 
 
 def xmovement(num_x_movement, total_x_movement):
-
-    if num_x_movement == 0 or math.isnan(num_x_movement):
-        return float('NaN')
-    elif math.isnan(total_x_movement):
-        return float('NaN')
-    else:
-        return total_x_movement / float(num_x_movement)
+    return ratio(total_x_movement, num_x_movement)
 
 
 def zmovement(num_z_movement, total_z_movement):
-
-    if num_z_movement == 0 or math.isnan(num_z_movement):
-        return float('NaN')
-    elif math.isnan(total_z_movement):
-        return float('NaN')
-    else:
-        return total_z_movement / float(num_z_movement)
+    return ratio(total_z_movement, num_z_movement)
 
 
 
 # Approach Tab
 def armsidepercentage(num_armside, num_pitches):
-
-    if num_pitches == 0 or math.isnan(num_pitches):
-        return float('NaN')
-    else:
-        return 100 * (num_armside / num_pitches)
+    return ratio(num_armside, num_pitches, 100)
 
 
 def glovesidepercentage(num_gloveside, num_pitches):
-    if num_pitches == 0 or math.isnan(num_pitches):
-        return float('NaN')
-    else:
-        return 100 * (num_gloveside / num_pitches)
+    return ratio(num_gloveside, num_pitches, 100)
 
 
 def insidepercentage(num_inside, num_pitches):
-    if num_pitches == 0 or math.isnan(num_pitches):
-        return float('NaN')
-    else:
-        return 100 * (num_inside / num_pitches)
+    return ratio(num_inside, num_pitches, 100)
 
 
 def outsidepercentage(num_outside, num_pitches):
-
-    if num_pitches == 0 or math.isnan(num_pitches):
-         return float('NaN')
-    else:
-        return 100 * (num_outside / num_pitches)
+    return ratio(num_outside, num_pitches, 100)
 
 
 def highlocpercentage(num_highloc, num_pitches):
-
-    if num_pitches == 0 or math.isnan(num_pitches):
-         return float('NaN')
-    else:
-        return 100 * (num_highloc / num_pitches)
+    return ratio(num_highloc, num_pitches, 100)
 
 def hmidlocpercentage(num_hmiddle, num_pitches):
-
-    if num_pitches == 0 or math.isnan(num_pitches):
-        return float('NaN')
-    else:
-        return 100 * (num_hmiddle / num_pitches)
+    return ratio(num_hmiddle, num_pitches, 100)
 
 
 def vmidlocpercentage(num_vmidloc, num_pitches):
-
-    if num_pitches == 0 or math.isnan(num_pitches):
-        return float('NaN')
-    else:
-        return 100 * (num_vmidloc / num_pitches)
+    return ratio(num_vmidloc, num_pitches, 100)
 
 
 def lowlocpercentage(num_lowloc, num_pitches):
-
-    if num_pitches == 0 or math.isnan(num_pitches):
-         return float('NaN')
-    else:
-        return 100 * (num_lowloc / num_pitches)
+    return ratio(num_lowloc, num_pitches, 100)
 
 
 def heartpercentage(num_heart, num_pitches):
-
-    if num_pitches == 0 or math.isnan(num_pitches):
-         return float('NaN')
-    else:
-        return 100 * (num_heart / num_pitches)
+    return ratio(num_heart, num_pitches, 100)
 
 
 def earlypercentage(num_early, num_pitches):
-
-    if num_pitches == 0 or math.isnan(num_pitches):
-         return float('NaN')
-    else:
-        return 100 * (num_early / num_pitches)
+    return ratio(num_early, num_pitches, 100)
 
 
 def behindpercentage(num_behind, num_pitches):
-
-    if num_pitches == 0 or math.isnan(num_pitches):
-         return float('NaN')
-    else:
-        return 100 * (num_behind / num_pitches)
+    return ratio(num_behind, num_pitches, 100)
 
 
 def latepercentage(num_late, num_pitches):
-
-    if num_pitches == 0 or math.isnan(num_pitches):
-         return float('NaN')
-    else:
-        return 100 * (num_late / num_pitches)
+    return ratio(num_late, num_pitches, 100)
 
 
 def zonepercentage(num_zone, num_pitches):
-    if num_pitches == 0 or math.isnan(num_pitches):
-        return float('NaN')
-    else:
-        return 100 * (num_zone / num_pitches)
+    return ratio(num_zone, num_pitches, 100)
 
 
 def nonbipstrikepercentage(num_nonbipstrike, num_pitches):
-    if num_pitches == 0 or math.isnan(num_pitches):
-        return float('NaN')
-    else:
-        return 100 * (num_nonbipstrike / num_pitches)
+    return ratio(num_nonbipstrike, num_pitches, 100)
 
 
 def earlybippercentage(num_earlybip, num_early):
-    if num_early == 0 or math.isnan(num_early):
-        return float('NaN')
-    else:
-        return 100 * (num_earlybip / num_early)
+    return ratio(num_earlybip, num_early, 100)
 
 
 def fastballpercentage(num_fastball, num_pitches):
-    if num_pitches == 0 or math.isnan(num_pitches):
-        return float('NaN')
-    else:
-        return 100 * (num_fastball / num_pitches)
+    return ratio(num_fastball, num_pitches, 100)
 
 
 def earlysecondarypercentage(num_earlysecondary, num_early):
-    if num_early == 0 or math.isnan(num_early):
-        return float('NaN')
-    else:
-        return 100 * (num_earlysecondary / num_early)
+    return ratio(num_earlysecondary, num_early, 100)
 
 
 def latesecondarypercentage(num_latesecondary, num_late):
-    if num_late == 0 or math.isnan(num_late):
-        return float('NaN')
-    else:
-        return 100 * (num_latesecondary / num_late)
+    return ratio(num_latesecondary, num_late, 100)
 
 
 # Batted Ball Tab
 def groundballpercentage(num_groundball, num_bbe):
-    if num_bbe == 0 or math.isnan(num_bbe):
-        return float('NaN')
-    else:
-        return 100 * (num_groundball / num_bbe)
+    return ratio(num_groundball, num_bbe, 100)
 
 
 def linedrivepercentage(num_linedrive, num_bbe):
-    if num_bbe == 0 or math.isnan(num_bbe):
-        return float('NaN')
-    else:
-        return 100 * (num_linedrive / num_bbe)
+    return ratio(num_linedrive, num_bbe, 100)
 
 
 def flyballpercentage(num_flyball, num_bbe):
-    if num_bbe == 0 or math.isnan(num_bbe):
-        return float('NaN')
-    else:
-        return 100 * (num_flyball / num_bbe)
+    return ratio(num_flyball, num_bbe, 100)
 
 
 def infieldflyballpercentage(num_infieldflyball, num_bbe):
-    if num_bbe == 0 or math.isnan(num_bbe):
-        return float('NaN')
-    else:
-        return 100 * (num_infieldflyball / num_bbe)
+    return ratio(num_infieldflyball, num_bbe, 100)
 
 
 def weakpercentage(num_weak, num_bbe):
-    if num_bbe == 0 or math.isnan(num_bbe):
-        return float('NaN')
-    else:
-        return 100 * (num_weak / num_bbe)
+    return ratio(num_weak, num_bbe, 100)
 
 
 def mediumpercentage(num_medium, num_bbe):
-    if num_bbe == 0 or math.isnan(num_bbe):
-        return float('NaN')
-    else:
-        return 100 * (num_medium / num_bbe)
+    return ratio(num_medium, num_bbe, 100)
 
 
 def hardpercentage(num_hard, num_bbe):
-    if num_bbe == 0 or math.isnan(num_bbe):
-        return float('NaN')
-    else:
-        return 100 * (num_hard / num_bbe)
+    return ratio(num_hard, num_bbe, 100)
 
 
 def pullpercentage(num_pull, num_bbe):
-    if num_bbe == 0 or math.isnan(num_bbe):
-        return float('NaN')
-    else:
-        return 100 * (num_pull / num_bbe)
+    return ratio(num_pull, num_bbe, 100)
 
 
 def oppositefieldpercentage(num_oppositefield, num_bbe):
-    if num_bbe == 0 or math.isnan(num_bbe):
-        return float('NaN')
-    else:
-        return 100 * (num_oppositefield / num_bbe)
+    return ratio(num_oppositefield, num_bbe, 100)
 
 
 def babip(num_hits, num_homerun, num_at_bat, num_strikeout, num_sacrifice):
-    numerator = num_hits - num_homerun
-    denominator = num_at_bat - num_homerun - num_strikeout + num_sacrifice
-    if denominator == 0:
-        return float('NaN')
-    else:
-        return numerator / denominator
+    return ratio(num_hits - num_homerun, num_at_bat - num_homerun - num_strikeout + num_sacrifice)
 
 
 def bacon(num_hits, num_at_bat, num_strikeout, num_sacrifice):
-    numerator = num_hits
-    denominator = num_at_bat - num_strikeout + num_sacrifice
-    if denominator == 0:
-        return float('NaN')
-    else:
-        return numerator / denominator
+    return ratio(num_hits, num_at_bat - num_strikeout + num_sacrifice)
 
 
 # Plate Discipline Tab
 # Calculations Needed: OSwing%, Zone%, SwStrk%, CS%, CSW%, Contact%, ZContact%, OContact%, Swing%, EarlyCalledStrike%
 # 2StrkOSwing%, FStrike%, TrueFStrike%
 def swingpercentage(num_swing, num_pitches):
-    if num_pitches == 0 or math.isnan(num_pitches):
-        return float('NaN')
-    else:
-        return 100 * (num_swing / num_pitches)
+    return ratio(num_swing, num_pitches, 100)
 
 
 def oswingpercentage(num_oswing, num_swing):
-    if num_swing == 0 or math.isnan(num_swing):
-        return float('NaN')
-    else:
-        return 100 * (num_oswing / num_swing)
+    return ratio(num_oswing, num_swing, 100)
 
 
 def zswingpercentage(num_zswing, num_swing):
-    if num_swing == 0 or math.isnan(num_swing):
-        return float('NaN')
-    else:
-        return 100 * (num_zswing / num_swing)
+    return ratio(num_zswing, num_swing, 100)
 
 
 def contactpercentage(num_contact, num_swing):
-    if num_swing == 0 or math.isnan(num_swing):
-        return float('NaN')
-    else:
-        return 100 * (num_contact / num_swing)
+    return ratio(num_contact, num_swing, 100)
 
 
 def ocontactpercentage(num_ocontact, num_oswing):
-    if num_oswing == 0 or math.isnan(num_oswing):
-        return float('NaN')
-    else:
-        return 100 * (num_ocontact / num_oswing)
+    return ratio(num_ocontact, num_oswing, 100)
 
 
 def zcontactpercentage(num_zcontact, num_zswing):
-    if num_zswing == 0 or math.isnan(num_zswing):
-        return float('NaN')
-    else:
-        return 100 * (num_zcontact / num_zswing)
+    return ratio(num_zcontact, num_zswing, 100)
 
 
 def swingingstrikepercentage(num_whiff, num_swing):
-    if num_swing == 0 or math.isnan(num_swing):
-        return float('NaN')
-    else:
-        return 100 * (num_whiff / num_swing)
+    return ratio(num_whiff, num_swing, 100)
 
 
 def calledstrikepercentage(num_calledstrike, num_pitches):
-    if num_pitches == 0 or math.isnan(num_pitches):
-        return float('NaN')
-    else:
-        return 100 * (num_calledstrike / num_pitches)
+    return ratio(num_calledstrike, num_pitches, 100)
 
 
 def calledstrikespluswhiffspercentage(num_csw, num_pitches):
-    if num_pitches == 0 or math.isnan(num_pitches):
-        return float('NaN')
-    else:
-        return 100 * (num_csw / num_pitches)
+    return ratio(num_csw, num_pitches, 100)
 
 
 def earlycalledstrikepercentage(num_earlycs, num_early):
-    if num_early == 0 or math.isnan(num_early):
-        return float('NaN')
-    else:
-        return 100 * (num_earlycs / num_early)
+    return ratio(num_earlycs, num_early, 100)
 
 
 def lateoswingpercentage(num_lateoswing, num_late):
-    if num_late == 0 or math.isnan(num_late):
-        return float('NaN')
-    else:
-        return 100 * (num_lateoswing / num_late)
+    return ratio(num_lateoswing, num_late, 100)
 
 
 def fstrikepercentage(num_fstrike, num_pa):
-    if num_pa == 0 or math.isnan(num_pa):
-        return float('NaN')
-    else:
-        return 100 * (num_fstrike / num_pa)
+    return ratio(num_fstrike, num_pa, 100)
 
 
 def truefstrikepercentage(num_truefstrike, num_pa):
-    if num_pa == 0 or math.isnan(num_pa):
-        return float('NaN')
-    else:
-        return 100 * (num_truefstrike / num_pa)
+    return ratio(num_truefstrike, num_pa, 100)
 
 
 # Overview Tab
 def usagepercentage(num_pitch, num_pitches):
-    if num_pitches == 0 or math.isnan(num_pitches):
-        return float('NaN')
-    else:
-        return 100 * (num_pitch / num_pitches)
+    return ratio(num_pitch, num_pitches, 100)
 
 
 def putawaypercentage(num_putaway, num_late):
-    if num_late == 0 or math.isnan(num_late):
-        return float('NaN')
-    else:
-        return 100 * (num_putaway / num_late)
+    return ratio(num_putaway, num_late, 100)
 
 
 def battingaverage(num_hits, num_at_bat):
-    if num_at_bat == 0 or math.isnan(num_at_bat):
-        return float('NaN')
-    else:
-        return num_hits / num_at_bat
+    return ratio(num_hits, num_at_bat)
 
 
 def onbasepercentage(num_hit, num_bb, num_hbp, num_at_bat, num_sac_fly):
-    numerator = num_hit + num_bb + num_hbp
-    denominator = num_at_bat + num_bb + num_sac_fly + num_hbp
-    if denominator == 0:
-        return float('NaN')
-    else:
-        return numerator / denominator
+    return ratio(num_hit + num_bb + num_hbp, num_at_bat + num_bb + num_sac_fly + num_hbp)
+
+
+# wOBA linear weights by season
+WOBA_CONSTANTS = {
+    "2021": {
+        "wBB": 0.692,
+        "wHBP": 0.722,
+        "w1B": 0.879,
+        "w2B": 1.242,
+        "w3B": 1.568,
+        "wHR": 2.007},
+    "2020": {
+        "wBB": 0.699,
+        "wHBP": 0.728,
+        "w1B": 0.883,
+        "w2B": 1.238,
+        "w3B": 1.558,
+        "wHR": 1.979},
+    "2019": {
+        "wBB": 0.690,
+        "wHBP": 0.719,
+        "w1B": 0.870,
+        "w2B": 1.217,
+        "w3B": 1.529,
+        "wHR": 1.940},
+    "2018": {
+        "wBB": 0.690,
+        "wHBP": 0.720,
+        "w1B": 0.880,
+        "w2B": 1.247,
+        "w3B": 1.578,
+        "wHR": 2.031},
+    "2017": {
+        "wBB": 0.693,
+        "wHBP": 0.723,
+        "w1B": 0.877,
+        "w2B": 1.232,
+        "w3B": 1.552,
+        "wHR": 1.980},
+    "2016": {
+        "wBB": 0.691,
+        "wHBP": 0.721,
+        "w1B": 0.878,
+        "w2B": 1.242,
+        "w3B": 1.569,
+        "wHR": 2.015},
+    "2015": {
+        "wBB": 0.687,
+        "wHBP": 0.718,
+        "w1B": 0.881,
+        "w2B": 1.256,
+        "w3B": 1.594,
+        "wHR": 2.065}
+}
 
 
 def weightedonbasepercentage(year, num_ab, num_bb, num_ibb, num_hbp, num_sf, num_1b, num_2b, num_3b, num_hr):
-    year = str(year)
-    const = {
-        "2021": {
-            "wBB": 0.692,
-            "wHBP": 0.722,
-            "w1B": 0.879,
-            "w2B": 1.242,
-            "w3B": 1.568,
-            "wHR": 2.007},
-        "2020": {
-            "wBB": 0.699,
-            "wHBP": 0.728,
-            "w1B": 0.883,
-            "w2B": 1.238,
-            "w3B": 1.558,
-            "wHR": 1.979},
-        "2019": {
-            "wBB": 0.690,
-            "wHBP": 0.719,
-            "w1B": 0.870,
-            "w2B": 1.217,
-            "w3B": 1.529,
-            "wHR": 1.940},
-        "2018": {
-            "wBB": 0.690,
-            "wHBP": 0.720,
-            "w1B": 0.880,
-            "w2B": 1.247,
-            "w3B": 1.578,
-            "wHR": 2.031},
-        "2017": {
-            "wBB": 0.693,
-            "wHBP": 0.723,
-            "w1B": 0.877,
-            "w2B": 1.232,
-            "w3B": 1.552,
-            "wHR": 1.980},
-        "2016": {
-            "wBB": 0.691,
-            "wHBP": 0.721,
-            "w1B": 0.878,
-            "w2B": 1.242,
-            "w3B": 1.569,
-            "wHR": 2.015},
-        "2015": {
-            "wBB": 0.687,
-            "wHBP": 0.718,
-            "w1B": 0.881,
-            "w2B": 1.256,
-            "w3B": 1.594,
-            "wHR": 2.065}
-    }
-
-    if num_ab == 0 or math.isnan(num_ab):
-        return float('NaN')
-    else:
-        numerator = (const[year]['wBB'] * float(num_bb - num_ibb)) + (const[year]['wHBP'] * float(num_hbp)) + (
-                const[year]['w1B'] * float(num_1b)) + (const[year]['w2B'] * float(num_2b)) + (
-                const[year]['w3B'] * float(num_3b)) + (const[year]['wHR'] * float(num_hr))
-        denominator = float(num_ab + num_bb - num_ibb + num_sf + num_hbp)
-        if denominator == 0 or math.isnan(denominator):
-            return float('NaN')
-        return numerator / denominator
+    const = WOBA_CONSTANTS[str(year)]
+    numerator = (const['wBB'] * as_values(num_bb - num_ibb)) + (const['wHBP'] * as_values(num_hbp)) + (
+            const['w1B'] * as_values(num_1b)) + (const['w2B'] * as_values(num_2b)) + (
+            const['w3B'] * as_values(num_3b)) + (const['wHR'] * as_values(num_hr))
+    denominator = as_values(num_ab + num_bb - num_ibb + num_sf + num_hbp)
+
+    # No at bats means no wOBA, even when walks/HBP would give a non-zero denominator.
+    return ratio(numerator, denominator, guard=num_ab, like=num_ab)
 
 
 def strikeoutpercentage(num_strikeout, num_pa):
-    if num_pa == 0 or math.isnan(num_pa):
-        return float('NaN')
-    else:
-        return 100 * (num_strikeout / num_pa)
+    return ratio(num_strikeout, num_pa, 100)
 
 
 def walkpercentage(num_bb, num_pa):
-    if num_pa == 0 or math.isnan(num_pa):
-        return float('NaN')
-    else:
-        return 100 * (num_bb / num_pa)
+    return ratio(num_bb, num_pa, 100)
 
 
 def homerunflyballratio(num_hr, num_flyball):
-    if num_flyball == 0 or math.isnan(num_flyball):
-        return float('NaN')
-    return num_hr / num_flyball
+    return ratio(num_hr, num_flyball)
 
 
 def whip(num_hits, num_bb, num_outs):
-    if num_outs == 0 or math.isnan(num_outs):
-        return float('NaN')
-    else:
-        return (num_hits + num_bb) / (num_outs / 3)
+    return ratio(num_hits + num_bb, num_outs / 3)
 
 
 def ip(num_outs):
-    if math.isnan(num_outs):
-        return float('NaN')
-    else:
-        return num_outs / 3
+    return ratio(num_outs, 3)
 
 # Standard Tab
-# Calculations Needed:
\ No newline at end of file
+# Calculations Needed:
+
+##
+# Registry of named metrics: output column -> (metric, argument names).
+# Argument names are leaderboard frame columns, except ones passed to compute_metrics as keyword constants (year).
+##
+METRICS = {
+    'avg_velocity': (velocity, ['num_velo', 'total_velo']),
+    'barrel_pct': (barrelpercentage, ['num_barrel', 'num_batted_ball_event']),
+    'foul_pct': (foulpercentage, ['num_foul', 'num_pitches']),
+    'plus_pct': (pluspercentage, ['num_plus_pitch', 'num_pitches']),
+    'first_pitch_swing_pct': (firstpitchswingpercentage, ['num_first_pitch_swing', 'num_ab']),
+    'early_o_contact_pct': (earlyocontactpercentage, ['num_early_o_contact', 'num_o_contact']),
+    'late_o_contact_pct': (lateocontactpercentage, ['num_late_o_contact', 'num_o_contact']),
+    'avg_launch_speed': (launchspeed, ['num_launch_speed', 'total_launch_speed']),
+    'avg_launch_angle': (launchangle, ['num_launch_angle', 'total_launch_angle']),
+    'avg_release_extension': (releaseextension, ['num_release_extension', 'total_release_extension']),
+    'avg_spin_rate': (spinrate, ['num_spin_rate', 'total_spin_rate']),
+    'avg_x_movement': (xmovement, ['num_x_movement', 'total_x_movement']),
+    'avg_z_movement': (zmovement, ['num_z_movement', 'total_z_movement']),
+    'armside_pct': (armsidepercentage, ['num_armside', 'num_pitches']),
+    'gloveside_pct': (glovesidepercentage, ['num_gloveside', 'num_pitches']),
+    'inside_pct': (insidepercentage, ['num_inside', 'num_pitches']),
+    'outside_pct': (outsidepercentage, ['num_outside', 'num_pitches']),
+    'high_pct': (highlocpercentage, ['num_high', 'num_pitches']),
+    'horizonal_middle_location_pct': (hmidlocpercentage, ['num_horizontal_middle', 'num_pitches']),
+    'vertical_middle_location_pct': (vmidlocpercentage, ['num_middle', 'num_pitches']),
+    'low_pct': (lowlocpercentage, ['num_low', 'num_pitches']),
+    'heart_pct': (heartpercentage, ['num_heart', 'num_pitches']),
+    'early_pct': (earlypercentage, ['num_early', 'num_pitches']),
+    'behind_pct': (behindpercentage, ['num_behind', 'num_pitches']),
+    'late_pct': (latepercentage, ['num_late', 'num_pitches']),
+    'zone_pct': (zonepercentage, ['num_zone', 'num_pitches']),
+    'non_bip_strike_pct': (nonbipstrikepercentage, ['num_non_bip_strike', 'num_pitches']),
+    'early_bip_pct': (earlybippercentage, ['num_early_bip', 'num_early']),
+    'fastball_pct': (fastballpercentage, ['num_fastball', 'num_pitches']),
+    'early_secondary_pct': (earlysecondarypercentage, ['num_early_secondary', 'num_early']),
+    'late_secondary_pct': (latesecondarypercentage, ['num_late_secondary', 'num_late']),
+    'groundball_pct': (groundballpercentage, ['num_ground_ball', 'num_batted_ball_event']),
+    'linedrive_pct': (linedrivepercentage, ['num_line_drive', 'num_batted_ball_event']),
+    'flyball_pct': (flyballpercentage, ['num_fly_ball', 'num_batted_ball_event']),
+    'infield_flyball_pct': (infieldflyballpercentage, ['num_if_fly_ball', 'num_batted_ball_event']),
+    'weak_pct': (weakpercentage, ['num_weak_bip', 'num_batted_ball_event']),
+    'medium_pct': (mediumpercentage, ['num_medium_bip', 'num_batted_ball_event']),
+    'hard_pct': (hardpercentage, ['num_hard_bip', 'num_batted_ball_event']),
+    'pull_pct': (pullpercentage, ['num_pulled_bip', 'num_batted_ball_event']),
+    'opposite_field_pct': (oppositefieldpercentage, ['num_opposite_bip', 'num_batted_ball_event']),
+    'babip_pct': (babip, ['num_hit', 'num_hr', 'num_ab', 'num_k', 'num_sacrifice']),
+    'bacon_pct': (bacon, ['num_hit', 'num_ab', 'num_k', 'num_sacrifice']),
+    'swing_pct': (swingpercentage, ['num_swing', 'num_pitches']),
+    'o_swing_pct': (oswingpercentage, ['num_o_swing', 'num_swing']),
+    'z_swing_pct': (zswingpercentage, ['num_z_swing', 'num_swing']),
+    'contact_pct': (contactpercentage, ['num_contact', 'num_swing']),
+    'o_contact_pct': (ocontactpercentage, ['num_o_contact', 'num_o_swing']),
+    'z_contact_pct': (zcontactpercentage, ['num_z_contact', 'num_z_swing']),
+    'swinging_strike_pct': (swingingstrikepercentage, ['num_whiff', 'num_swing']),
+    'called_strike_pct': (calledstrikepercentage, ['num_called_strike', 'num_pitches']),
+    'csw_pct': (calledstrikespluswhiffspercentage, ['num_called_strike_plus_whiff', 'num_pitches']),
+    'early_called_strike_pct': (earlycalledstrikepercentage, ['num_early_called_strike', 'num_early']),
+    'late_o_swing_pct': (lateoswingpercentage, ['num_late_o_swing', 'num_late']),
+    'f_strike_pct': (fstrikepercentage, ['num_first_pitch_strike', 'num_pa']),
+    'true_f_strike_pct': (truefstrikepercentage, ['num_true_first_pitch_strike', 'num_pa']),
+    'usage_pct': (usagepercentage, ['num_pitches', 'total_num_pitches']),
+    'put_away_pct': (putawaypercentage, ['num_put_away', 'num_late']),
+    'batting_average': (battingaverage, ['num_hit', 'num_ab']),
+    'on_base_pct': (onbasepercentage, ['num_hit', 'num_bb', 'num_hbp', 'num_ab', 'num_sacrifice']),
+    'woba': (weightedonbasepercentage, ['year', 'num_ab', 'num_bb', 'num_ibb', 'num_hbp', 'num_sacrifice', 'num_1b', 'num_2b', 'num_3b', 'num_hr']),
+    'strikeout_pct': (strikeoutpercentage, ['num_k', 'num_pa']),
+    'walk_pct': (walkpercentage, ['num_bb', 'num_pa']),
+    'hr_flyball_pct': (homerunflyballratio, ['num_hr', 'num_fly_ball']),
+    'whip': (whip, ['num_hit', 'num_bb', 'num_outs']),
+    'num_ip': (ip, ['num_outs'])
+}
+
+
+# Compute a set of metrics over a frame in one pass, e.g. compute_metrics(raw, ['babip_pct', 'woba'], year='2021').
+# Keyword constants replace a frame column of the same name, e.g. num_ab=raw['num_outs'] + raw['num_hit']. Frame
+# columns are converted to float once, so object columns of Decimal/None from psycopg2 work like numeric ones.
+# Without names, every metric whose inputs are available is computed.
+def compute_metrics(frame, names=None, **constants):
+    if names is None:
+        names = [name for name, (metric, arguments) in METRICS.items()
+                 if all(argument in constants or argument in frame.columns for argument in arguments)]
+
+    columns = dict()
+
+    def get_argument(argument):
+        if argument in constants:
+            return constants[argument]
+        if argument not in columns:
+            columns[argument] = pd.to_numeric(frame[argument], errors='coerce').astype(float)
+        return columns[argument]
+
+    results = dict()
+    for name in names:
+        metric, arguments = METRICS[name]
+        results[name] = metric(*[get_argument(argument) for argument in arguments])
+
+    return frame.assign(**results)
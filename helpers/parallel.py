@@ -0,0 +1,75 @@
+from flask import current_app, g, request, has_request_context
+from concurrent.futures import ThreadPoolExecutor, wait
+from errorhandler.errorhandler import InvalidUsage
+import threading
+import time
+import os
+
+##
+# Request scoped parallel fetches.
+# fetch_parallel runs independent callables (typically one query each) on a per worker thread pool and returns
+# their results by name, so a request waits for its slowest query instead of the sum of them. Every task runs in a
+# copy of the calling request (or app) context with its own pooled connection, and sees the caller's `g` values.
+#
+# All parallel fetches of a request share one deadline, PARALLEL_FETCH_DEADLINE seconds after the first of them
+# started. Tasks that are still running then are abandoned and the request fails with a 504. The deadline is also set
+# as the statement_timeout of the tasks' connections, so Postgres cancels their queries and the connections go back
+# to the pool. Calls made from inside a task run sequentially so nested fetches can not starve the pool.
+##
+parallel_executors = dict()
+parallel_executors_lock = threading.Lock()
+parallel_task = threading.local()
+
+def get_parallel_executor():
+    pid = os.getpid()
+
+    if (pid not in parallel_executors):
+        with parallel_executors_lock:
+            if (pid not in parallel_executors):
+                parallel_executors.clear()
+                parallel_executors[pid] = ThreadPoolExecutor(
+                    max_workers=int(current_app.config.get('PARALLEL_FETCH_WORKERS')),
+                    thread_name_prefix='parallel-fetch'
+                )
+
+    return parallel_executors[pid]
+
+def get_request_deadline():
+    if ('parallel_fetch_deadline' not in g):
+        g.parallel_fetch_deadline = time.monotonic() + float(current_app.config.get('PARALLEL_FETCH_DEADLINE'))
+    return g.parallel_fetch_deadline
+
+# Run {name: callable} concurrently and return {name: result}. Exceptions raised by a task are re-raised here.
+def fetch_parallel(tasks):
+    if (len(tasks) < 2 or getattr(parallel_task, 'active', False)):
+        return {name: task() for name, task in tasks.items()}
+
+    app = current_app._get_current_object()
+    environ = dict(request.environ) if has_request_context() else None
+    deadline = get_request_deadline()
+    values = {key: value for key, value in vars(g._get_current_object()).items() if key != 'db_connections'}
+    values['statement_deadline'] = deadline
+
+    executor = get_parallel_executor()
+    futures = {name: executor.submit(run_task, app, environ, values, task) for name, task in tasks.items()}
+
+    done, pending = wait(futures.values(), timeout=max(0, deadline - time.monotonic()))
+    if (pending):
+        for future in pending:
+            future.cancel()
+        raise InvalidUsage(f'Timed out waiting for {len(pending)} of {len(futures)} queries', 504)
+
+    return {name: future.result() for name, future in futures.items()}
+
+def run_task(app, environ, values, task):
+    context = app.request_context(environ) if environ else app.app_context()
+
+    with context:
+        for key, value in values.items():
+            setattr(g, key, value)
+
+        parallel_task.active = True
+        try:
+            return task()
+        finally:
+            parallel_task.active = False
@@ -0,0 +1,148 @@
+from flask import current_app
+from concurrent.futures import ThreadPoolExecutor
+from errorhandler.errorhandler import InvalidUsage
+from cache import fetch_cached, get_cache_entry, set_cache_entry
+from urllib3.util.retry import Retry
+import urllib3
+import certifi
+import threading
+import json
+import os
+
+##
+# Pooled SportRadar API client.
+# Every worker keeps one keep-alive connection pool to SPORTRADAR_URL (keyed on the pid like the database pools), so
+# requests reuse open TLS connections instead of handshaking per call. Calls get connect/read timeouts and are retried
+# with exponential backoff on connection errors, 429 and 5xx responses.
+#
+# fetch_sportradar_many downloads several endpoints at once on SPORTRADAR_WORKERS threads, e.g. all play-by-play
+# feeds of a day. SPORTRADAR_URL can point at benchmarks/sportradar_server.py to run without the real API.
+#
+# Responses are cached by endpoint (without the api key) through the single-flight cache, so concurrent requests
+# share one upstream call per feed. Feeds of games that are still going stay fresh for SPORTRADAR_LIVE_TTL (the
+# daily summary for SPORTRADAR_SUMMARY_TTL) and closed ones for SPORTRADAR_CLOSED_TTL. Expired feeds are never
+# served stale, they are revalidated with their ETag/Last-Modified before returning, so an unchanged feed costs a 304
+# instead of the full body. The `stale` window of the SportRadar cache policy only keeps them around for that.
+# bypass_cache always goes upstream and stores the result.
+##
+# Games in these states will not change any more
+CLOSED_STATUSES = ['closed', 'cancelled', 'postponed', 'unnecessary']
+
+sportradar_pools = dict()
+sportradar_executors = dict()
+sportradar_lock = threading.Lock()
+
+def get_sportradar_pool():
+    pid = os.getpid()
+
+    if (pid not in sportradar_pools):
+        with sportradar_lock:
+            if (pid not in sportradar_pools):
+                config = current_app.config
+                url = config.get('SPORTRADAR_URL')
+                options = {
+                    'maxsize': int(config.get('SPORTRADAR_WORKERS')),
+                    'block': True,
+                    'timeout': urllib3.Timeout(
+                        connect=float(config.get('SPORTRADAR_CONNECT_TIMEOUT')),
+                        read=float(config.get('SPORTRADAR_TIMEOUT'))
+                    ),
+                    'retries': Retry(
+                        total=int(config.get('SPORTRADAR_RETRIES')),
+                        backoff_factor=float(config.get('SPORTRADAR_BACKOFF')),
+                        status_forcelist=[429, 500, 502, 503, 504],
+                        raise_on_status=False
+                    ),
+                    'headers': {'Accept-Encoding': 'gzip'}
+                }
+                if (url.startswith('https')):
+                    options['ca_certs'] = certifi.where()
+                sportradar_pools.clear()
+                sportradar_pools[pid] = urllib3.connection_from_url(url, **options)
+
+    return sportradar_pools[pid]
+
+def get_sportradar_executor():
+    pid = os.getpid()
+
+    if (pid not in sportradar_executors):
+        with sportradar_lock:
+            if (pid not in sportradar_executors):
+                sportradar_executors.clear()
+                sportradar_executors[pid] = ThreadPoolExecutor(
+                    max_workers=int(current_app.config.get('SPORTRADAR_WORKERS')),
+                    thread_name_prefix='sportradar'
+                )
+
+    return sportradar_executors[pid]
+
+def request_sportradar(pool, endpoint, previous=None):
+    headers = dict(pool.headers)
+    if (previous is not None):
+        if (previous['etag'] is not None):
+            headers['If-None-Match'] = previous['etag']
+        if (previous['last_modified'] is not None):
+            headers['If-Modified-Since'] = previous['last_modified']
+
+    try:
+        response = pool.request('GET', endpoint, headers=headers)
+    except urllib3.exceptions.HTTPError as e:
+        raise InvalidUsage(f'SportRadar request failed: {e.__class__.__name__}', 502)
+
+    if (response.status == 304 and previous is not None):
+        return previous
+    if (response.status != 200):
+        raise InvalidUsage(f'SportRadar request failed with status {response.status}', 502)
+
+    return {
+        'data': json.loads(response.data.decode('utf-8')),
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified')
+    }
+
+def get_sportradar_cache_key(endpoint):
+    path = endpoint.split('?', 1)[0]
+    return f'SportRadar-{path}'
+
+def get_sportradar_ttl(response):
+    data = response['data']
+    if ('game' in data):
+        closed = data['game'].get('status') in CLOSED_STATUSES
+        ttl = 'SPORTRADAR_CLOSED_TTL' if closed else 'SPORTRADAR_LIVE_TTL'
+    else:
+        games = data.get('league', {}).get('games', [])
+        closed = len(games) > 0 and all(row['game'].get('status') in CLOSED_STATUSES for row in games)
+        ttl = 'SPORTRADAR_CLOSED_TTL' if closed else 'SPORTRADAR_SUMMARY_TTL'
+
+    return int(current_app.config.get(ttl))
+
+# GET an endpoint (path and query string) and return the decoded JSON
+def fetch_sportradar(endpoint, bypass_cache=False):
+    cache_key = get_sportradar_cache_key(endpoint)
+    pool = get_sportradar_pool()
+
+    def fetch():
+        previous = get_cache_entry(cache_key)
+        return request_sportradar(pool, endpoint, previous.value if previous else None)
+
+    if (bypass_cache):
+        response = fetch()
+        set_cache_entry(cache_key, response, get_sportradar_ttl)
+        return response['data']
+
+    return fetch_cached(cache_key, fetch, get_sportradar_ttl, allow_stale=False)['data']
+
+def fetch_in_context(app, endpoint, bypass_cache):
+    with app.app_context():
+        return fetch_sportradar(endpoint, bypass_cache)
+
+# GET {name: endpoint} concurrently and return {name: decoded JSON}. Errors are re-raised here.
+def fetch_sportradar_many(endpoints, bypass_cache=False):
+    if (len(endpoints) < 2):
+        return {name: fetch_sportradar(endpoint, bypass_cache) for name, endpoint in endpoints.items()}
+
+    app = current_app._get_current_object()
+    executor = get_sportradar_executor()
+    futures = {name: executor.submit(fetch_in_context, app, endpoint, bypass_cache) for name, endpoint in endpoints.items()}
+
+    return {name: future.result() for name, future in futures.items()}
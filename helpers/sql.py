@@ -0,0 +1,40 @@
+from collections import OrderedDict
+import threading
+
+##
+# Compiled SQL by query shape.
+# Dynamic queries (e.g. the v4 leaderboard) are generated with named placeholders only, so the text depends on which
+# filters are present but never on their values. The text is compiled once per shape and kept in a bounded per
+# process LRU, the values travel separately as query parameters.
+##
+compiled_queries = OrderedDict()
+compiled_queries_lock = threading.Lock()
+COMPILED_QUERIES_MAX = 1024
+
+def get_compiled_query(shape, compile):
+    with compiled_queries_lock:
+        query = compiled_queries.get(shape)
+        if (query is not None):
+            compiled_queries.move_to_end(shape)
+            return query
+
+    query = compile()
+
+    with compiled_queries_lock:
+        compiled_queries[shape] = query
+        if (len(compiled_queries) > COMPILED_QUERIES_MAX):
+            compiled_queries.popitem(last=False)
+
+    return query
+
+# Render {column: parameter} conditions as `column = %(parameter)s`, a (start, end) tuple of parameters renders as
+# `column BETWEEN %(start)s AND %(end)s`.
+def get_where_clause(conditions, prefix=''):
+    clauses = list()
+    for col, param in conditions.items():
+        if (isinstance(param, tuple)):
+            clauses.append(f'{prefix}{col} BETWEEN %({param[0]})s AND %({param[1]})s')
+        else:
+            clauses.append(f'{prefix}{col} = %({param})s')
+
+    return f"WHERE {' AND '.join(clauses)}" if clauses else ''
@@ -1,6 +1,6 @@
 from flask import current_app
-from cache import cache_timeout, cache_invalidate_hour
-from helpers import fetch_dataframe
+from helpers import get_dimension_tables
+from marshmallow import ValidationError
 import json as json
 import pandas as pd
 
@@ -9,25 +9,36 @@ import pandas as pd
 ##
 def get_team_info(team=None):
 
-    query = f'SELECT abbreviation, team_name, mlb_team_id as "mlb_id", league, division FROM teams'
-    cache_key = f'team-info-all'
+    # Served from the worker's teams dimension table instead of a query per call
+    result = get_dimension_tables().teams[['abbreviation', 'team_name', 'mlb_team_id', 'league', 'division']]
+    result = result.rename(columns={'mlb_team_id': 'mlb_id'})
 
     if (team):
-        query = f'{query} WHERE abbreviation=%s'
-        cache_key = f'team-info-{team}'
+        result = result[result['abbreviation'] == team]
 
-    json_result = current_app.cache.get(cache_key)
+    indexed_result = result.set_index(['abbreviation'])
+    indexed_result = indexed_result.fillna(value=json.dumps(None))
 
-    if (current_app.config.get('BYPASS_CACHE') or json_result is None):
-        result = fetch_dataframe(query, team)
+    # Return a python dict
+    return json.loads(indexed_result.to_json(orient='index', date_format='iso'))
 
-        indexed_result = result.set_index(['abbreviation'])
-        indexed_result.fillna(value=json.dumps(None), inplace=True)
+##
+# Team abbreviations accepted by the `team` filters.
+# Read from the dimension tables on first use instead of at import, so resources can be imported (and workers
+# booted) before the database is reachable. get_dimension_tables does the locking and reloads.
+##
+def get_valid_teams():
+    return get_dimension_tables().teams['abbreviation'].dropna().tolist()
 
-        json_result = indexed_result.to_json(orient='index', date_format='iso')
-        # All cached items are stored as json.
-        if (not current_app.config.get('BYPASS_CACHE')):
-            current_app.cache.set(cache_key, json_result, cache_timeout(cache_invalidate_hour()))
+# webargs validator equivalent to validate.OneOf(get_valid_teams() + ['NA']), evaluated per request
+def validate_team(allow_na=True):
+    def validator(team):
+        if (allow_na and team == 'NA'):
+            return True
 
-    # Return a python dict
-    return json.loads(json_result)
+        valid_teams = get_valid_teams()
+        if (team not in valid_teams):
+            raise ValidationError(f"Must be one of: {', '.join(valid_teams + (['NA'] if allow_na else []))}.")
+        return True
+
+    return validator
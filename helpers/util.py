@@ -1,6 +1,8 @@
 import pandas as pd
+import numpy as np
 from flask import current_app
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 
 ##
 # Dump any variable including pandas data STDOUT
@@ -23,3 +25,67 @@ def date_validate(date_text):
         return True
     except ValueError:
         return False
+
+##
+# Walk a DataFrame's index and columns once, yielding (key, record) pairs.
+# Replaces json.loads(df.to_json(orient='index')) + eval() of the stringified tuple keys. Keys are tuples of native
+# Python values for a MultiIndex and a single native value otherwise. Record values are converted the way to_json
+# does: NaN/None to None, numpy scalars to Python, Decimal to float, dates to epoch milliseconds and floats rounded
+# to double_precision places.
+##
+def index_records(frame, double_precision=10):
+    index = frame.index
+    if (isinstance(index, pd.MultiIndex)):
+        levels = [level.tolist() for level in index.levels]
+        codes = [level_codes.tolist() for level_codes in index.codes]
+        keys = zip(*[[values[code] if code >= 0 else None for code in level_codes] for values, level_codes in zip(levels, codes)])
+    else:
+        keys = index.tolist()
+
+    columns = [str(column) for column in frame.columns]
+    values = [get_json_values(frame.iloc[:, i], double_precision) for i in range(len(columns))]
+
+    for key, row in zip(keys, zip(*values)):
+        yield key, dict(zip(columns, row))
+
+# Convert one column to a list of JSON ready Python values.
+def get_json_values(series, double_precision=10):
+    kind = series.dtype.kind
+
+    if (kind == 'f'):
+        array = series.to_numpy()
+        output = np.round(array, double_precision).astype(object)
+        output[np.isnan(array)] = None
+        return output.tolist()
+
+    if (kind in ('i', 'u', 'b')):
+        return series.to_numpy().tolist()
+
+    if (kind == 'M'):
+        array = series.to_numpy()
+        output = array.astype('datetime64[ms]').astype('int64').astype(object)
+        output[np.isnat(array)] = None
+        return output.tolist()
+
+    return [get_json_value(value, double_precision) for value in series.tolist()]
+
+def get_json_value(value, double_precision=10):
+    if (value is None or isinstance(value, (str, bool))):
+        return value
+
+    if (isinstance(value, np.generic)):
+        value = value.item()
+
+    if (isinstance(value, Decimal)):
+        value = float(value)
+
+    if (isinstance(value, float)):
+        return None if np.isnan(value) else round(value, double_precision)
+
+    if (isinstance(value, (date, datetime, pd.Timestamp))):
+        return None if pd.isna(value) else pd.Timestamp(value).value // 1000000
+
+    if (value is pd.NaT or value is pd.NA):
+        return None
+
+    return value
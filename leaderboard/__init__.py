@@ -6,3 +6,5 @@ from .batted import *
 from .overview import *
 from .player import *
 from .leaderboard import *
+from .statistics import *
+from .cube import *
@@ -1,18 +1,11 @@
 import pandas as pd
-import os
-import psycopg2
+from helpers import fetch_dataframe
 import json
 from functools import reduce
 import math
 
 def ArbitraryPitcher(start_date, end_date):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select pitchermlbamid, pitchername, count(*), avg(velo), \
+    ie_adv_pt = fetch_dataframe("select pitchermlbamid, pitchername, count(*), avg(velo), \
                    sum(case when pitchresult in ('Foul', 'Hard Foul') \
                    then 1 else 0 end), sum(case when pitchresult in \
                    ('Swing Miss', 'Called Strike', '-') then 1 when \
@@ -27,17 +20,13 @@ def ArbitraryPitcher(start_date, end_date):
                    (comments not like '%%PPD%%' OR comments is null))) \
                    and pitchtype <> 'IN' and ghuid in (select ghuid from \
                    game_detail where postseason = false) group by \
-                   pitchermlbamid, pitchername", [start_date, end_date, start_date, end_date, start_date, end_date])
-    rows = cursor.fetchall()
+                   pitchermlbamid, pitchername", [start_date, end_date, start_date, end_date, start_date, end_date], True)
     colnames = ['pitchermlbamid', 'pitchername', 'num_pitches',
     'avg_velocity', 'num_foul', 'num_plus']
-    ie_adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    ie_adv_pt.columns = colnames
 
     bs_db = 'baseballsavant'
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=bs_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select pl.mlb_id, count(*), \
+    bs_adv_pt = fetch_dataframe("select pl.mlb_id, count(*), \
                    avg(p.launch_speed), avg(p.launch_angle), \
                    avg(p.release_extension) , avg(p.spin_rate) , \
                    avg(p.release_position_x - p.plate_x) , \
@@ -49,12 +38,10 @@ def ArbitraryPitcher(start_date, end_date):
                    on m.pitcher_id = pl.id where m.game_id in \
                    (select id from games where game_date >= %s \
                    and game_date <= %s) \
-                   group by pl.mlb_id", [start_date, end_date])
-    rows = cursor.fetchall()
+                   group by pl.mlb_id", [start_date, end_date], database=bs_db)
     colnames = ['pitchermlbamid', 'num_pitches_bs', 'avg_ev','avg_la', 'avg_ext',
     'avg_spin', 'avg_x_mov', 'avg_z_mov', 'num_barrel', 'num_pa']
-    bs_adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    bs_adv_pt.columns = colnames
 
     leaderboard = [ie_adv_pt, bs_adv_pt]
     adv_pt = reduce(lambda left,right: pd.merge(left,right,on=['pitchermlbamid'],how='outer'), leaderboard)
@@ -67,58 +54,22 @@ def ArbitraryPitcher(start_date, end_date):
     return(adv_pt)
 
 def MonthlyPitcher(year, month):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select * from leaderboard_monthly_advanced_pitcher where \
-                    year = %s and month = %s", [year, month])
-    rows = cursor.fetchall()
-    colnames = [desc[0] for desc in cursor.description]
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    adv_pt = fetch_dataframe("select * from leaderboard_monthly_advanced_pitcher where \
+                    year = %s and month = %s", [year, month], True)
     return(adv_pt)
 
 def HalfPitcher(year, half):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select * from leaderboard_half_advanced_pitcher where \
-                    year = %s and half = %s", [year, half])
-    rows = cursor.fetchall()
-    colnames = [desc[0] for desc in cursor.description]
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    adv_pt = fetch_dataframe("select * from leaderboard_half_advanced_pitcher where \
+                    year = %s and half = %s", [year, half], True)
     return(adv_pt)
 
 def AnnualPitcher(year):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select * from leaderboard_annual_advanced_pitcher where \
-                    year = %s", [year])
-    rows = cursor.fetchall()
-    colnames = [desc[0] for desc in cursor.description]
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    adv_pt = fetch_dataframe("select * from leaderboard_annual_advanced_pitcher where \
+                    year = %s", [year], True)
     return(adv_pt)
 
 def ArbitraryHitter(start_date, end_date):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select hittermlbamid, hittername, sum(\"N\"), \
+    adv_hit = fetch_dataframe("select hittermlbamid, hittername, sum(\"N\"), \
                    sum(\"RHP\"), sum(\"LHP\"), AVG(\"MPH\"), SUM(num_whiff), \
                    SUM(num_swing), SUM(num_cs), SUM(num_foul), \
                    case when SUM(at_bats) > 0 then SUM(at_bats) else 1 end, \
@@ -130,15 +81,13 @@ def ArbitraryHitter(start_date, end_date):
                    where game_date >= %s and \
                    game_date <= %s \
                    group by hittermlbamid, hittername",
-                    [start_date, end_date])
-    rows = cursor.fetchall()
+                    [start_date, end_date], True)
     colnames = ['hittermlbamid', 'hittername', 'N', 'RHP', 'LHP', 'MPH',
     'num_whiff', 'num_swing', 'num_cs', 'num_foul', 'at_bats',
     'first_pitch_swing', 'num_plus', 'ozone', 'swingozone', 'contactozone',
     'earlyocon', 'lateocon', 'num_pitches', 'avg_ev', 'avg_la',
     'num_barrels']
-    adv_hit = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    adv_hit.columns = colnames
 
     if(adv_hit.empty == False):
         adv_hit['foul_pct'] = adv_hit.apply(lambda row: 100 * (int(row['num_foul']) / int(row['N'])), axis = 1)
@@ -151,58 +100,22 @@ def ArbitraryHitter(start_date, end_date):
     return(adv_hit)
 
 def MonthlyHitter(year, month):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select * from leaderboard_monthly_advanced_hitter where \
-                    year = %s and month = %s", [year, month])
-    rows = cursor.fetchall()
-    colnames = [desc[0] for desc in cursor.description]
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    adv_pt = fetch_dataframe("select * from leaderboard_monthly_advanced_hitter where \
+                    year = %s and month = %s", [year, month], True)
     return(adv_pt)
 
 def HalfHitter(year, half):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select * from leaderboard_half_advanced_hitter where \
-                    year = %s and half = %s", [year, half])
-    rows = cursor.fetchall()
-    colnames = [desc[0] for desc in cursor.description]
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    adv_pt = fetch_dataframe("select * from leaderboard_half_advanced_hitter where \
+                    year = %s and half = %s", [year, half], True)
     return(adv_pt)
 
 def AnnualHitter(year):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select * from leaderboard_annual_advanced_hitter where \
-                    year = %s", [year])
-    rows = cursor.fetchall()
-    colnames = [desc[0] for desc in cursor.description]
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    adv_pt = fetch_dataframe("select * from leaderboard_annual_advanced_hitter where \
+                    year = %s", [year], True)
     return(adv_pt)
 
 def ArbitraryPitchType(start_date, end_date):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select pitchermlbamid, pitchername, pitchtype, \
+    adv_pt = fetch_dataframe("select pitchermlbamid, pitchername, pitchtype, \
                     count(*), avg(velo), \
                     sum(case pitchresult when 'Foul' then 1 \
                     when 'Hard Foul' then 1 else 0 end), \
@@ -215,12 +128,10 @@ def ArbitraryPitchType(start_date, end_date):
                     from schedule where game_date >= %s \
                     and game_date <= %s) and pitchtype != 'IN' \
                     group by pitchermlbamid, pitchername, pitchtype",
-                    [start_date, end_date])
-    rows = cursor.fetchall()
+                    [start_date, end_date], True)
     colnames = ['pitchermlbamid', 'pitchername', 'pitchtype',
     'num_pitches', 'avg_velocity', 'num_foul', 'num_plus']
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    adv_pt.columns = colnames
 
     #bs_db = 'baseballsavant'
     #db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=bs_db, user=pl_user, password=pl_password)
@@ -267,46 +178,16 @@ def ArbitraryPitchType(start_date, end_date):
     return(adv_pt)
 
 def MonthlyPitchType(year, month):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select * from leaderboard_monthly_advanced_pitchtype where \
-                    year = %s and month = %s", [year, month])
-    rows = cursor.fetchall()
-    colnames = [desc[0] for desc in cursor.description]
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    adv_pt = fetch_dataframe("select * from leaderboard_monthly_advanced_pitchtype where \
+                    year = %s and month = %s", [year, month], True)
     return(adv_pt)
 
 def HalfPitchType(year, half):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select * from leaderboard_half_advanced_pitchtype where \
-                    year = %s and half = %s", [year, half])
-    rows = cursor.fetchall()
-    colnames = [desc[0] for desc in cursor.description]
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    adv_pt = fetch_dataframe("select * from leaderboard_half_advanced_pitchtype where \
+                    year = %s and half = %s", [year, half], True)
     return(adv_pt)
 
 def AnnualPitchType(year):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-    cursor.execute("select * from leaderboard_annual_advanced_pitchtype where \
-                    year = %s", [year])
-    rows = cursor.fetchall()
-    colnames = [desc[0] for desc in cursor.description]
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    adv_pt = fetch_dataframe("select * from leaderboard_annual_advanced_pitchtype where \
+                    year = %s", [year], True)
     return(adv_pt)
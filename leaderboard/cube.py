@@ -0,0 +1,571 @@
+from flask import current_app
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, ROUND_HALF_UP, localcontext
+import pandas as pd
+import numpy as np
+import re
+import threading
+import time
+import os
+from helpers import fetch_dataframe
+
+##
+# In-process cube for the v4 leaderboard.
+# One season of pl_leaderboard_daily is loaded per worker into NumPy arrays, pre-aggregated per cell (player plus
+# the split dimensions the leaderboard filters on) and game date, with a running sum of every measure. The sum over
+# any range of dates is then prefix[last] - prefix[first] per cell, found with two binary searches over all cells at
+# once, so `arbitrary_start`/`arbitrary_end`, `month` and `half` cost the same as the full season.
+#
+# Statistics are evaluated from the same SQL as Leaderboard.aggregate_fields, parsed into a small expression tree
+# (SUM over the window, ROUND, NULLIF, COALESCE, casts and arithmetic) that is evaluated with NumPy. Anything the
+# cube can not reproduce, e.g. max(max_launch_speed) or a team filter on the starts join, makes get_leaderboard
+# return None and the caller falls back to SQL. benchmarks/leaderboard_cube.py compares both paths.
+##
+
+# Filter columns that are dimensions of the cells, the date filters select the window instead
+PITCHING_CELLS = ['pitchermlbamid', 'pitchername', 'pitchtype', 'pitcherside', 'hitterside', 'pitcher_home_away', 'pitcherteam_abb']
+HITTING_CELLS = ['hittermlbamid', 'hittername', 'hitterside', 'pitcherside', 'hitter_home_away', 'hitterteam_abb']
+PERIOD_COLUMNS = ['month_played', 'half_played']
+
+# max() of these is a per season constant, any other max() is not cube-able
+SEASON_CONSTANTS = ['woba_bb', 'woba_hbp', 'woba_single', 'woba_double', 'woba_triple', 'woba_home_run']
+
+# Subqueries the leaderboard SQL joins on the player: alias -> (table, cell columns, {measure: sql})
+JOINS = {
+    'start': ('pl_leaderboard_starts', ['pitchermlbamid', 'pitcher_home_away'], {'num_starts': 'SUM(sum)'}),
+    'totals': ('mv_hitter_game_stats', ['hittermlbamid', 'hitter_home_away'], {'games': 'SUM(g)', 'rbi': 'SUM(rbi)', 'cs': 'SUM(cs)', 'sb': 'SUM(sb)', 'runs': 'SUM(runs)'})
+}
+
+class DateCube():
+    # rows holds one row per cell and game date: the cell columns, game_played, the period columns and the measures
+    def __init__(self, rows, cells, measures):
+        rows = rows.copy()
+        # Missing split values (e.g. no team) form their own cell like NULL does in a GROUP BY
+        for column in cells:
+            if (rows[column].isna().any()):
+                rows[column] = rows[column].astype(object).where(rows[column].notna(), '')
+
+        rows['day'] = pd.to_datetime(rows['game_played']).to_numpy().astype('datetime64[D]').astype(np.int64)
+        rows = rows.sort_values(cells + ['day'], kind='mergesort').reset_index(drop=True)
+
+        cell_index = rows.groupby(cells, sort=False).ngroup().to_numpy()
+        first_rows = np.flatnonzero(np.diff(np.r_[-1, cell_index]) != 0)
+
+        self.cell_columns = cells
+        self.cells = rows.loc[first_rows, cells].reset_index(drop=True)
+        self.days = rows['day'].to_numpy()
+        self.first_day = int(self.days.min()) if len(rows) else 0
+        self.last_day = int(self.days.max()) if len(rows) else -1
+        # (cell, day) packed into one sorted key
+        self.span = self.last_day + 1 if len(rows) else 1
+        self.keys = cell_index.astype(np.int64) * self.span + self.days
+
+        self.prefix = dict()
+        for measure in measures + ['cube_rows']:
+            values = rows[measure].to_numpy()
+            if (np.issubdtype(values.dtype, np.integer)):
+                values = values.astype(np.int64)
+            else:
+                values = pd.to_numeric(rows[measure], errors='coerce').fillna(0).to_numpy(dtype=float)
+            self.prefix[measure] = np.r_[values.dtype.type(0), np.cumsum(values)]
+
+        # First and last game date of every month/half in the season
+        self.periods = {column: {str(period): (int(days.min()), int(days.max())) for period, days in rows.groupby(column)['day']} for column in PERIOD_COLUMNS}
+        self.groupings = dict()
+
+    # (first day, last day, cell mask) for {column: param} conditions, None if a condition can not be applied
+    def select(self, conditions, params):
+        first, last = self.first_day, self.last_day
+        mask = np.ones(len(self.cells), dtype=bool)
+
+        for column, param in conditions.items():
+            if (column == 'game_played'):
+                try:
+                    first = max(first, to_day(params[param[0]]))
+                    last = min(last, to_day(params[param[1]]))
+                except ValueError:
+                    return None
+            elif (column in PERIOD_COLUMNS):
+                period = self.periods[column].get(str(params[param]), (0, -1))
+                first, last = max(first, period[0]), min(last, period[1])
+            elif (column in self.cell_columns):
+                mask &= self.cells[column].astype(str).to_numpy() == str(params[param])
+            elif (column != 'year_played'):
+                return None
+
+        return first, last, mask
+
+    # Sum every measure over the days [first, last] of the masked cells, then add those up per group of cells.
+    # Returns the group columns and {measure: sums} for the groups that had any rows in the window.
+    def aggregate(self, group_columns, first, last, mask):
+        codes, groups = self.get_grouping(group_columns)
+        cells = np.flatnonzero(mask)
+        low = np.searchsorted(self.keys, cells * self.span + first, 'left')
+        high = np.searchsorted(self.keys, cells * self.span + last, 'right')
+
+        sums = dict()
+        for measure, prefix in self.prefix.items():
+            totals = np.bincount(codes[cells], weights=prefix[high] - prefix[low], minlength=len(groups))
+            sums[measure] = totals.round().astype(np.int64) if np.issubdtype(prefix.dtype, np.integer) else totals
+
+        present = sums['cube_rows'] > 0
+        return groups[present].reset_index(drop=True), {measure: values[present] for measure, values in sums.items()}
+
+    def get_grouping(self, group_columns):
+        key = tuple(group_columns)
+        if (key not in self.groupings):
+            codes = self.cells.groupby(group_columns, sort=True).ngroup().to_numpy()
+            first_cells = np.unique(codes, return_index=True)[1]
+            self.groupings[key] = (codes, self.cells.loc[first_cells, group_columns].reset_index(drop=True))
+        return self.groupings[key]
+
+class LeaderboardCube():
+    # measures is {'pitching': [names], 'hitting': [names]} of the daily table columns to sum
+    def __init__(self, season, version, measures):
+        self.season = str(season)
+        self.version = version
+
+        pitching = {measure: f'SUM({measure})' for measure in measures['pitching']}
+        hitting = {measure: f'SUM({measure})' for measure in measures['hitting']}
+        self.cubes = {
+            'pitching': DateCube(fetch_cube_rows('pl_leaderboard_daily', PITCHING_CELLS, pitching, self.season), PITCHING_CELLS, list(pitching)),
+            'hitting': DateCube(fetch_cube_rows('pl_leaderboard_daily', HITTING_CELLS, hitting, self.season), HITTING_CELLS, list(hitting))
+        }
+        for alias, (table, cells, sums) in JOINS.items():
+            self.cubes[alias] = DateCube(fetch_cube_rows(table, cells, sums, self.season), cells, list(sums))
+
+        constants = fetch_dataframe(f"SELECT {', '.join(f'max({name}) AS {name}' for name in SEASON_CONSTANTS)} FROM pl_leaderboard_daily WHERE year_played = %(year)s", {'year': self.season})
+        self.constants = {f'max_{name}': to_float(value) for name, value in constants.iloc[0].items()}
+
+    # The frame the leaderboard SQL returns for cols ({label: sql}), or None if the cube can not produce it
+    def get_leaderboard(self, leaderboard, cols, conditions, params):
+        pitching = leaderboard in ['pitch', 'pitcher']
+        cube = self.cubes['pitching' if pitching else 'hitting']
+        player = 'pitchermlbamid' if pitching else 'hittermlbamid'
+
+        # The SQL groups by every plain column it selects
+        group_columns = [sql for sql in cols.values() if sql in cube.cell_columns]
+        if (player not in group_columns):
+            return None
+
+        selection = cube.select(conditions, params)
+        if (selection is None):
+            return None
+        groups, sums = cube.aggregate(group_columns, *selection)
+        player_ids = groups[player].to_numpy()
+
+        names = dict(sums)
+        # Sums of counts are returned as integers like the SQL returns them
+        integers = {measure for measure, values in sums.items() if np.issubdtype(values.dtype, np.integer)}
+        names.update(self.constants)
+        names.update({param: to_float(value) for param, value in params.items()})
+
+        # The joined subqueries ignore the handedness filters
+        join_conditions = {column: param for column, param in conditions.items() if column not in ['pitcherside', 'hitterside']}
+        joins = {'totals': self.cubes['totals']}
+        if (pitching):
+            joins = {'start': self.cubes['start'], 'pldp': cube} if leaderboard == 'pitch' else {'start': self.cubes['start']}
+
+        for alias, join in joins.items():
+            selection = join.select(join_conditions, params)
+            if (selection is None):
+                return None
+            join_groups, join_sums = join.aggregate([player], *selection)
+            rows = pd.Index(join_groups[player]).get_indexer(player_ids)
+            for measure, values in join_sums.items():
+                names[f'{alias}_{measure}'] = np.append(values.astype(float), np.nan)[rows]
+                if (np.issubdtype(values.dtype, np.integer)):
+                    integers.add(f'{alias}_{measure}')
+
+        frame = dict()
+        for label, sql in cols.items():
+            if (sql in cube.cell_columns):
+                values = groups[sql].to_numpy()
+                frame[label] = values if pd.api.types.is_numeric_dtype(values) else np.where(values == '', None, values)
+                continue
+
+            field = translate_field(sql)
+            if (field is None or any(name not in names for name in field[1])):
+                return None
+            frame[label] = evaluate_field(field, names, integers, len(groups))
+
+        return pd.DataFrame(frame, columns=list(cols))
+
+##
+# SQL to NumPy translation of the aggregate fields.
+# Only expressions built from SUM()s of daily columns, season constants, bound parameters and the joined totals are
+# translated. SUM is a no-op on the window sums because it is linear, SUM(a - b) == SUM(a) - SUM(b). The supported
+# operators, functions and casts are the tables below, anything else makes the field untranslatable.
+#
+# Values are evaluated as float arrays tagged INTEGER (integer literals and ::int casts, whose division truncates
+# like it does in SQL), WHOLE (numeric, e.g. SUM() of a count, returned as int64 like the SQL returns it) or NUMERIC.
+# ROUND and ::int round half away from zero like numeric does; the few rows that land (within float error) on a tie
+# are evaluated again exactly with Decimal.
+##
+sql_param = re.compile(r'%\((\w+)\)s')
+sql_max = re.compile(r'\bmax\s*\(\s*(?:base\.)?(\w+)\s*\)', re.I)
+sql_alias = re.compile(r'\b(base|start|pldp|totals)\.(\w+)')
+sql_token = re.compile(r'\s*(?:(\d+\.\d*|\.\d+|\d+)|([A-Za-z_]\w*)|(::|[-+*/^(),]))')
+sql_unsupported = re.compile(r'\bcast\s*\(|\bcase\b|\bcount\s*\(|\bavg\s*\(|\bmin\s*\(', re.I)
+translated_fields = dict()
+
+# Binary operators: symbol -> precedence, all left associative. Unary minus binds tighter than any of them.
+SQL_OPERATORS = {'+': 1, '-': 1, '*': 2, '/': 2, '^': 3}
+# Functions: name -> (min arguments, max arguments)
+SQL_FUNCTIONS = {'sum': (1, 1), 'round': (1, 2), 'nullif': (2, 2), 'coalesce': (1, 8)}
+# Kinds of values, a binary operation is of the lesser kind of its operands
+NUMERIC, WHOLE, INTEGER = 0, 1, 2
+# Casts: type -> integer (True), numeric (False) or double precision (None)
+SQL_CASTS = {'int': True, 'integer': True, 'bigint': True, 'smallint': True, 'numeric': False, 'decimal': False, 'float': None, 'real': None}
+# Distance from .5 (in units of the last rounded digit) within which a float result is re-evaluated exactly
+ROUND_TIE_WINDOW = 1e-6
+
+# (tree, names) for an aggregate SQL expression, None if it can not be evaluated from window sums
+def translate_field(sql):
+    if (sql not in translated_fields):
+        translated_fields[sql] = compile_field(sql)
+    return translated_fields[sql]
+
+def compile_field(sql):
+    if (sql_unsupported.search(sql)):
+        return None
+    if (any(match.group(1) not in SEASON_CONSTANTS for match in sql_max.finditer(sql))):
+        return None
+
+    expression = sql_param.sub(r'\1', sql)
+    expression = sql_max.sub(r'max_\1', expression)
+    expression = sql_alias.sub(lambda match: match.group(2) if match.group(1) == 'base' else f'{match.group(1)}_{match.group(2)}', expression)
+
+    try:
+        tree = FieldParser(tokenize_field(expression)).parse()
+    except ValueError:
+        return None
+
+    names = list()
+    collect_names(tree, names)
+    return (tree, names)
+
+def tokenize_field(expression):
+    tokens = list()
+    position = 0
+    expression = expression.strip()
+    while (position < len(expression)):
+        match = sql_token.match(expression, position)
+        if (match is None or match.end() == position):
+            raise ValueError(f'Unsupported SQL at {expression[position:]}')
+        number, name, symbol = match.groups()
+        tokens.append(('num', number) if number else ('name', name) if name else ('symbol', symbol))
+        position = match.end()
+    return tokens
+
+# Precedence climbing parser producing ('num', value, integer), ('name', name), ('neg', node),
+# ('op', symbol, left, right), ('call', function, [nodes]) and ('cast', integer, node) trees
+class FieldParser():
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def parse(self):
+        node = self.expression(1)
+        if (self.position != len(self.tokens)):
+            raise ValueError('Trailing SQL')
+        return node
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, kind=None, value=None):
+        token = self.peek()
+        if (token[0] is None or (kind and token[0] != kind) or (value and token[1] != value)):
+            raise ValueError(f'Expected {value or kind}')
+        self.position += 1
+        return token
+
+    def expression(self, precedence):
+        node = self.unary()
+        while (self.peek()[0] == 'symbol' and SQL_OPERATORS.get(self.peek()[1], 0) >= precedence):
+            symbol = self.take()[1]
+            node = ('op', symbol, node, self.expression(SQL_OPERATORS[symbol] + 1))
+        return node
+
+    def unary(self):
+        if (self.peek() == ('symbol', '-')):
+            self.take()
+            return ('neg', self.unary())
+        if (self.peek() == ('symbol', '+')):
+            self.take()
+            return self.unary()
+        return self.postfix(self.primary())
+
+    def postfix(self, node):
+        while (self.peek() == ('symbol', '::')):
+            self.take()
+            name = self.take('name')[1].lower()
+            if (name not in SQL_CASTS):
+                raise ValueError(f'Unsupported cast {name}')
+            node = ('cast', SQL_CASTS[name], node)
+        return node
+
+    def primary(self):
+        kind, value = self.take()
+        if (kind == 'num'):
+            return ('num', Decimal(value), '.' not in value)
+        if ((kind, value) == ('symbol', '(')):
+            node = self.expression(1)
+            self.take('symbol', ')')
+            return node
+        if (kind != 'name'):
+            raise ValueError(f'Unexpected {value}')
+        if (self.peek() != ('symbol', '(')):
+            return ('name', value)
+
+        function = value.lower()
+        if (function not in SQL_FUNCTIONS):
+            raise ValueError(f'Unsupported function {value}')
+        self.take()
+        args = [self.expression(1)]
+        while (self.peek() == ('symbol', ',')):
+            self.take()
+            args.append(self.expression(1))
+        self.take('symbol', ')')
+
+        low, high = SQL_FUNCTIONS[function]
+        if (not low <= len(args) <= high or (function == 'round' and len(args) == 2 and args[1][0] != 'num')):
+            raise ValueError(f'Unsupported arguments to {value}')
+        return ('call', function, args)
+
+def collect_names(node, names):
+    if (node[0] == 'name'):
+        if (node[1] not in names):
+            names.append(node[1])
+        return
+    for child in node[1:]:
+        if (isinstance(child, tuple)):
+            collect_names(child, names)
+        elif (isinstance(child, list)):
+            for arg in child:
+                collect_names(arg, names)
+
+# Daily table columns the given aggregate SQL expressions sum
+def get_measures(sqls):
+    measures = list()
+    for sql in sqls:
+        field = translate_field(sql)
+        if (field is None):
+            continue
+        for name in field[1]:
+            if (not name.startswith(('max_', 'start_', 'pldp_', 'totals_', 'league_')) and name not in measures):
+                measures.append(name)
+    return measures
+
+# Evaluate a translated field for `size` rows. names maps every name of the field to an array or a scalar and
+# integers are the names holding whole numbers.
+def evaluate_field(field, names, integers, size):
+    ties = np.zeros(size, dtype=bool)
+    with np.errstate(all='ignore'):
+        value, kind = evaluate_vector(field[0], names, integers, ties)
+        value = np.array(np.broadcast_to(value, (size,)), dtype=float)
+    value[np.isinf(value)] = np.nan
+
+    for row in np.flatnonzero(ties):
+        exact = evaluate_scalar(field[0], names, integers, row)
+        value[row] = np.nan if exact is None else float(exact)
+
+    if (kind != NUMERIC and not np.isnan(value).any()):
+        return value.astype(np.int64)
+    return value
+
+# (float array or scalar, kind) of a node
+def evaluate_vector(node, names, integers, ties):
+    kind = node[0]
+    if (kind == 'num'):
+        return float(node[1]), INTEGER if node[2] else NUMERIC
+    if (kind == 'name'):
+        return np.asarray(names[node[1]], dtype=float), WHOLE if node[1] in integers else NUMERIC
+    if (kind == 'neg'):
+        value, value_kind = evaluate_vector(node[1], names, integers, ties)
+        return -value, value_kind
+    if (kind == 'cast'):
+        value, value_kind = evaluate_vector(node[2], names, integers, ties)
+        if (node[1]):
+            return (value if value_kind == INTEGER else round_half_away(value, 0, ties)), INTEGER
+        return value, min(value_kind, WHOLE) if node[1] is False else NUMERIC
+    if (kind == 'op'):
+        left, left_kind = evaluate_vector(node[2], names, integers, ties)
+        right, right_kind = evaluate_vector(node[3], names, integers, ties)
+        value_kind = min(left_kind, right_kind)
+        if (node[1] == '+'):
+            return left + right, value_kind
+        if (node[1] == '-'):
+            return left - right, value_kind
+        if (node[1] == '*'):
+            return left * right, value_kind
+        if (node[1] == '/'):
+            return (np.trunc(left / right), INTEGER) if value_kind == INTEGER else (left / right, NUMERIC)
+        return np.power(left, right), NUMERIC
+
+    function, args = node[1], node[2]
+    values = [evaluate_vector(arg, names, integers, ties) for arg in args]
+    if (function == 'sum'):
+        return values[0]
+    if (function == 'round'):
+        digits = int(args[1][1]) if len(args) == 2 else 0
+        return round_half_away(values[0][0], digits, ties), NUMERIC
+    if (function == 'nullif'):
+        return np.where(values[0][0] == values[1][0], np.nan, values[0][0]), values[0][1]
+    # coalesce
+    value = values[-1][0]
+    for other, other_kind in reversed(values[:-1]):
+        value = np.where(np.isnan(other), value, other)
+    return value, min(value_kind for other, value_kind in values)
+
+# Postgres rounds numerics half away from zero. Rows that are a tie within float error are flagged in ties.
+def round_half_away(value, digits, ties):
+    scale = 10.0 ** digits
+    scaled = np.abs(value) * scale
+    whole = np.floor(scaled)
+    fraction = scaled - whole
+    ties |= np.broadcast_to(np.abs(fraction - 0.5) < ROUND_TIE_WINDOW, ties.shape)
+    return np.sign(value) * np.where(fraction >= 0.5, whole + 1, whole) / scale
+
+# Exact value of a node for one row, as int (integer), Decimal (numeric), float (double precision) or None (NULL)
+def evaluate_scalar(node, names, integers, row):
+    with localcontext() as context:
+        context.prec = 40
+        return evaluate_exact(node, names, integers, row)
+
+def evaluate_exact(node, names, integers, row):
+    kind = node[0]
+    if (kind == 'num'):
+        return int(node[1]) if node[2] else node[1]
+    if (kind == 'name'):
+        value = names[node[1]]
+        value = float(value[row] if np.ndim(value) else value)
+        if (np.isnan(value)):
+            return None
+        return Decimal(int(value)) if node[1] in integers else Decimal(repr(value))
+
+    values = [evaluate_exact(child, names, integers, row) for child in (node[2] if kind == 'call' else [node[-1]] if kind in ['neg', 'cast'] else node[2:])]
+    if (kind == 'call' and node[1] == 'coalesce'):
+        return next((value for value in values if value is not None), None)
+    if (kind == 'call' and node[1] == 'nullif'):
+        return None if values[0] is None or values[0] == values[1] else values[0]
+    if (values[0] is None or (len(values) > 1 and kind == 'op' and values[1] is None)):
+        return None
+
+    if (kind == 'neg'):
+        return -values[0]
+    if (kind == 'cast'):
+        if (node[1]):
+            return int(to_decimal(values[0]).quantize(Decimal(1), ROUND_HALF_UP))
+        return to_decimal(values[0]) if node[1] is False else float(values[0])
+    if (kind == 'call'):
+        if (node[1] == 'sum'):
+            return values[0]
+        digits = values[1] if len(values) == 2 else 0
+        return to_decimal(values[0]).quantize(Decimal(1).scaleb(-digits), ROUND_HALF_UP)
+
+    left, right = values
+    if (isinstance(left, float) or isinstance(right, float)):
+        left, right = float(left), float(right)
+    elif (isinstance(left, Decimal) or isinstance(right, Decimal)):
+        left, right = Decimal(left), Decimal(right)
+    if (node[1] == '+'):
+        return left + right
+    if (node[1] == '-'):
+        return left - right
+    if (node[1] == '*'):
+        return left * right
+    if (node[1] == '/'):
+        if (right == 0):
+            return None
+        if (isinstance(left, int) and isinstance(right, int)):
+            quotient = abs(left) // abs(right)
+            return quotient if (left < 0) == (right < 0) else -quotient
+        return left / right
+    if (isinstance(left, int) and isinstance(right, int)):
+        return float(left) ** float(right)
+    return left ** right
+
+def to_decimal(value):
+    return Decimal(repr(value)) if isinstance(value, float) else Decimal(value)
+
+def to_day(value):
+    return int(np.datetime64(str(value)[:10], 'D').astype(np.int64))
+
+def to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def fetch_cube_rows(table, cells, measures, season):
+    columns = cells + ['game_played'] + PERIOD_COLUMNS
+    selections = [f'{sql} AS {measure}' for measure, sql in measures.items()] + ['count(*) AS cube_rows']
+    query = (f"SELECT {', '.join(columns + selections)} FROM {table} WHERE year_played = %(year)s "
+             f"GROUP BY {', '.join(columns)}")
+    return fetch_dataframe(query, {'year': season})
+
+##
+# Per worker registry, one cube per season that is rebuilt when the leaderboard data version changes. Cubes are
+# built on a single background thread (per pid, like the connection pools) so no request waits for a season to load;
+# requests arriving meanwhile get None and use SQL until the new cube is ready. A failed build is not retried for
+# the same data version until LEADERBOARD_CUBE_RETRY seconds have passed, so a persistent failure costs one season
+# load per interval instead of one per request.
+##
+leaderboard_cubes = dict()
+leaderboard_cubes_lock = threading.Lock()
+cube_builds = dict()
+# season -> (version, time.monotonic() of the failure)
+cube_failures = dict()
+cube_executors = dict()
+
+def get_cube_executor():
+    pid = os.getpid()
+
+    if (pid not in cube_executors):
+        with leaderboard_cubes_lock:
+            if (pid not in cube_executors):
+                cube_executors.clear()
+                cube_builds.clear()
+                cube_failures.clear()
+                cube_executors[pid] = ThreadPoolExecutor(max_workers=1, thread_name_prefix='leaderboard-cube')
+
+    return cube_executors[pid]
+
+def get_leaderboard_cube(season, version, measures):
+    cube = leaderboard_cubes.get(str(season))
+    if (cube is not None and cube.version == version):
+        return cube
+
+    schedule_cube_build(str(season), version, measures)
+    return None
+
+def schedule_cube_build(season, version, measures):
+    executor = get_cube_executor()
+    retry = float(current_app.config.get('LEADERBOARD_CUBE_RETRY'))
+    with leaderboard_cubes_lock:
+        if (cube_builds.get(season) == version):
+            return
+        failure = cube_failures.get(season)
+        if (failure is not None and failure[0] == version and time.monotonic() - failure[1] < retry):
+            return
+        cube_builds[season] = version
+
+    app = current_app._get_current_object()
+    executor.submit(build_cube, app, season, version, measures)
+
+def build_cube(app, season, version, measures):
+    with app.app_context():
+        try:
+            cube = leaderboard_cubes.get(season)
+            if (cube is None or cube.version != version):
+                leaderboard_cubes[season] = LeaderboardCube(season, version, measures)
+            cube_failures.pop(season, None)
+        except Exception:
+            app.logger.exception(f'Building the leaderboard cube for {season} failed')
+            cube_failures[season] = (version, time.monotonic())
+        finally:
+            with leaderboard_cubes_lock:
+                if (cube_builds.get(season) == version):
+                    del cube_builds[season]
@@ -1,104 +1,46 @@
 import pandas as pd
-import os
-import psycopg2
+from helpers import fetch_dataframe
 import json
 from functools import reduce
 
 def Pitcher(player_id, leaderboard):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-
-    if(leaderboard == "Advanced"):
-        cursor.execute("select * from leaderboard_annual_advanced_pitcher \
-                        where pitchermlbamid = %s", [player_id])
-    elif(leaderboard == "Approach"):
-        cursor.execute("select * from leaderboard_annual_approach_pitcher \
-                        where pitchermlbamid = %s", [player_id])
-    elif(leaderboard == "Discipline"):
-        cursor.execute("select * from leaderboard_annual_discipline_pitcher \
-                        where pitchermlbamid = %s", [player_id])
-    elif(leaderboard == "Batted"):
-        cursor.execute("select * from leaderboard_annual_batted_pitcher \
-                        where pitchermlbamid = %s", [player_id])
-    elif(leaderboard == "Standard"):
-        cursor.execute("select * from leaderboard_annual_standard_pitcher \
-                        where pitchermlbamid = %s", [player_id])
-    elif(leaderboard == "Overview"):
-        cursor.execute("select * from leaderboard_annual_overview_pitcher \
-                        where pitchermlbamid = %s", [player_id])
-
-    rows = cursor.fetchall()
-    colnames = [desc[0] for desc in cursor.description]
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    tables = {
+        'Advanced': 'leaderboard_annual_advanced_pitcher',
+        'Approach': 'leaderboard_annual_approach_pitcher',
+        'Discipline': 'leaderboard_annual_discipline_pitcher',
+        'Batted': 'leaderboard_annual_batted_pitcher',
+        'Standard': 'leaderboard_annual_standard_pitcher',
+        'Overview': 'leaderboard_annual_overview_pitcher'
+    }
+
+    adv_pt = fetch_dataframe(f'select * from {tables.get(leaderboard)} \
+                        where pitchermlbamid = %s', [player_id], True)
     return(adv_pt)
 
 def Hitter(player_id, leaderboard):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-
-    if(leaderboard == "Advanced"):
-        cursor.execute("select * from leaderboard_annual_advanced_hitter \
-                        where hittermlbamid = %s", [player_id])
-    elif(leaderboard == "Approach"):
-        cursor.execute("select * from leaderboard_annual_approach_hitter \
-                        where hittermlbamid = %s", [player_id])
-    elif(leaderboard == "Discipline"):
-        cursor.execute("select * from leaderboard_annual_discipline_hitter \
-                        where hittermlbamid = %s", [player_id])
-    elif(leaderboard == "Batted"):
-        cursor.execute("select * from leaderboard_annual_batted_hitter \
-                        where hittermlbamid = %s", [player_id])
-    elif(leaderboard == "Standard"):
-        cursor.execute("select * from leaderboard_annual_standard_hitter \
-                        where hittermlbamid = %s", [player_id])
-    elif(leaderboard == "Overview"):
-        cursor.execute("select * from leaderboard_annual_overview_hitter \
-                        where hittermlbamid = %s", [player_id])
-
-    rows = cursor.fetchall()
-    colnames = [desc[0] for desc in cursor.description]
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    tables = {
+        'Advanced': 'leaderboard_annual_advanced_hitter',
+        'Approach': 'leaderboard_annual_approach_hitter',
+        'Discipline': 'leaderboard_annual_discipline_hitter',
+        'Batted': 'leaderboard_annual_batted_hitter',
+        'Standard': 'leaderboard_annual_standard_hitter',
+        'Overview': 'leaderboard_annual_overview_hitter'
+    }
+
+    adv_pt = fetch_dataframe(f'select * from {tables.get(leaderboard)} \
+                        where hittermlbamid = %s', [player_id], True)
     return(adv_pt)
 
 def PitchType(player_id, leaderboard):
-    pl_host = os.getenv('PL_DB_HOST')
-    pl_db = os.getenv('PL_DB_DATABASE', 'pitcher-list')
-    pl_user = os.getenv('PL_DB_USER')
-    pl_password = os.getenv('PL_DB_PW')
-    db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-    cursor = db_connection.cursor()
-
-    if(leaderboard == "Advanced"):
-        cursor.execute("select * from leaderboard_annual_advanced_pitchtype \
-                        where pitchermlbamid = %s", [player_id])
-    elif(leaderboard == "Approach"):
-        cursor.execute("select * from leaderboard_annual_approach_pitchtype \
-                        where pitchermlbamid = %s", [player_id])
-    elif(leaderboard == "Discipline"):
-        cursor.execute("select * from leaderboard_annual_discipline_pitchtype \
-                        where pitchermlbamid = %s", [player_id])
-    elif(leaderboard == "Batted"):
-        cursor.execute("select * from leaderboard_annual_batted_pitchtype \
-                        where pitchermlbamid = %s", [player_id])
-    elif(leaderboard == "Standard"):
-        cursor.execute("select * from leaderboard_annual_standard_pitchtype \
-                        where pitchermlbamid = %s", [player_id])
-    elif(leaderboard == "Overview"):
-        cursor.execute("select * from leaderboard_annual_overview_pitcher_pitchtype \
-                        where pitchermlbamid = %s", [player_id])
-
-    rows = cursor.fetchall()
-    colnames = [desc[0] for desc in cursor.description]
-    adv_pt = pd.DataFrame(rows, columns = colnames)
-    db_connection.close()
+    tables = {
+        'Advanced': 'leaderboard_annual_advanced_pitchtype',
+        'Approach': 'leaderboard_annual_approach_pitchtype',
+        'Discipline': 'leaderboard_annual_discipline_pitchtype',
+        'Batted': 'leaderboard_annual_batted_pitchtype',
+        'Standard': 'leaderboard_annual_standard_pitchtype',
+        'Overview': 'leaderboard_annual_overview_pitcher_pitchtype'
+    }
+
+    adv_pt = fetch_dataframe(f'select * from {tables.get(leaderboard)} \
+                        where pitchermlbamid = %s', [player_id], True)
     return(adv_pt)
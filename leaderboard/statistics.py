@@ -0,0 +1,37 @@
+import pandas as pd
+from helpers.metrics import METRICS, compute_metrics
+
+##
+# Derived leaderboard statistics.
+# The leaderboards pick their statistics by name from the helpers.metrics METRICS registry and compute them over
+# whole columns with compute_metrics, replacing the row-wise DataFrame.apply calls. A zero denominator yields NaN
+# and NaN inputs propagate, like the scalar metrics.
+##
+# Pitch leaderboard only
+PITCH_LEADERBOARD_STATISTICS = ['usage_pct']
+
+# Pitcher and hitter leaderboards only
+PLAYER_LEADERBOARD_STATISTICS = ['fastball_pct', 'early_secondary_pct', 'late_secondary_pct']
+
+# Statistics shared by the pitch, pitcher and hitter leaderboards: every frame metric but wOBA, which needs the
+# season (see woba_statistic), and the ones above
+LEADERBOARD_STATISTICS = [name for name in METRICS if name != 'woba' and name not in PITCH_LEADERBOARD_STATISTICS + PLAYER_LEADERBOARD_STATISTICS]
+
+def get_statistics(leaderboard):
+    statistics = list(LEADERBOARD_STATISTICS)
+
+    if leaderboard == 'pitch':
+        statistics.extend(PITCH_LEADERBOARD_STATISTICS)
+    elif leaderboard in ['pitcher', 'hitter']:
+        statistics.extend(PLAYER_LEADERBOARD_STATISTICS)
+
+    return statistics
+
+# Compute the named statistics over a frame, constants are passed on to compute_metrics
+def apply_statistics(frame, statistics, **constants):
+    return compute_metrics(frame, statistics, **constants)
+
+# wOBA for a season. at_bats are the columns summed into at bats, the pitch leaderboard derives them from outs + hits.
+def woba_statistic(frame, year, at_bats=['num_ab']):
+    num_ab = sum(pd.to_numeric(frame[column], errors='coerce').astype(float) for column in at_bats)
+    return apply_statistics(frame, ['woba'], year=year, num_ab=num_ab)
@@ -1,6 +1,23 @@
 from flask import current_app, request
 import json as json
 
+# Load the per worker registries (players/teams dimension tables and the leaderboard constants) ahead of traffic.
+# Called once in the gunicorn master (see gunicorn.conf.py) so forked workers share them copy-on-write. Anything that
+# fails here, e.g. while the database is unavailable, is loaded lazily by the first request that needs it instead.
+def prefetch_resources(app):
+    from helpers import get_dimension_tables, preload_year_constants, close_pools
+    from .leaderboard import Leaderboard
+
+    with app.app_context():
+        try:
+            get_dimension_tables()
+            preload_year_constants(Leaderboard.valid_years, Leaderboard().data_version())
+        except Exception as error:
+            app.logger.warning(f'Startup prefetch failed, loading on first use instead: {error}')
+
+    # The master never serves requests, so its connections are not handed down to the workers
+    close_pools()
+
 # Endpoints for current corresponding Resources found in `/resources/`
 def init_resource_endpoints():
     # Import after current app has been setup to use @current_app.cache.cached decorator
@@ -10,7 +27,7 @@ def init_resource_endpoints():
     from .team import Team
     from .standings import Standings
     from .league import League
-    from .util import Status, ClearCache
+    from .util import Status, ClearCache, PoolStats
     from .leaderboard import Leaderboard
     from .auction import Auction
 
@@ -92,8 +109,9 @@ def init_resource_endpoints():
     current_app.api.add_resource(Team, *v4_team_routes, endpoint='team')
     current_app.api.add_resource(League, *v4_league_routes, endpoint='league')
     current_app.api.add_resource(Auction, *v4_auction_routes, endpoint = 'auction')
-    
+
     # Utility Endpoints
     current_app.api.add_resource(Status, '/')
     current_app.api.add_resource(ClearCache, '/Clear_Cache')
+    current_app.api.add_resource(PoolStats, '/Pool_Stats')
     
\ No newline at end of file
@@ -2,22 +2,23 @@ from signal import raise_signal
 from flask import current_app, Flask, request
 from flask_restful import Resource
 import pandas as pd
+import numpy as np
 from pandas import DataFrame
 from errorhandler.errorhandler import InvalidUsage
-from helpers import fetch_dataframe, get_team_info, weightedonbasepercentage, var_dump
-from cache import cache_timeout, cache_invalidate_hour
+from helpers import fetch_dataframe, fetch_parallel, validate_team, get_year_constants, join_player_teams, get_compiled_query, get_where_clause, weightedonbasepercentage, var_dump
+from leaderboard import get_leaderboard_cube, get_measures
+from cache import cache_timeout, cache_invalidate_hour, cached_response, fetch_cached, get_data_version
 from datetime import date, datetime
 from webargs import fields, validate
 from webargs.flaskparser import use_kwargs, parser, abort
 import json as json
+import heapq
 from marshmallow import Schema, fields
 
 ##
 # This is the flask_restful Resource Class for the Leaderboard API.
 ##
 class Leaderboard(Resource):
-    teams = get_team_info()
-    valid_teams = list(teams.keys())
     valid_years = ['2021', '2022']
     current_date = date.today()
     pitch_estimator_constants_fields = ["woba","woba_scale","woba_bb","woba_hbp","woba_single","woba_double","woba_triple","woba_home_run","fip_constant"]
@@ -25,6 +26,14 @@ class Leaderboard(Resource):
     mv_league_stats_averages_fields = ["pitch_count", "ip", "era", "whip", "fip_constant", "woba_pct", "x_woba", "hr_flyball_pct"]
     league_average_constants = {}
 
+    # Changes whenever the nightly load writes to the leaderboard tables, cached results are keyed on it.
+    data_version_query = ("SELECT concat((SELECT max(game_played) FROM pl_leaderboard_daily), '-', "
+                          "(SELECT coalesce(sum(n_tup_ins + n_tup_upd + n_tup_del), 0) FROM pg_stat_user_tables "
+                          "WHERE relname LIKE 'pl_leaderboard_daily%%' OR relname LIKE 'mv_%%' OR relname IN ('players', 'teams', 'projections'))) AS version")
+
+    # Request args bound as query parameters, their presence (not their values) decides the shape of the SQL
+    query_params = ['year', 'month', 'half', 'arbitrary_start', 'arbitrary_end', 'handedness', 'opponent_handedness', 'league', 'division', 'team', 'home_away']
+
     woba_list = ['num_ab', 'num_bb', 'num_ibb', 'num_hbp', 'num_sacrifice_fly', 'num_1b', 'num_2b', 'num_3b', 'num_hr']
     leaderboard_kwargs = {
         "leaderboard" : fields.Str(required=False, missing="pitcher", validate=validate.OneOf(["pitcher", "pitch", "hitter"])),
@@ -33,15 +42,35 @@ class Leaderboard(Resource):
         "opponent_handedness": fields.Str(required=False, missing="NA", validate=validate.OneOf(["R","L","NA"])),
         "league": fields.Str(required=False, missing="NA", validate=validate.OneOf(["AL","NL","NA"])),
         "division": fields.Str(required=False, missing="NA", validate=validate.OneOf(["East","Central","West","NA"])),
-        "team": fields.Str(required=False, missing="NA", validate=validate.OneOf(valid_teams + ['NA'])),
+        "team": fields.Str(required=False, missing="NA", validate=validate_team()),
         "home_away": fields.Str(required=False, missing="NA", validate=validate.OneOf(["Home","Away","NA"])),
         "year": fields.Str(required=False, missing="2022"),
         "month": fields.Str(required=False, missing="NA", validate=validate.OneOf(["1","2","3","4","5","6","7","8","9","10","11","12","NA"])),
         "half": fields.Str(required=False, missing="NA", validate=validate.OneOf(["First","Second","NA"])),
         "arbitrary_start": fields.Str(required=False, missing="NA"), #ISO date format
-        "arbitrary_end": fields.Str(required=False, missing="NA") #ISO date format
+        "arbitrary_end": fields.Str(required=False, missing="NA"), #ISO date format
+        # Applied to the cached full leaderboard, see get_page
+        "sort": fields.Str(required=False, missing="NA"),
+        "order": fields.Str(required=False, missing="desc", validate=validate.OneOf(["asc", "desc"])),
+        "limit": fields.Int(required=False, missing=None, validate=validate.Range(min=1)),
+        "offset": fields.Int(required=False, missing=0, validate=validate.Range(min=0)),
+        "min_pa": fields.Float(required=False, missing=None),
+        "min_ip": fields.Float(required=False, missing=None),
+        "min_pitches": fields.Float(required=False, missing=None),
+        # Comma separated aggregate fields to return (plus the player columns), NA for the whole tab
+        "fields": fields.Str(required=False, missing="NA")
+    }
+
+    # Projection columns sent as strings with a fixed number of decimals
+    projection_formats = {
+        'pitcher': {'era': 2, 'whip': 2, 'wp': 2},
+        'hitter': {'on_base_percentage': 3, 'batting_average': 3, 'slugging': 3, 'on_base_plus_slugging': 3}
     }
 
+    # Request args that select rows of a leaderboard rather than change it, and the fields the qualifiers apply to
+    page_params = ['sort', 'order', 'limit', 'offset', 'min_pa', 'min_ip', 'min_pitches']
+    qualifier_fields = {'min_pa': 'num_pa', 'min_ip': 'num_ip', 'min_pitches': 'num_pitches'}
+
     def __init__(self, *args, **kwargs):
 
         self.current_date = date.today()
@@ -63,9 +92,6 @@ class Leaderboard(Resource):
             'division': 'player_division', 
             'team': 'player_team_abb'
         }
-
-        # Filter conditions assume the `=` operator unless specified as a syntax value in this list
-        self.syntax_filters = ['game_played']
         
         # These are the columns for each leaderboard and tab.
         # [key][tab][col]
@@ -402,13 +428,7 @@ class Leaderboard(Resource):
                                     left join teams on teams.team_id = players.current_team_id
                                 where proj.ip_p > 0"""
 
-            pitcher_df = fetch_dataframe(pitcher_query)
-
-            for i, row in pitcher_df.iterrows():
-
-                pitcher_df.at[i, "era"] = "{:.2f}".format(row.get("era"))
-                pitcher_df.at[i, "whip"] = "{:.2f}".format(row.get("whip"))
-                pitcher_df.at[i, "wp"] = "{:.2f}".format(row.get("wp"))
+            pitcher_df = self.format_projections(fetch_dataframe(pitcher_query), lb_type)
 
             return json.loads(pitcher_df.to_json(orient='records'))
 
@@ -441,23 +461,32 @@ class Leaderboard(Resource):
                     left join teams on teams.team_id = players.current_team_id
                 where proj.pa_h > 0"""
 
-            df = fetch_dataframe(query)
-
-            for i, row in df.iterrows():
-                df.at[i, "on_base_percentage"] = "{:.3f}".format(row.get("on_base_percentage"))
-                df.at[i, "batting_average"] = "{:.3f}".format(row.get("batting_average"))
-                df.at[i, "slugging"] = "{:.3f}".format(row.get("slugging"))
-                df.at[i, "on_base_plus_slugging"] = "{:.3f}".format(row.get("on_base_plus_slugging"))
+            df = self.format_projections(fetch_dataframe(query), lb_type)
 
             return json.loads(df.to_json(orient='records'))
 
+    # Format the rate stats as fixed decimal strings, whole columns at a time
+    def format_projections(self, df, lb_type):
+        for column, decimals in self.projection_formats[lb_type].items():
+            values = df[column].to_numpy(dtype=float)
+            if (df[column].dtype == object):
+                # numeric columns arrive as Decimal, which format() rounds half to even
+                values = np.rint(np.round(values * 10 ** decimals, 6)) / 10 ** decimals
+            df[column] = np.char.mod(f'%.{decimals}f', values).astype(object)
+
+        return df
 
+
+    @cached_response(timeout=lambda: int(current_app.config.get('LEADERBOARD_CACHE_TIMEOUT')), version=lambda resource: resource.data_version())
     @use_kwargs(leaderboard_kwargs)
     def get(self, **kwargs):    
 
-        # if we're getting projection data, just return projections immediately
+        # Sorting, paging and qualifiers don't change the leaderboard, so they stay out of its cache key
+        page_args = {arg: kwargs.pop(arg) for arg in self.page_params if arg in kwargs}
+
+        # if we're getting projection data, just return projections immediately. They only depend on the leaderboard.
         if kwargs.get('tab') == 'projections':
-            return self.get_lb_projections(kwargs)
+            return self.get_page(self.fetch_result(kwargs.get('leaderboard'), leaderboard=kwargs.get('leaderboard'), tab='projections'), **page_args)
 
         start_year = None
         end_year = None
@@ -477,6 +506,7 @@ class Leaderboard(Resource):
 
         # Tab specific formats
         self.tab = kwargs['tab']
+        kwargs['fields'] = self.get_fields(kwargs.get('leaderboard'), self.tab, kwargs.get('fields', 'NA'))
         # Set woba on overview tab
         if (self.tab == 'overview'):
             if (self.query_year):
@@ -492,30 +522,96 @@ class Leaderboard(Resource):
 
         self.set_constants(self.query_year)  
         self.replace_constants()
-        return self.fetch_result(kwargs.get('leaderboard'), **kwargs)
+        return self.get_page(self.fetch_result(kwargs.get('leaderboard'), **kwargs), **page_args)
+
+    # Validate a `fields` projection against the fields the tab can aggregate. Returns it sorted and de-duplicated,
+    # so the same projection always compiles to the same SQL and cache key.
+    def get_fields(self, leaderboard, tab, fields):
+        if (fields == 'NA'):
+            return fields
+
+        tabs = [tab, 'games_overview_standard'] if leaderboard == 'pitcher' else [tab]
+        valid_fields = [field for tab in tabs for field in self.tab_display_fields[leaderboard][tab] if field in self.aggregate_fields]
+        requested = sorted(set(field.strip() for field in fields.split(',') if field.strip()))
+
+        invalid = [field for field in requested if field not in valid_fields]
+        if (invalid or not requested):
+            raise InvalidUsage(status_code=400, message=f"Invalid fields for the {leaderboard} {tab} tab: {', '.join(invalid)}", payload={"valid_fields": sorted(set(valid_fields))})
+
+        return ','.join(requested)
+
+    # The tab's display fields, narrowed to the requested `fields` if any
+    def get_display_fields(self, leaderboard, tab, kwargs):
+        display_fields = self.tab_display_fields[leaderboard][tab]
+        if (kwargs.get('fields', 'NA') == 'NA'):
+            return display_fields
+
+        requested = kwargs['fields'].split(',')
+        return [field for field in display_fields if field in requested]
+
+    # Filter, sort and slice a leaderboard (a list of row dicts). With a limit only the top offset + limit rows are
+    # selected (heapq, O(n log k)) instead of sorting every row. Missing values sort last in either order.
+    def get_page(self, results, sort='NA', order='desc', limit=None, offset=0, **qualifiers):
+        def get_value(value):
+            if (value is None or value == 'null'):
+                return None
+            try:
+                return float(value)
+            except (TypeError, ValueError):
+                return value
+
+        def validate_field(field, arg):
+            if (results and field not in results[0]):
+                raise InvalidUsage(status_code=400, message=f"Invalid {arg} for this leaderboard: {field}", payload={"valid_fields": list(results[0].keys())})
+
+        for arg, minimum in qualifiers.items():
+            if (minimum is not None):
+                field = self.qualifier_fields[arg]
+                validate_field(field, arg)
+                results = [row for row in results if (get_value(row.get(field)) or 0) >= minimum]
+
+        if (sort != 'NA'):
+            validate_field(sort, 'sort')
+
+            def key(row):
+                value = get_value(row.get(sort))
+                missing = (value is not None) if order == 'desc' else (value is None)
+                return (missing, isinstance(value, str), value if value is not None else 0)
+
+            if (limit):
+                select = heapq.nlargest if order == 'desc' else heapq.nsmallest
+                results = select(offset + limit, results, key=key)
+            else:
+                results = sorted(results, key=key, reverse=(order == 'desc'))
+
+        return results[offset:offset + limit] if limit else results[offset:]
 
     def set_constants(self, year):
-        
-        pec_table = fetch_dataframe(f"select * from pitch_estimator_constants pec where year = {year}")
-        for field in self.pitch_estimator_constants_fields:
-            self.pitch_estimator_constants[field] = str(pec_table[field][0])
+        # Served from the per worker registry, reloaded when the leaderboard data version changes
+        constants = get_year_constants(year, self.data_version())
 
-        mlsa_table = fetch_dataframe(f'select * from mv_league_stats_averages mlsa where mlsa.year_played = {year} and mlsa."position" = \'ALL\'')
-        for field in self.mv_league_stats_averages_fields:
-            self.league_average_constants[field] = str(mlsa_table[field][0])
+        self.pitch_estimator_constants = {field: constants['pitch_estimator'][field] for field in self.pitch_estimator_constants_fields}
+        self.league_average_constants = {field: constants['league_averages'][field] for field in self.mv_league_stats_averages_fields}
         
         
     # this ugly method is used to replace any and all relevant constants that are available and set in the method above. This is a replacement for performing sub-selects
+    # Constants are bound as query parameters (see get_query_params) so the SQL text does not change with the season.
     def replace_constants(self):
         
         # self.aggregate_fields['fip'] = self.aggregate_fields['fip'].replace("_self.pitch_estimator_constants.get('fip_constant')_", self.pitch_estimator_constants.get('fip_constant'))
         
-        self.aggregate_fields['x_era'] = self.aggregate_fields['x_era'].replace("_self.league_average_constants.get('era')_", self.league_average_constants.get('era'))
-        self.aggregate_fields['x_era'] = self.aggregate_fields['x_era'].replace("_self.league_average_constants.get('x_woba')_", self.league_average_constants.get('x_woba'))
+        self.aggregate_fields['x_era'] = self.aggregate_fields['x_era'].replace("_self.league_average_constants.get('era')_", '%(league_era)s::numeric')
+        self.aggregate_fields['x_era'] = self.aggregate_fields['x_era'].replace("_self.league_average_constants.get('x_woba')_", '%(league_x_woba)s::numeric')
 
         # self.aggregate_fields['x_fip'] = self.aggregate_fields['x_fip'].replace("_self.league_average_constants.get('hr_flyball_pct')_", self.league_average_constants.get('hr_flyball_pct'))
         # self.aggregate_fields['x_fip'] = self.aggregate_fields['x_fip'].replace("_self.pitch_estimator_constants.get('fip_constant')_", self.pitch_estimator_constants.get('fip_constant'))
 
+    def data_version(self):
+        def fetch():
+            return fetch_dataframe(self.data_version_query)['version'][0]
+
+        return get_data_version(self.__class__.__name__, fetch)
+
     def fetch_result(self, query_type, **query_args):
         # Caching wrapper for fetch_data
         result = None
@@ -528,35 +624,44 @@ class Leaderboard(Resource):
             cache_key_date = json.dumps(query_args)
             cache_key_resource_type = self.__class__.__name__
 
-            cache_key = f'{cache_key_resource_type}-{query_type}-{cache_key_date}'
-            result = current_app.cache.get(cache_key)
-            if (result is None):
+            cache_key_version = self.data_version()
 
+            cache_key = f'{cache_key_resource_type}-{query_type}-{cache_key_version}-{cache_key_date}'
+
+            def fetch():
+                if query_args.get('leaderboard') == 'pitcher' and query_args.get('tab') != 'projections': # and (query_args.get('tab') == 'overview' or query_args.get('tab') == "standard"):
+                    return self.handle_pitcher_overview_standard(**query_args)
                 
-                
-                if query_args.get('leaderboard') == 'pitcher': # and (query_args.get('tab') == 'overview' or query_args.get('tab') == "standard"):
-                    result = self.handle_pitcher_overview_standard(**query_args)
-                
-                else:
-                    result = self.fetch_data(query_type, **query_args)
-                # Set Cache expiration to 5 mins
-                current_app.cache.set(cache_key, result, 300)
+                return self.fetch_data(query_type, **query_args)
+
+            # Keys change with the data version, the timeout only bounds how long superseded versions linger
+            result = fetch_cached(cache_key, fetch, int(current_app.config.get('LEADERBOARD_CACHE_TIMEOUT')))
 
         return result
 
     def handle_pitcher_overview_standard(self, **query_args):
-        # fetch data from daily table: 
-        daily = self.fetch_data('pitcher', return_dataframe=True, **query_args)
+        # fetch data from daily table, from the in-process cube when it can serve it: 
+        daily = self.fetch_cube('pitcher', **query_args)
+        if (daily is None):
+            daily_query, daily_params = self.get_query('pitcher', **query_args)
 
         # fetch data from mv_pitcher_game_stats_for_leaderboard
         query_args['tab'] = 'games_overview_standard'
-        lb = self.fetch_data('pitcher',  return_dataframe=True, **query_args)
+        games_query, games_params = self.get_query('pitcher', **query_args)
+
+        # Both queries are compiled up front (compile_query works on self) and run concurrently
+        prepare = current_app.config.get('LEADERBOARD_PREPARED_STATEMENTS')
+        queries = {'games': lambda: fetch_dataframe(games_query, games_params, prepare=prepare)}
+        if (daily is None):
+            queries['daily'] = lambda: fetch_dataframe(daily_query, daily_params, prepare=prepare)
+
+        frames = fetch_parallel(queries)
+        daily = frames.get('daily', daily)
+        lb = frames['games']
 
         merged_df = pd.merge(daily, lb, how='inner', left_on=['player_id'], right_on =['player_id'])
 
-        player_team_query = "select t.abbreviation as player_team_abb, t.team_name as player_team, p.mlb_player_id from players p, teams t where p.current_team_id = t.team_id "
-        player_team_df = fetch_dataframe(player_team_query)
-        merged_player_df = pd.merge(merged_df, player_team_df, how = 'left', left_on=['player_id'], right_on = ['mlb_player_id'])
+        merged_player_df = join_player_teams(merged_df)
 
         results = self.format_results("pitcher", merged_player_df)
         output = self.get_json("pitcher", results, **query_args)
@@ -567,26 +672,75 @@ class Leaderboard(Resource):
         # return None
          
     def fetch_data(self, query_type, **query_args):
-        query = self.get_query(query_type, **query_args)
-        var_dump(query)
-        cursor_list = self.build_cursor_execute_list(query_type, **query_args)
-        raw = fetch_dataframe(query, cursor_list)
+        if (query_args.get('tab') == 'projections'):
+            return self.get_lb_projections(query_args)
+
+        raw = self.fetch_cube(query_type, **query_args)
+        if (raw is None):
+            query, params = self.get_query(query_type, **query_args)
+            var_dump(query)
+            raw = fetch_dataframe(query, params, prepare=current_app.config.get('LEADERBOARD_PREPARED_STATEMENTS'))
 
         #used for when we hit pitcher - overview or standard and need to concat results in python
         if(query_args.get("return_dataframe")):
             return raw
 
         ## same code as just above to tie a player team and player team abb to each player data object
-        player_team_query = "select t.abbreviation as player_team_abb, t.team_name as player_team, p.mlb_player_id from players p, teams t where p.current_team_id = t.team_id "
-        player_team_df = fetch_dataframe(player_team_query)
-        merged_player_df = pd.merge(raw, player_team_df, how = 'left', left_on=['player_id'], right_on = ['mlb_player_id'])
+        merged_player_df = join_player_teams(raw)
 
         results = self.format_results(query_type, merged_player_df)
         output = self.get_json(query_type, results, **query_args)
 
         return output
 
+    # Same frame as the SQL of get_query, computed from the per worker cube of LEADERBOARD_CUBE_YEAR (see
+    # leaderboard/cube.py). None when the cube is disabled, still loading or can not answer the request.
+    def fetch_cube(self, query_type, **query_args):
+        if (not current_app.config.get('LEADERBOARD_CUBE') or query_args.get('tab') == 'games_overview_standard'):
+            return None
+
+        season = str(current_app.config.get('LEADERBOARD_CUBE_YEAR') or max(self.valid_years))
+        if (query_args.get('arbitrary_start', 'NA') != 'NA' and query_args.get('arbitrary_end', 'NA') != 'NA'):
+            years = {query_args['arbitrary_start'][:4], query_args['arbitrary_end'][:4]}
+        else:
+            years = {query_args.get('year')}
+
+        if (years != {season} or self.get_table(query_args) != 'pl_leaderboard_daily'):
+            return None
+
+        cube = get_leaderboard_cube(season, self.data_version(), self.get_cube_measures())
+        if (cube is None):
+            return None
+
+        self.cols = self.get_cols(**query_args)
+        return cube.get_leaderboard(query_type, self.cols, self.get_conditions(**query_args), self.get_query_params(**query_args))
+
+    # Daily table columns summed by the fields of every pitching and hitting tab
+    def get_cube_measures(self):
+        def get_fields(leaderboards):
+            return [self.aggregate_fields[field] for leaderboard in leaderboards for tab, fields in self.tab_display_fields[leaderboard].items() if tab != 'games_overview_standard' for field in fields]
+
+        return {
+            'pitching': get_measures(get_fields(['pitch', 'pitcher'])),
+            'hitting': get_measures(get_fields(['hitter']))
+        }
+
     def get_query(self, query_type, **query_args):
+        # SQL only contains placeholders, so it is compiled once per shape and the args are bound as parameters
+        table = self.get_table(query_args)
+        shape = (query_type, self.tab, query_args.get('tab'), table, query_args.get('fields', 'NA'), tuple(query_args.get(arg, 'NA') != 'NA' for arg in self.query_params))
+        query = get_compiled_query(shape, lambda: self.compile_query(query_type, table, **query_args))
+
+        return query, self.get_query_params(**query_args)
+
+    def get_query_params(self, **query_args):
+        params = {arg: query_args[arg] for arg in self.query_params if query_args.get(arg, 'NA') != 'NA'}
+        params['league_era'] = self.league_average_constants.get('era')
+        params['league_x_woba'] = self.league_average_constants.get('x_woba')
+
+        return params
+
+    def compile_query(self, query_type, table, **query_args):
 
         # All leaderboards use dynamic sql generation created in v2.1
         # Refactored in v3 as resource class functions.
@@ -601,8 +755,6 @@ class Leaderboard(Resource):
         self.stmt = self.stmt[:-1]
 
         # Add table to select from
-
-        table = self.get_table(query_args)
         self.stmt = f"{self.stmt} FROM {table} base"
         conditions = self.get_conditions(**query_args)
         groups = self.get_groups(**query_args)
@@ -616,14 +768,7 @@ class Leaderboard(Resource):
             self.stmt = f'{self.stmt} {join_sql}'
 
             if conditions:
-                self.stmt = f"{self.stmt} WHERE"
-                for col, val in conditions.items():
-                    if (col in self.syntax_filters):
-                        self.stmt = f'{self.stmt} {col} {val} AND'
-                    else:
-                        self.stmt = f"{self.stmt} {col} = '{val}' AND"
-
-                self.stmt = self.stmt[:-3]
+                self.stmt = f'{self.stmt} {get_where_clause(conditions)}'
 
             self.stmt = f'{self.stmt} GROUP BY'
 
@@ -640,14 +785,7 @@ class Leaderboard(Resource):
             self.stmt = f'{self.stmt} {join_sql}'
 
             if conditions:
-                self.stmt = f"{self.stmt} WHERE"
-                for col, val in conditions.items():
-                    if (col in self.syntax_filters):
-                        self.stmt = f'{self.stmt} {col} {val} AND'
-                    else:
-                        self.stmt = f"{self.stmt} {col} = '{val}' AND"
-
-                self.stmt = self.stmt[:-3]
+                self.stmt = f'{self.stmt} {get_where_clause(conditions)}'
 
             self.stmt = f'{self.stmt} GROUP BY'
 
@@ -664,14 +802,7 @@ class Leaderboard(Resource):
             self.stmt = f'{self.stmt} {join_sql}'
             
             if conditions:
-                self.stmt = f"{self.stmt} WHERE"
-                for col, val in conditions.items():
-                    if (col in self.syntax_filters):
-                        self.stmt = f'{self.stmt} base.{col} {val} AND'
-                    else:
-                        self.stmt = f"{self.stmt} base.{col} = '{val}' AND"
-
-                self.stmt = self.stmt[:-3]
+                self.stmt = f"{self.stmt} {get_where_clause(conditions, 'base.')}"
             
             self.stmt = f'{self.stmt} GROUP BY'
 
@@ -685,14 +816,7 @@ class Leaderboard(Resource):
         def pitcher_games_overview_standard():
 
             if conditions:
-                self.stmt = f"{self.stmt} WHERE"
-                for col, val in conditions.items():
-                    if (col in self.syntax_filters):
-                        self.stmt = f'{self.stmt} {col} {val} AND'
-                    else:
-                        self.stmt = f"{self.stmt} {col} = '{val}' AND"
-
-                self.stmt = self.stmt[:-3]
+                self.stmt = f'{self.stmt} {get_where_clause(conditions)}'
 
             self.stmt = f'{self.stmt} GROUP BY'
 
@@ -776,22 +900,6 @@ class Leaderboard(Resource):
 
         return json_data.get(query_type, default)()
 
-    def build_cursor_execute_list(self, lb, **kwargs):
-        cursor_list = list()
-        args = [kwargs['year'], kwargs['month'], kwargs['half'], kwargs['arbitrary_start'], kwargs['arbitrary_end'], kwargs['handedness'], kwargs['opponent_handedness'], kwargs['league'], kwargs['division'], kwargs['team'], kwargs['home_away']]
-        join_args = [kwargs['year'], kwargs['month'], kwargs['half'], kwargs['arbitrary_start'], kwargs['arbitrary_end'], kwargs['home_away']]
-
-        if lb in ['pitch', 'pitcher']:
-            for arg in join_args:
-                if arg != 'NA':
-                    cursor_list.append(arg)
-
-        for arg in args:
-            if arg != 'NA':
-                cursor_list.append(arg)
-
-        return cursor_list
-
     def get_cols(self, **kwargs):
 
         leaderboard = kwargs.get('leaderboard')
@@ -811,7 +919,7 @@ class Leaderboard(Resource):
                 'num_starts': 'COALESCE(start.num_starts, 0)'
             }
 
-            for colname in self.tab_display_fields[leaderboard][self.tab]:
+            for colname in self.get_display_fields(leaderboard, self.tab, kwargs):
                 # if colname == 'woba':
                 #     for woba_variable in self.woba_list:
                 #         fields[woba_variable] = self.aggregate_fields[woba_variable]
@@ -839,7 +947,7 @@ class Leaderboard(Resource):
                 'pitchtype': 'pitchtype'
             }
 
-            for colname in self.tab_display_fields[leaderboard][self.tab]:
+            for colname in self.get_display_fields(leaderboard, self.tab, kwargs):
                 # if colname == 'woba':
                 #     for woba_variable in self.woba_list:
                 #         fields[woba_variable] = self.aggregate_fields[woba_variable]
@@ -866,7 +974,7 @@ class Leaderboard(Resource):
                 'player_home_away': 'hitter_home_away',
             }
 
-            for colname in self.tab_display_fields[leaderboard][self.tab]:
+            for colname in self.get_display_fields(leaderboard, self.tab, kwargs):
                 # if colname == 'woba':
                 #     for woba_variable in self.woba_list:
                 #         fields[woba_variable] = self.aggregate_fields[woba_variable]
@@ -888,7 +996,7 @@ class Leaderboard(Resource):
                 # "player_league": "pitcherleague"
             }
 
-            for colname in self.tab_display_fields[leaderboard]['games_overview_standard']:
+            for colname in self.get_display_fields(leaderboard, 'games_overview_standard', kwargs):
                 # if colname == 'woba':
                 #     for woba_variable in self.woba_list:
                 #         fields[woba_variable] = self.aggregate_fields[woba_variable]
@@ -935,33 +1043,33 @@ class Leaderboard(Resource):
         stmts = {}
 
         if (kwargs['arbitrary_start'] != 'NA' and kwargs['arbitrary_end'] != 'NA'):
-            stmts['game_played'] = f"BETWEEN {kwargs['arbitrary_start']} AND {kwargs['arbitrary_end']}"
+            stmts['game_played'] = ('arbitrary_start', 'arbitrary_end')
         elif (kwargs['year'] != 'NA'):
-            stmts['year_played'] = f"{kwargs['year']}"
+            stmts['year_played'] = 'year'
         
         if (kwargs['month'] != 'NA'):
-            stmts['month_played'] = f"{kwargs['month']}"
+            stmts['month_played'] = 'month'
 
         if (kwargs['half'] in ['First','Second']):
-            stmts['half_played'] = f"{kwargs['half']}"
+            stmts['half_played'] = 'half'
 
         if (kwargs.get('handedness') in ['L', 'R'] and kwargs.get('tab') != 'games_overview_standard'):
             if(kwargs.get('leaderboard') == 'hitter'):
-                stmts['hitterside'] = f"{kwargs.get('handedness')}"
+                stmts['hitterside'] = 'handedness'
             else:
-                stmts['pitcherside'] = f"{kwargs.get('handedness')}"
+                stmts['pitcherside'] = 'handedness'
 
         if (kwargs.get('opponent_handedness')  in ['L', 'R'] and kwargs.get('tab') != 'games_overview_standard'):
             if(kwargs.get('leaderboard') == 'hitter'):
-                stmts['hitterside'] = f"{kwargs.get('opponent_handedness')}"
+                stmts['hitterside'] = 'opponent_handedness'
             else:
-                stmts['pitcherside'] = f"{kwargs.get('opponent_handedness')}"
+                stmts['pitcherside'] = 'opponent_handedness'
 
         if (kwargs.get('home_away') in ['Home', 'Away'] and kwargs.get('tab') != 'games_overview_standard'):
             if(kwargs.get('leaderboard') == 'hitter'):
-                stmts['hitter_home_away'] = f"{kwargs.get('home_away')}"
+                stmts['hitter_home_away'] = 'home_away'
             else:
-                stmts['pitcher_home_away'] = f"{kwargs.get('home_away')}"
+                stmts['pitcher_home_away'] = 'home_away'
 
         # Iterate though our filters. Leaderboard specific cols have been included via the `get_cols()` method
         # Add the corresponding cols to the WHERE conditions
@@ -978,7 +1086,7 @@ class Leaderboard(Resource):
             if (kwargs[filter] != 'NA'):
 
                 key = self.cols[fieldname]
-                stmts[key] = f"{kwargs[filter]}"
+                stmts[key] = filter
 
         return stmts
 
@@ -1078,18 +1186,10 @@ class Leaderboard(Resource):
                 conditions.pop('pitcherside')  
 
             if conditions:
-                stmt = f"{stmt} WHERE"
-                for col, val in conditions.items():
-                    if (col in self.syntax_filters):
-                        stmt = f"{stmt} {col} {val} AND"
-                    else:
-                        stmt = f"{stmt} {col} = '{val}' AND"
-                        
+                stmt = f"{stmt} {get_where_clause(conditions)}"
+                for col in conditions:
                     groupby = f"{groupby}, {col}"
 
-
-                stmt = stmt[:-3]
-
             stmt = f'{stmt} GROUP BY pitchermlbamid{groupby} ) AS pldp ON pldp.player_id = base.pitchermlbamid'
 
             return stmt
@@ -1112,16 +1212,9 @@ class Leaderboard(Resource):
                 conditions.pop('pitcherside')  
  
             if conditions:
-                stmt = f"{stmt} WHERE"
-                for col, val in conditions.items():
-                    if (col in self.syntax_filters):
-                        stmt = f"{stmt} {col} {val} AND"
-                    else:
-                        stmt = f"{stmt} {col} = '{val}' AND"
-                        
+                stmt = f"{stmt} {get_where_clause(conditions)}"
+                for col in conditions:
                     groupby = f"{groupby}, {col}"
-                    
-                stmt = stmt[:-3]
 
             stmt = f"{stmt} GROUP BY pitchermlbamid{groupby}) AS start ON start.player_id = base.pitchermlbamid"
             
@@ -1138,15 +1231,9 @@ class Leaderboard(Resource):
             if conditions.get('pitcherside'):
                 conditions.pop('pitcherside')  
             if conditions:
-                stmt = f"{stmt} WHERE"
-                for col, val in conditions.items():
-                    if (col in self.syntax_filters):
-                        stmt = f"{stmt} {col} {val} AND"
-                    else:
-                        stmt = f"{stmt} {col} = '{val}' AND"
-                        
+                stmt = f"{stmt} {get_where_clause(conditions)}"
+                for col in conditions:
                     groupby = f"{groupby}, {col}"
-                stmt = stmt[:-3]
 
             stmt = f'{stmt} GROUP BY hitter_id{groupby} ) AS totals ON totals.hitter_id = base.hittermlbamid'
             
@@ -1,8 +1,8 @@
 from flask import current_app
 from flask_restful import Resource
 from numpy.core.records import record
-from helpers import fetch_dataframe, var_dump
-from cache import cache_timeout, cache_invalidate_hour
+from helpers import fetch_dataframe, fetch_parallel, index_records, var_dump
+from cache import cache_timeout, cache_invalidate_hour, cached_response, fetch_cached
 from datetime import date, datetime
 import json as json
 import pandas as pd
@@ -16,6 +16,7 @@ class League(Resource):
     def __init__(self):
         self.query_year = None
 
+    @cached_response()
     def get(self, query_type='NA', query_year='NA'):
         if (query_type == 'NA'):
             query_type = 'averages'
@@ -38,10 +39,7 @@ class League(Resource):
                 cache_key_year = 'all'
 
             cache_key = f'{cache_key_resource_type}-{query_type}-{cache_key_year}'
-            result = current_app.cache.get(cache_key)
-            if (result is None):
-                result = self.fetch_data(query_type, query_year)
-                current_app.cache.set(cache_key, result,cache_timeout(cache_invalidate_hour()))
+            result = fetch_cached(cache_key, lambda: self.fetch_data(query_type, query_year), cache_timeout(cache_invalidate_hour()))
 
         return result
 
@@ -596,17 +594,17 @@ class League(Resource):
     def fetch_averages_data(self, query_year):
         output_dict = {}
 
-        startingPitcherAveragesQuery = self.get_query('startingpitcheraverages', query_year)
-        startingPitcherAverages = fetch_dataframe(startingPitcherAveragesQuery, query_year)
+        # The averages queries are independent, run them concurrently
+        queries = {query_type: self.get_query(query_type, query_year) for query_type in ['startingpitcheraverages', 'reliefpitcheraverages', 'hitteraverages', 'wobaconstants']}
+        averages = fetch_parallel({query_type: (lambda query=query: fetch_dataframe(query, query_year)) for query_type, query in queries.items()})
+
+        startingPitcherAverages = averages['startingpitcheraverages']
         
         startingPitcherAverages.set_index(['year','pitchtype'], inplace=True)
         startingPitcherAverages.fillna(value=json.dumps(None), inplace=True)
-        sp_result_dict = json.loads(startingPitcherAverages.to_json(orient='index'))
 
         starting_pitcher_key = 'SP'
-        for keys, value in sp_result_dict.items():
-            # json coversion returns tuple string
-                key = eval(keys)
+        for key, value in index_records(startingPitcherAverages):
                 year = key[0]
                 if year not in output_dict:
                     output_dict[year] = {}
@@ -670,17 +668,13 @@ class League(Resource):
                 if pitch_key not in output_dict[year][starting_pitcher_key]['pitches']:
                     output_dict[year][starting_pitcher_key]['pitches'][pitch_key] = value
 
-        reliefPitcherAveragesQuery = self.get_query('reliefpitcheraverages', query_year)
-        reliefPitcherAverages = fetch_dataframe(reliefPitcherAveragesQuery, query_year)
+        reliefPitcherAverages = averages['reliefpitcheraverages']
 
         reliefPitcherAverages.set_index(['year','pitchtype'], inplace=True)
         reliefPitcherAverages.fillna(value=json.dumps(None), inplace=True)
-        rp_result_dict = json.loads(reliefPitcherAverages.to_json(orient='index'))
 
         relief_pitcher_key = 'RP'
-        for keys, value in rp_result_dict.items():
-            # json coversion returns tuple string
-                key = eval(keys)
+        for key, value in index_records(reliefPitcherAverages):
                 year = key[0]
                 if year not in output_dict:
                     output_dict[year] = {}
@@ -744,17 +738,13 @@ class League(Resource):
                 if pitch_key not in output_dict[year][relief_pitcher_key]['pitches']:
                     output_dict[year][relief_pitcher_key]['pitches'][pitch_key] = value
 
-        hitterAveragesQuery = self.get_query('hitteraverages', query_year)
-        hitterAverages = fetch_dataframe(hitterAveragesQuery, query_year)
+        hitterAverages = averages['hitteraverages']
         
         hitterAverages.set_index(['year'], inplace=True)
         hitterAverages.fillna(value=json.dumps(None), inplace=True)
-        h_result_dict = json.loads(hitterAverages.to_json(orient='index'))
 
         hitter_key = 'H'
-        for keys, value in h_result_dict.items():
-            # json coversion returns tuple string
-                year = keys
+        for year, value in index_records(hitterAverages):
                 if year not in output_dict:
                     output_dict[year] = {}
                 if hitter_key not in output_dict[year]:
@@ -763,15 +753,12 @@ class League(Resource):
                 if "total" not in output_dict[year][hitter_key]:
                     output_dict[year][hitter_key] = { 'total': value }
 
-        wobaConstantsQuery = self.get_query('wobaconstants', query_year)
-        wobaConstants = fetch_dataframe(wobaConstantsQuery, query_year)
+        wobaConstants = averages['wobaconstants']
         wobaConstants.set_index(['year'], inplace=True)
         wobaConstants.fillna(value=json.dumps(None), inplace=True)
-        woba_result_dict = json.loads(wobaConstants.to_json(orient='index'))
         
         woba_key = 'woba'
-        for keys, value in woba_result_dict.items():
-            year = keys
+        for year, value in index_records(wobaConstants):
             if year not in output_dict:
                 output_dict[year] = {}
             if woba_key not in output_dict[year]:
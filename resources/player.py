@@ -1,10 +1,14 @@
 from flask import current_app
 from flask_restful import Resource
 from sqlalchemy import false, true
-from helpers import fetch_dataframe, var_dump
-from cache import cache_timeout, cache_invalidate_hour
+from helpers import fetch_dataframe, fetch_parallel, index_records, var_dump
+from cache import cache_timeout, cache_invalidate_hour, cached_response, fetch_cached
+from errorhandler.errorhandler import InvalidUsage
+from webargs import fields
+from webargs.flaskparser import use_kwargs
 import json as json
 import pandas as pd
+import re
 
 ##
 # This is the flask_restful Resource Class for the player API.
@@ -12,8 +16,32 @@ import pandas as pd
 # `/player/${query_type}/${player_id}`
 # @param ${query_type}: ('bio'|'stats'|'gamelogs'|'positions'|'repertoire'|'abilities'|'locations'|'locationlogs'|'career'|'')
 # @param ${player_id}: ([0-9]*|'All')
+# stats and gamelogs take an optional `?fields=` list of columns to return.
 ##
 class Player(Resource):
+    # Rankings queries per role, the first one of each role is its pool lookup
+    ranks_datasets = {
+        'SP': ['startingpitcherpoolrankingslookup', 'startingpitchercustomrankings', 'startingpitcherpitchpoolrankingslookup', 'startingpitcherpitchcustomrankings'],
+        'RP': ['reliefpitcherpoolrankingslookup', 'reliefpitchercustomrankings', 'reliefpitcherpitchpoolrankingslookup', 'reliefpitcherpitchcustomrankings'],
+        'H': ['hitterpoolrankingslookup', 'hittercustomrankings']
+    }
+
+    # Columns a `fields` projection always keeps because the JSON is keyed on or built from them
+    projection_keys = {
+        'stats': ['pitchtype', 'year', 'split-RL', 'split-HA'],
+        'gamelogs': ['gameid', 'pitchtype', 'split-RL', 'year', 'game-type', 'gs', 'g', 'cg', 'w', 'l', 'sv', 'bsv', 'hld', 'qs', 'ip',
+                     'runs', 'earned_runs', 'rbi', 'sb', 'cs', 'pa', 'ab', 'lob', 'lob_pct', 'park', 'team-id', 'team', 'opponent-team-id',
+                     'opponent', 'game-date', 'team-result', 'runs-scored', 'opponent-runs-scored', 'batting-order-position', 'sho', 'era',
+                     'whip', 'x-era']
+    }
+    # Result columns of the projectable queries, keyed on their SQL
+    query_columns = dict()
+
+    player_kwargs = {
+        # Comma separated columns of stats/gamelogs to return (plus the projection keys), NA for all of them
+        "fields": fields.Str(required=False, missing="NA")
+    }
+
     def __init__(self):
         self.player_id = 'NA'
         self.first_name = ''
@@ -27,8 +55,14 @@ class Player(Resource):
         self.pitcher_depth_chart_position = ''
 
         self.career_stats = {}
+        self.fields = []
+
+    @cached_response()
+    @use_kwargs(player_kwargs)
+    def get(self, query_type='NA', player_id='NA', **kwargs):
+        if (kwargs['fields'] != 'NA'):
+            self.fields = sorted(set(field.strip() for field in kwargs['fields'].split(',') if field.strip()))
 
-    def get(self, query_type='NA', player_id='NA'):
         # We can have an empty query_type or player_id which return the collections of stats.
         if (query_type == 'NA' and (player_id == 'NA' or type(player_id) is int)):
             query_type = 'bio'
@@ -55,7 +89,17 @@ class Player(Resource):
             
 
 
-            self.career_stats = self.fetch_result('career', player_id)
+            # Both depend on bio (is_pitcher). Only stats is formatted with the career totals, anything else is
+            # fetched alongside career.
+            if (query_type in ['stats', 'career']):
+                self.career_stats = self.fetch_result('career', player_id)
+            else:
+                results = fetch_parallel({
+                    'career': lambda: self.fetch_result('career', player_id),
+                    query_type: lambda: self.fetch_result(query_type, player_id)
+                })
+                self.career_stats = results['career']
+                return results[query_type]
 
         return self.fetch_result(query_type, player_id)
 
@@ -75,10 +119,9 @@ class Player(Resource):
                 cache_key_player_id = 'all'
 
             cache_key = f'{cache_key_resource_type}-{query_type}-{cache_key_player_id}'
-            result = current_app.cache.get(cache_key)
-            if (result is None):
-                result = self.fetch_data(query_type, player_id)
-                current_app.cache.set(cache_key, result,cache_timeout(cache_invalidate_hour()))
+            if (self.fields and query_type in self.projection_keys):
+                cache_key = f"{cache_key}-fields-{','.join(self.fields)}"
+            result = fetch_cached(cache_key, lambda: self.fetch_data(query_type, player_id), cache_timeout(cache_invalidate_hour()))
 
         return result
     def fetch_data(self, query_type, player_id):
@@ -109,7 +152,8 @@ class Player(Resource):
         # Otherwise, use default query mapping
         else:
             query = self.get_query(query_type, player_id)
-
+            if (self.fields and query_type in self.projection_keys):
+                query = self.get_projected_query(query_type, query, query_var)
 
             raw = fetch_dataframe(query,query_var)
             results = self.format_results(query_type, raw)
@@ -2069,8 +2113,6 @@ class Player(Resource):
 
             output_dict = { 'player_id': player_id, 'is_pitcher': self.is_pitcher, 'is_hitter': self.is_hitter, 'is_active': self.is_active, 'logs': {} }
 
-            # Ensure we have valid data for NaN entries using json.dumps of Python None object
-            result_dict = json.loads(results.to_json(orient='index'))
             
             if (self.is_pitcher):
 
@@ -2078,10 +2120,7 @@ class Player(Resource):
                 # TODO: Add cols here that can safely be dropped as they are not used on the frontend.
                 #results.drop(columns=['start','sac','csw'], inplace=True)
 
-                for keys, value in result_dict.items():
-
-                    # json coversion returns tuple string
-                    key = eval(keys)
+                for key, value in index_records(results):
                     gameid_key = key[0]
                     if gameid_key not in output_dict['logs']:
                         output_dict['logs'][gameid_key] = { 'game': {
@@ -2161,10 +2200,7 @@ class Player(Resource):
                 return output_dict
 
             else:
-                for keys, value in result_dict.items():
-
-                    # json coversion returns tuple string
-                    key = eval(keys)
+                for key, value in index_records(results):
                     gameid_key = key[0]
                     if gameid_key not in output_dict['logs']:
                         output_dict['logs'][gameid_key] = { 'game': {
@@ -2223,11 +2259,8 @@ class Player(Resource):
         def locationlogs():
             output_dict = { 'player_id': player_id, 'is_pitcher': self.is_pitcher, 'is_hitter': self.is_hitter, 'is_active': self.is_active, 'logs': {} }
             results.fillna(value=0, inplace=True)
-            result_dict = json.loads(results.to_json(orient='index'))
             
-            for keys, value in result_dict.items():
-                # json coversion returns tuple string
-                key = eval(keys)
+            for key, value in index_records(results):
                 gameid_key = key[0]
                 if gameid_key not in output_dict['logs']:
                     output_dict['logs'][gameid_key] = {'pitches':{}}
@@ -2247,16 +2280,12 @@ class Player(Resource):
             # Ensure we have valid data for NaN entries using json.dumps of Python None object
             results.fillna(value=json.dumps(None), inplace=True)
 
-            result_dict = json.loads(results.to_json(orient='index'))
-
             if (self.is_pitcher):
                 # Sort our DataFrame so we have a prettier JSON format for the API
                 output_dict = { 'player_id': player_id, 'is_pitcher': self.is_pitcher, 'is_hitter': self.is_hitter, 'is_active': self.is_active, query_type: {'pitches':{}} }
 
                 # Make sure our index keys exist in our dict structure then push on our data values
-                for keys, value in result_dict.items():
-                    # json coversion returns tuple string
-                    key = eval(keys)
+                for key, value in index_records(results):
                     pitch_key = key[0].upper()
 
                     if pitch_key not in output_dict[query_type]['pitches']:
@@ -2278,9 +2307,7 @@ class Player(Resource):
                 output_dict = { 'player_id': player_id, 'is_pitcher': self.is_pitcher, 'is_hitter': self.is_hitter, 'is_active': self.is_active, query_type: {'pitches':{}} }
 
                 # Make sure our index keys exist in our dict structure then push on our data values
-                for keys, value in result_dict.items():
-                    # json coversion returns tuple string
-                    key = eval(keys)
+                for key, value in index_records(results):
                     pitch_key = key[0].upper()
 
                     if pitch_key not in output_dict[query_type]['pitches']:
@@ -2333,130 +2360,100 @@ class Player(Resource):
     
     def fetch_ranks_data(self, query_type, player_id):
         records = {}
+        datasets = self.fetch_ranks_datasets(player_id)
 
-        # Lookup if SP is ranked
-        startingPitcherRankingsLookupQuery = self.get_query('startingpitcherpoolrankingslookup', player_id)
-        startingPitcherRankingsLookup = fetch_dataframe(startingPitcherRankingsLookupQuery,player_id)
-        
-        # Only do SP calculations if there is SP data
-        if(not startingPitcherRankingsLookup.empty):
-            # Starting Pitcher Rankings Data
-            startingPitcherRankingsQuery = self.get_query('startingpitchercustomrankings', player_id)
-            startingPitcherRankings = fetch_dataframe(startingPitcherRankingsQuery, [player_id, player_id])
+        for role in ['SP', 'RP']:
+            lookup, rankings, pitch_lookup, pitch_rankings = [datasets[dataset] for dataset in self.ranks_datasets[role]]
+
+            # Only do SP/RP calculations if there is SP/RP data
+            if(not lookup.empty):
+                # Build SP/RP and SP/RP pitch dataframes
+                (rankings_df, pitch_rankings_df) = self.build_pitcher_rank_dataframe(lookup, rankings, pitch_lookup, pitch_rankings)
+
+                pitches = {}
+                for pitchrow in pitch_rankings_df.to_dict('records'):
+                    pitches.setdefault(pitchrow['year'], []).append(pitchrow)
 
-            # Lookup if SP pitch data is ranked
-            startingPitcherPitchRankingsLookupQuery = self.get_query('startingpitcherpitchpoolrankingslookup', player_id)
-            startingPitcherPitchRankingsLookup = fetch_dataframe(startingPitcherPitchRankingsLookupQuery,player_id)
+                # Create a row for each year
+                for year_data in rankings_df.drop_duplicates('year').to_dict('records'):
+                    year = year_data['year']
+                    year_model = self.build_pitcher_year_model(year, year_data, pitches.get(year, []))
 
-            # Starting Pitcher Pitch Rankings Data
-            startingPitcherPitchRankingsQuery = self.get_query('startingpitcherpitchcustomrankings', player_id)
-            startingPitcherPitchRankings = fetch_dataframe(startingPitcherPitchRankingsQuery, [player_id, player_id])
+                    if not str(year) in records:
+                        records[str(year)] = {}
+                    records[str(year)][role] = year_model
 
-            # Build SP and SP pitch dataframes
-            (sp_rankings_df, sp_pitch_rankings_df) = self.build_pitcher_rank_dataframe(startingPitcherRankingsLookup, startingPitcherRankings, startingPitcherPitchRankingsLookup, startingPitcherPitchRankings)
+        lookup, rankings = [datasets[dataset] for dataset in self.ranks_datasets['H']]
+
+        # Only do hitter calculations if there is hitter data
+        if(not lookup.empty):
+            hitter_rankings_df = self.build_hitter_rank_dataframe(lookup, rankings)
 
             # Create a row for each year
-            spYearGroupings = sp_rankings_df.groupby('year', sort=False)
-            for year, yearValues in spYearGroupings:
-                year_data = yearValues.iloc[0]
-                sp_year_model = self.build_pitcher_year_model(year, year_data, sp_pitch_rankings_df)
-                
-                if not str(year) in records:    
+            for year_data in hitter_rankings_df.drop_duplicates('year').to_dict('records'):
+                year = year_data['year']
+                hitter_year_model = self.build_hitter_year_model(year_data)
+
+                if not str(year) in records:
                     records[str(year)] = {}
-                records[str(year)]['SP'] = sp_year_model
+                records[str(year)]['H'] = hitter_year_model
 
-        # Lookup if RP is ranked
-        reliefPitcherRankingsLookupQuery = self.get_query('reliefpitcherpoolrankingslookup', player_id)
-        reliefPitcherRankingsLookup = fetch_dataframe(reliefPitcherRankingsLookupQuery,player_id)
+        return json.loads(json.dumps(records))
 
-        # Only do RP calculations if there is RP data
-        if(not reliefPitcherRankingsLookup.empty):
-            # Relief Pitcher Rankings Data
-            reliefPitcherRankingsQuery = self.get_query('reliefpitchercustomrankings', player_id)
-            reliefPitcherRankings = fetch_dataframe(reliefPitcherRankingsQuery, [player_id, player_id])
+    # Fetch every rankings dataset of a player in a single statement. Each query is aggregated to a JSON array and a
+    # role's ranking queries only run when the player is in that role's lookup (CASE evaluates its subquery lazily).
+    def fetch_ranks_datasets(self, player_id):
+        lookups = []
+        rankings = []
 
-            # Lookup if RP pitch data is ranked
-            reliefPitcherPitchRankingsLookupQuery = self.get_query('reliefpitcherpitchpoolrankingslookup', player_id)
-            reliefPitcherPitchRankingsLookup = fetch_dataframe(reliefPitcherPitchRankingsLookupQuery,player_id)
+        for role, query_types in self.ranks_datasets.items():
+            lookup = query_types[0]
+            lookups.append(f'(SELECT json_agg(q) FROM ({self.get_ranks_subquery(lookup, player_id)}) q) AS "{lookup}"')
 
-            # Relief Pitcher Pitch Rankings Data
-            reliefPitcherPitchRankingsQuery = self.get_query('reliefpitcherpitchcustomrankings', player_id)
-            reliefPitcherPitchRankings = fetch_dataframe(reliefPitcherPitchRankingsQuery, [player_id, player_id])
+            for query_type in query_types[1:]:
+                rankings.append(f'CASE WHEN "{lookup}" IS NOT NULL THEN (SELECT json_agg(q) FROM ({self.get_ranks_subquery(query_type, player_id)}) q) END AS "{query_type}"')
 
-            # Build RP and RP pitch dataframes
-            (rp_rankings_df, rp_pitch_rankings_df) = self.build_pitcher_rank_dataframe(reliefPitcherRankingsLookup, reliefPitcherRankings, reliefPitcherPitchRankingsLookup, reliefPitcherPitchRankings)
+        # OFFSET 0 keeps Postgres from inlining the lookups into every CASE
+        query = f'SELECT *, {", ".join(rankings)} FROM (SELECT {", ".join(lookups)} OFFSET 0) lookups'
+        row = fetch_dataframe(query, {'player_id': player_id}).iloc[0]
 
-            # Create a row for each year
-            rpYearGroupings = rp_rankings_df.groupby('year', sort=False)
-            for year, yearValues in rpYearGroupings:
-                year_data = yearValues.iloc[0]
-                rp_year_model = self.build_pitcher_year_model(year, year_data, rp_pitch_rankings_df)
-                
-                if not str(year) in records:    
-                    records[str(year)] = {}
-                records[str(year)]['RP'] = rp_year_model
+        return {dataset: pd.DataFrame(row[dataset] or []) for dataset in row.index}
 
-        # Lookup if hitter is ranked
-        hitterRankingsLookupQuery = self.get_query('hitterpoolrankingslookup', player_id)
-        hitterRankingsLookup = fetch_dataframe(hitterRankingsLookupQuery,player_id)
-        
-        # Only do RP calculations if there is RP data
-        if(not hitterRankingsLookup.empty):
-            # Hitter Pitcher Rankings Data
-            hitterRankingsQuery = self.get_query('hittercustomrankings', player_id)
-            hitterRankings = fetch_dataframe(hitterRankingsQuery, [player_id, player_id])
+    # The rankings queries take the player id as their only positional parameter
+    def get_ranks_subquery(self, query_type, player_id):
+        query = self.get_query(query_type, player_id).strip().rstrip(';')
+        return re.sub(r'(?<!%)%s', '%(player_id)s', query)
 
-            hitter_rankings_df = self.build_hitter_rank_dataframe(hitterRankingsLookup, hitterRankings)
+    # Select only the requested fields (plus the projection keys) from a stats/gamelogs query. Postgres drops the
+    # unused columns of the subquery, so they are neither computed nor sent.
+    def get_projected_query(self, query_type, query, query_var):
+        query = query.strip().rstrip(';')
+        if (query not in self.query_columns):
+            self.query_columns[query] = list(fetch_dataframe(f'SELECT * FROM ({query}) AS projection LIMIT 0', query_var).columns)
 
-            # Create a row for each year
-            hitterYearGroupings = hitter_rankings_df.groupby('year', sort=False)
-            for year, yearValues in hitterYearGroupings:
-                year_data = yearValues.iloc[0]
-                hitter_year_model = self.build_hitter_year_model(year_data)
-                
-                if not str(year) in records:    
-                    records[str(year)] = {}
-                records[str(year)]['H'] = hitter_year_model
+        columns = self.query_columns[query]
+        keys = self.projection_keys[query_type]
+        invalid = [field for field in self.fields if field not in columns]
+        if (invalid):
+            raise InvalidUsage(status_code=400, message=f"Invalid fields for {query_type}: {', '.join(invalid)}", payload={"valid_fields": [column for column in columns if column not in keys]})
 
-        return json.loads(json.dumps(records))
+        selections = ', '.join(f'"{column}"' for column in columns if column in keys or column in self.fields)
+        return f'SELECT {selections} FROM ({query}) AS projection'
 
     def build_pitcher_rank_dataframe(self, seasonRankingLookupData, seasonRankingData, pitchRankingLookupData, pitchRankingData):
-        rankings_df = pd.DataFrame()
+        # Yearly Total Rankings
+        rankings_df = self.join_rank_lookup(seasonRankingLookupData, seasonRankingData, ['year'], ['year'])
+
+        # Individual Pitch Rankings, only for years with a season ranking
         pitch_rankings_df = pd.DataFrame()
-        for index, row in seasonRankingLookupData.iterrows():
-            year = row['year']
-            
-            # Yearly Total Rankings
-            year_rankings = {}
-
-            qualified_rank = row['qualified_rank']
-            matchingdata = seasonRankingData[seasonRankingData.year == year]
-            # If there are zero or multiple matching records, do not attempt
-            if len(matchingdata) != 1:
-                continue
-            year_rankings = matchingdata.head(1)
-
-            year_rankings['is_qualified'] = not pd.isnull(qualified_rank) and not pd.isna(qualified_rank)
-
-            rankings_df = rankings_df.append(year_rankings,ignore_index=True)
-
-            # Individual Pitch Rankings
-            yearpitches = pitchRankingLookupData[pitchRankingLookupData.year_played == year]
-            for pitchindex, pitchrow in yearpitches.iterrows():
-                year_pitch_rankings = {}
-                pitchtype = pitchrow['pitchtype']
-                qualified_pitch_rank = pitchrow['qualified_rank']
-                isqualified = not pd.isnull(qualified_pitch_rank) and not pd.isna(qualified_pitch_rank)
-
-                matchingdata = pitchRankingData[(pitchRankingData.year == year) & (pitchRankingData.pitchtype == pitchtype)]
-                # If there are zero or multiple matching records, do not attempt
-                if len(matchingdata) != 1:
-                    continue
-                year_pitch_rankings = matchingdata.head(1)
-                year_pitch_rankings['is_qualified'] = bool(isqualified)
-
-                pitch_rankings_df = pitch_rankings_df.append(year_pitch_rankings,ignore_index=True)
-                
+        if (not rankings_df.empty):
+            pitchRankingLookupData = pitchRankingLookupData[pitchRankingLookupData.year_played.isin(rankings_df['year'])] if not pitchRankingLookupData.empty else pitchRankingLookupData
+            pitch_rankings_df = self.join_rank_lookup(pitchRankingLookupData, pitchRankingData, ['year_played', 'pitchtype'], ['year', 'pitchtype'])
+
+            # Keep the season order
+            year_order = {year: index for index, year in enumerate(rankings_df['year'].drop_duplicates())}
+            if (not pitch_rankings_df.empty):
+                pitch_rankings_df = pitch_rankings_df.iloc[pitch_rankings_df['year'].map(year_order).argsort(kind='mergesort')].reset_index(drop=True)
 
         rankings_df.fillna(value=0, inplace=True)            
         pitch_rankings_df.fillna(value=0, inplace=True)
@@ -2583,10 +2580,9 @@ class Player(Resource):
             sv_model['league-average-stat-percentile'] = float(year_data['league-sv-percentile'])
             year_model['sv'] = sv_model
 
-        matching_year_pitches = pitch_data[pitch_data.year == year]
         pitches_model = {}
         # Create a record for each pitch
-        for pitchindex, pitchrow in matching_year_pitches.iterrows():
+        for pitchrow in pitch_data:
             pitch_model = {}
             pitchtype = pitchrow['pitchtype']
             pitch_model['is-qualified'] = bool(pitchrow['is_qualified'])
@@ -2680,27 +2676,25 @@ class Player(Resource):
 
 
     def build_hitter_rank_dataframe(self, seasonRankingLookupData, seasonRankingData):
-        rankings_df = pd.DataFrame()
-        for index, row in seasonRankingLookupData.iterrows():
-            year = row['year']
-            
-            # Yearly Total Rankings
-            year_rankings = {}
+        # Yearly Total Rankings
+        rankings_df = self.join_rank_lookup(seasonRankingLookupData, seasonRankingData, ['year'], ['year'])
+        rankings_df.fillna(value=0, inplace=True)
 
-            qualified_rank = row['qualified_rank']
-            matchingdata = seasonRankingData[seasonRankingData.year == year]
-            # If there are zero or multiple matching records, do not attempt
-            if len(matchingdata) != 1:
-                continue
-            year_rankings = matchingdata.head(1)
+        return rankings_df
 
-            year_rankings['is_qualified'] = not pd.isnull(qualified_rank) and not pd.isna(qualified_rank)
+    # Attach ranking rows to the lookup rows with a single merge. Lookup rows without exactly one matching ranking are
+    # dropped and is_qualified tells whether the lookup has a qualified rank.
+    def join_rank_lookup(self, lookupData, rankingData, lookup_keys, ranking_keys):
+        if (lookupData.empty or rankingData.empty):
+            return pd.DataFrame()
 
-            rankings_df = rankings_df.append(year_rankings,ignore_index=True)                
+        counts = rankingData.groupby(ranking_keys)[ranking_keys[0]].transform('size')
+        lookup = lookupData[lookup_keys + ['qualified_rank']].rename(columns={'qualified_rank': 'lookup_qualified_rank'})
 
-        rankings_df.fillna(value=0, inplace=True)
+        rankings = pd.merge(lookup, rankingData[counts == 1], how='inner', left_on=lookup_keys, right_on=ranking_keys)
+        rankings['is_qualified'] = rankings['lookup_qualified_rank'].notna()
 
-        return rankings_df
+        return rankings.drop(columns=[key for key in lookup_keys if key not in ranking_keys] + ['lookup_qualified_rank'])
     
         # Build rank model for this year and position
     def build_hitter_year_model(self, year_data):
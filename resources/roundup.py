@@ -3,13 +3,13 @@ from statistics import mode
 from flask import current_app
 from flask_restful import Resource
 from sqlalchemy import false, true
-from helpers import fetch_dataframe, date_validate, var_dump
+from helpers import fetch_dataframe, date_validate, get_sportradar_player_lookup, var_dump, fetch_sportradar, fetch_sportradar_many, find_mlb_player_id, CLOSED_STATUSES
 import json as json
 from datetime import date, datetime
 from webargs import fields, validate
 from webargs.flaskparser import use_kwargs, parser, abort
 import os # For retrieving credentials
-import http.client # For Sport Radar API
+import hashlib
 from cache import cache_timeout, cache_invalidate_hour
 
 ##
@@ -61,7 +61,7 @@ class Roundup(Resource):
         return results
     
     def fetch_data(self, player_type, input_date, mode):
-        endpoints = SportRadarEndpoints()
+        endpoints = SportRadarEndpoints(self.bypass_cache)
 
         # Parse Date
         year = input_date.strftime('%Y') 
@@ -78,6 +78,22 @@ class Roundup(Resource):
         if player_type == 'pitcher':
             # Caching wrapper for fetch_data
             games = []
+            # Download the play-by-play feeds of every started game that is not fully cached at once
+            cached_games = dict()
+            if(self.bypass_cache == False):
+                for row in daily_games:
+                    game = row['game']
+                    for team in ['home', 'away']:
+                        cache_key = self.BuildCacheKey(game['id'], game[team]['id'], player_type)
+                        cached_games[cache_key] = current_app.cache.get(cache_key)
+            play_by_play_ids = []
+            for row in daily_games:
+                game = row['game']
+                started = ('outcome' in game and game['outcome']['current_inning'] > 0) or game.get('final') is not None
+                cached = [cached_games.get(self.BuildCacheKey(game['id'], game[team]['id'], player_type)) for team in ['home', 'away']]
+                if started and None in cached:
+                    play_by_play_ids.append(game['id'])
+            play_by_play = endpoints.play_by_play_endpoints(play_by_play_ids)
             # Iterrate through games
             for row in daily_games: #[:3]:
                 game = row['game']
@@ -90,11 +106,11 @@ class Roundup(Resource):
                 away_pitcher_cache_key = self.BuildCacheKey(game_id, away_team['id'], player_type)      
                 # If cache is not bypassed, see if both results are available in the cache 
                 if(self.bypass_cache == False):
-                    home_pitcher_cache_result = current_app.cache.get(home_pitcher_cache_key)
+                    home_pitcher_cache_result = cached_games.get(home_pitcher_cache_key)
                     if home_pitcher_cache_result is not None:
                         games.append(home_pitcher_cache_result)
                         needs_home_data = False
-                    away_pitcher_cache_result = current_app.cache.get(away_pitcher_cache_key)
+                    away_pitcher_cache_result = cached_games.get(away_pitcher_cache_key)
                     if away_pitcher_cache_result is not None:
                         games.append(away_pitcher_cache_result)
                         needs_away_data = False
@@ -156,20 +172,24 @@ class Roundup(Resource):
                 # Game has started. Get details
                 if ('outcome' in game and game['outcome']['current_inning'] > 0) or final is not None:
                     # Gather hit play-by-play endpoint, build model, set cache and return data
-                    play_by_play_data = endpoints.play_by_play_endpoint(game_id)
+                    # Index the pitches once for both starters
+                    pitch_index = self.GetPitchIndex(game_id, play_by_play[game_id], final)
+                    # Only cache models built from a play-by-play that is closed too, the summary can report the
+                    # game final before the feed has its last pitches
+                    closed = play_by_play[game_id]['game'].get('status') in CLOSED_STATUSES
                     if(needs_home_data):
-                        home_pitcher_model = self.BuildInProgressGame("HOME", home_team, away_team, game_model, play_by_play_data)
+                        home_pitcher_model = self.BuildInProgressGame("HOME", home_team, away_team, game_model, pitch_index)
                         games.append(home_pitcher_model)
                         # The game is over, cache the results
                         # Waiting till the game is over to figure out W/L/ND
-                        if final is not None:
+                        if final is not None and closed:
                             current_app.cache.set(home_pitcher_cache_key, home_pitcher_model, cache_timeout(cache_invalidate_hour()))
                     if(needs_away_data):
-                        away_pitcher_model = self.BuildInProgressGame("AWAY", away_team, home_team, game_model, play_by_play_data)
+                        away_pitcher_model = self.BuildInProgressGame("AWAY", away_team, home_team, game_model, pitch_index)
                         games.append(away_pitcher_model)
                         # The game is over, cache the results
                         # Waiting till the game is over to figure out W/L/ND
-                        if final is not None:
+                        if final is not None and closed:
                             current_app.cache.set(away_pitcher_cache_key, away_pitcher_model, cache_timeout(cache_invalidate_hour()))
             result = {'date': input_date.strftime("%a %m/%d/%Y"), 'games': games}
             return result
@@ -262,36 +282,123 @@ class Roundup(Resource):
     
         return model
 
-    def BuildInProgressGame(self, home_away, team, opponent, game_model, play_by_play_data):
+    # Pitches of a game by pitcher id. With ROUNDUP_INCREMENTAL_PBP the index of an in progress game is kept in the
+    # cache and every refresh only indexes the events added since the last one.
+    def GetPitchIndex(self, game_id, play_by_play_data, final):
+        if (not current_app.config.get('ROUNDUP_INCREMENTAL_PBP')):
+            return self.IndexPlayByPlay(play_by_play_data)['pitches']
+
+        cache_key = self.BuildCacheKey(game_id, 'play-by-play', 'index')
+        # Final games are cached as pitcher models, build those from a full pass and drop the index
+        if final is not None:
+            current_app.cache.delete(cache_key)
+            return self.IndexPlayByPlay(play_by_play_data)['pitches']
+
+        state = None if self.bypass_cache else current_app.cache.get(cache_key)
+        state = self.IndexPlayByPlay(play_by_play_data, state)
+        cached_state = {key: value for key, value in state.items() if key != 'pitches'}
+        current_app.cache.set(cache_key, cached_state, cache_timeout(cache_invalidate_hour()))
+        return state['pitches']
+
+    # Partition every pitch of a play-by-play document by pitcher id in one pass.
+    # Pitches keep their order and get inning, half and (on the last pitch of an at bat) the at bat description.
+    # Passing the state returned for an earlier copy of the same feed resumes from the last at bat it indexed: that
+    # at bat can still get pitches or be updated, so it (and everything after it) is indexed again on every call. The
+    # event before it is kept as a hash, if it changed or moved (SportRadar revised the feed) the game is indexed
+    # from the start.
+    def IndexPlayByPlay(self, play_by_play_data, state=None):
+        innings = play_by_play_data['game']['innings']
+        if state is None or not self.PlayByPlayStateValid(innings, state):
+            state = {'cursor': [0, 0, 0], 'sealed': None, 'sealed_pitches': {}}
+
+        events = list(self.PlayByPlayEvents(innings, state['cursor']))
+        at_bats = [n for n, (position, inning, half, e) in enumerate(events) if list(e.keys())[0] == 'at_bat']
+        open_from = at_bats[-1] if at_bats else max(len(events) - 1, 0)
+
+        sealed_pitches = self.CopyPitchIndex(state['sealed_pitches'])
+        for position, inning, half, e in events[:open_from]:
+            self.IndexPlayByPlayEvent(sealed_pitches, inning, half, e)
+        pitch_index = self.CopyPitchIndex(sealed_pitches)
+        for position, inning, half, e in events[open_from:]:
+            self.IndexPlayByPlayEvent(pitch_index, inning, half, e)
+
+        sealed = state['sealed']
+        if open_from > 0:
+            position, inning, half, e = events[open_from - 1]
+            sealed = position + [self.HashPlayByPlayEvent(e)]
+        cursor = events[open_from][0] if events else state['cursor']
+
+        return {'cursor': cursor, 'sealed': sealed, 'sealed_pitches': sealed_pitches, 'pitches': pitch_index}
+
+    # (position, inning, half, event) of every event of the feed from position [inning, half, event] on
+    def PlayByPlayEvents(self, innings, start):
+        for i in range(start[0], len(innings)):
+            halfs = innings[i]['halfs']
+            for j in range(start[1] if i == start[0] else 0, len(halfs)):
+                events = halfs[j]['events']
+                for k in range(start[2] if [i, j] == start[:2] else 0, len(events)):
+                    yield [i, j, k], innings[i], halfs[j], events[k]
+
+    def IndexPlayByPlayEvent(self, pitch_index, inning, half, e):
+        if list(e.keys())[0] != 'at_bat' or inning['number'] <= 0:
+            return
+        atBat = e['at_bat']
+        for atBatEvent in atBat['events']:
+            if atBatEvent.get('type') == 'pitch':
+                pitcher_id = atBatEvent.get('pitcher').get('id')
+                if pitcher_id not in pitch_index:
+                    pitch_index[pitcher_id] = {'pitches': [], 'called_strikes': 0, 'whiffs': 0}
+                pitcher_pitches = pitch_index[pitcher_id]
+                # Annotate a copy, the feed itself is hashed to detect revisions
+                pitch = dict(atBatEvent)
+                pitch['inning'] = inning['number']
+                pitch['inning-half'] = half['half']
+                if(atBatEvent.get('flags').get('is_ab_over')):
+                    if 'description' in atBat:
+                        pitch['at-bat-description'] = atBat['description']
+                pitcher_pitches['pitches'].append(pitch)
+                pitchoutcome = pitch.get("outcome_id", "")
+                if "KL" in pitchoutcome:
+                    pitcher_pitches['called_strikes'] += 1
+                if "KS" in pitchoutcome or pitchoutcome == "kFT" :
+                    pitcher_pitches['whiffs'] += 1
+
+    def CopyPitchIndex(self, pitch_index):
+        return {pitcher_id: dict(pitches, pitches=list(pitches['pitches'])) for pitcher_id, pitches in pitch_index.items()}
+
+    def HashPlayByPlayEvent(self, e):
+        return hashlib.md5(json.dumps(e, sort_keys=True).encode('utf-8')).hexdigest()
+
+    # Whether the last event a state sealed is still in the feed, unchanged
+    def PlayByPlayStateValid(self, innings, state):
+        if state['sealed'] is None:
+            return True
+        i, j, k, event_hash = state['sealed']
+        try:
+            return self.HashPlayByPlayEvent(innings[i]['halfs'][j]['events'][k]) == event_hash
+        except (IndexError, KeyError):
+            return False
+
+    # Called strikes and whiffs (swinging strikes and foul tips) of a list of pitches
+    def CountPitchOutcomes(self, pitches):
+        calledstrikes = 0
+        whiffs = 0
+        for pitch in pitches:
+            pitchoutcome = pitch.get("outcome_id", "")
+            if "KL" in pitchoutcome:
+                calledstrikes = calledstrikes + 1
+            if "KS" in pitchoutcome or pitchoutcome == "kFT" :
+                whiffs = whiffs + 1
+        return calledstrikes, whiffs
+
+    def BuildInProgressGame(self, home_away, team, opponent, game_model, pitch_index):
         pitcher = team['starting_pitcher']
         
         game_stats = None
         if 'pitching' in team['statistics']:
             game_stats = team['statistics']['pitching']['starters']
 
-        innings = play_by_play_data['game']['innings']
-    
-        pitches = []
-        for inning in innings:
-            if inning['number'] > 0:
-                for half in inning['halfs']:
-                    h = half['half']
-                    for e in half['events']:
-                        if list(e.keys())[0] == 'at_bat':
-                            atBat = e['at_bat']
-                            if len(atBat['events']) != 0:
-                                l = len(atBat['events'])
-                                for atBatEvent in atBat['events']:
-                                    if "type" in atBatEvent.keys():
-                                        if atBatEvent['type'] == 'pitch':
-                                            if(atBatEvent.get('pitcher').get('id') == pitcher['id']):
-                                                pitch = atBatEvent
-                                                pitch['inning'] = inning['number']
-                                                pitch['inning-half'] = h
-                                                if(atBatEvent.get('flags').get('is_ab_over')):
-                                                    if 'description' in atBat:
-                                                        pitch['at-bat-description'] = atBat['description']   
-                                                pitches.append(pitch)                                                                             
+        pitcher_pitches = pitch_index.get(pitcher['id'], {'pitches': [], 'called_strikes': 0, 'whiffs': 0})
 
         still_in_game = True
         lineups = team['lineup']
@@ -313,7 +420,9 @@ class Roundup(Resource):
             # New Data
             'pitcher': pitcher,   
             'game': game_model,
-            'pitches': pitches,
+            'pitches': pitcher_pitches['pitches'],
+            'called_strikes': pitcher_pitches['called_strikes'],
+            'whiffs': pitcher_pitches['whiffs'],
             'gamestarted': True
         }
     
@@ -404,15 +513,11 @@ class Roundup(Resource):
                                 else:
                                     pitcher['decision'] = "ND"
                                 # Pitch Related Data
-                                pitches = game["pitches"]
-                                calledstrikes = 0
-                                whiffs = 0
-                                for pitch in pitches:
-                                    pitchoutcome = pitch["outcome_id"]
-                                    if "KL" in pitchoutcome:
-                                        calledstrikes = calledstrikes + 1
-                                    if "KS" in pitchoutcome or pitchoutcome == "kFT" :
-                                        whiffs = whiffs + 1
+                                # Counted by IndexPlayByPlay, models cached before it was added only have the pitches
+                                if 'whiffs' in game:
+                                    calledstrikes, whiffs = game["called_strikes"], game["whiffs"]
+                                else:
+                                    calledstrikes, whiffs = self.CountPitchOutcomes(game["pitches"])
                                 # Pitcher stats object
                                 pitcher["stats"] = {
                                     "ip": gamestats["ip_2"],
@@ -495,24 +600,20 @@ class Roundup(Resource):
 
     # Look up table for mapping an MLB player ID from a SR player ID
     def sportradar_mlb_player_dictionary(self):
-            # Execute Query
-            query = "select sportradar_player_id, mlb_player_id from players"
-            df = fetch_dataframe(query)
-
-            # Convert to look up table (dictionary)
-            df.set_index('sportradar_player_id', inplace=True)
-            df = df.to_dict()['mlb_player_id']
-            df = {x:y for x,y in df.items()}
-
-            return df
+            # Built once per players dimension snapshot, see helpers/dimensions.py
+            return get_sportradar_player_lookup()
     # Look up an MLB player ID from a SR player ID
     def find_mlb_player_id(self, player_mlb_ids, sport_radar_player_id):
         player_id = None
         if sport_radar_player_id in player_mlb_ids:
             player_id = player_mlb_ids[sport_radar_player_id]
+        elif sport_radar_player_id is not None:
+            # Not in the players snapshot yet (e.g. a new call up), look the single player up
+            player_id = find_mlb_player_id(sport_radar_player_id)
         return player_id
 class SportRadarEndpoints:
-    def __init__(self):
+    def __init__(self, bypass_cache=False):
+       self.bypass_cache = bypass_cache
        self.access_level = 'tracking'
        self.version = 'v7'
        self.file_format = 'json'
@@ -527,17 +628,11 @@ class SportRadarEndpoints:
         endpoint = sport radar endpoint api (string)
         
         outputs
-        json of endpoint data
+        dictionary of endpoint data
         """ 
 
-        # Connect to Sport Radar API and retrieve data
-        conn = http.client.HTTPSConnection("api.sportradar.us")   
-        conn.request("GET", endpoint)
-        res = conn.getresponse()
-        data = res.read()
-        data = data.decode("utf-8")
-
-        return data
+        # Retrieve data over the worker's pooled Sport Radar connections, see helpers/sportradar.py
+        return fetch_sportradar(endpoint, self.bypass_cache)
 
     def daily_summary_endpoint(self, year=None,month=None,day=None):
 
@@ -566,33 +661,24 @@ class SportRadarEndpoints:
 
         # Connect to Sport Radar API and retrieve data
         data = self.retrieve_sport_radar_data(endpoint)
-        
-        # Convert json data to python dictionary
-        data = json.loads(data) 
 
         return data
 
-    def play_by_play_endpoint(self, game_id):
+    def play_by_play_endpoints(self, game_ids):
 
         """
-        Detailed real-time information on every pitch and game event.
+        Play-by-play data of several games, retrieved concurrently.
 
         inputs
-        game_id = sport radar game id
+        game_ids = list of sport radar game ids
 
         outputs
-        dictionary of endpoint data
+        dictionary of endpoint data by game id
         """ 
 
-        # Build endpoint
-        endpoint = f'/mlb/{self.access_level}/{self.version}/en/games/{game_id}/pbp.{self.file_format}?api_key={self.api_key}'
-
-        # Connect to Sport Radar API and retrieve data
-        data = self.retrieve_sport_radar_data(endpoint)
-        
-        # Convert json data to python dictionary
-        data = json.loads(data) 
+        endpoints = {game_id: self.play_by_play_path(game_id) for game_id in game_ids}
 
-        return data
+        return fetch_sportradar_many(endpoints, self.bypass_cache)
 
-    
+    def play_by_play_path(self, game_id):
+        return f'/mlb/{self.access_level}/{self.version}/en/games/{game_id}/pbp.{self.file_format}?api_key={self.api_key}'
@@ -2,7 +2,7 @@ from flask import current_app
 from flask_restful import Resource
 from numpy.core.records import record
 from helpers import fetch_dataframe, var_dump
-from cache import cache_timeout, cache_invalidate_hour
+from cache import cache_timeout, cache_invalidate_hour, cached_response, fetch_cached
 from datetime import date, datetime
 import json as json
 import pandas as pd
@@ -18,6 +18,7 @@ class Standings(Resource):
     def __init__(self):
         self.query_year = None
 
+    @cached_response()
     def get(self, query_type='NA', query_year='NA'):
         if (query_type == 'NA'):
             query_type = 'division'
@@ -40,10 +41,7 @@ class Standings(Resource):
                 cache_key_year = 'all'
 
             cache_key = f'{cache_key_resource_type}-{query_type}-{cache_key_year}'
-            result = current_app.cache.get(cache_key)
-            if (result is None):
-                result = self.fetch_data(query_type, query_year)
-                current_app.cache.set(cache_key, result,cache_timeout(cache_invalidate_hour()))
+            result = fetch_cached(cache_key, lambda: self.fetch_data(query_type, query_year), cache_timeout(cache_invalidate_hour()))
 
         return result
 
@@ -1,7 +1,7 @@
 from flask import current_app
 from flask_restful import Resource
 from helpers import fetch_dataframe, var_dump
-from cache import cache_timeout, cache_invalidate_hour
+from cache import cache_timeout, cache_invalidate_hour, cached_response, fetch_cached
 import json as json
 import pandas as pd
 
@@ -16,6 +16,7 @@ class Team(Resource):
     def __init__(self):
         self.team_id = 'NA'
 
+    @cached_response()
     def get(self, query_type='NA', team_id='NA'):
         if (type(team_id) is int):
             self.team_id = int(team_id)
@@ -37,10 +38,7 @@ class Team(Resource):
                 cache_key_team_id = 'all'
 
             cache_key = f'{cache_key_resource_type}-{query_type}-{cache_key_team_id}'
-            result = current_app.cache.get(cache_key)
-            if (result is None):
-                result = self.fetch_data(query_type, team_id)
-                current_app.cache.set(cache_key, result,cache_timeout(cache_invalidate_hour()))
+            result = fetch_cached(cache_key, lambda: self.fetch_data(query_type, team_id), cache_timeout(cache_invalidate_hour()))
 
         return result
 
@@ -1,5 +1,6 @@
 from flask import current_app
 from flask_restful import Resource
+from helpers import get_pool_stats
 
 # Top level / Endpoint
 class Status(Resource):
@@ -10,4 +11,9 @@ class Status(Resource):
 class ClearCache(Resource):
     def get(self):
         current_app.cache.clear()
-        return {'status': "cache cleared"}
\ No newline at end of file
+        return {'status': "cache cleared"}
+
+# /Pool_Stats Endpoint
+class PoolStats(Resource):
+    def get(self):
+        return {'pools': get_pool_stats()}
\ No newline at end of file
@@ -1,8 +1,7 @@
 from flask import current_app
 from leaderboard import player, advanced, approach, discipline, batted, standard, overview
 from flask_restful import Resource
-import os
-import psycopg2
+from helpers import fetch_dataframe
 import logging
 import json as json
 import pandas as pd
@@ -11,17 +10,7 @@ import pandas as pd
 class Schedule(Resource):
     @current_app.cache.cached(timeout=300)
     def get(self, game_date):
-        pl_host = os.getenv('PL_DB_HOST')
-        pl_db = os.getenv('PL_DB_DATABASE_LEGACY', 'pitcher-list')
-        pl_user = os.getenv('PL_DB_USER')
-        pl_password = os.getenv('PL_DB_PW')
-        db_connection = psycopg2.connect(host=pl_host, port=5432, dbname=pl_db, user=pl_user, password=pl_password)
-        cursor = db_connection.cursor()
-        cursor.execute("SELECT * from schedule where game_date = %s", [game_date])
-        rows = cursor.fetchall()
-        colnames = [desc[0] for desc in cursor.description]
-        daily_schedule = pd.DataFrame(rows, columns = colnames)
-        db_connection.close()
+        daily_schedule = fetch_dataframe("SELECT * from schedule where game_date = %s", [game_date], True)
         json_response = json.loads(daily_schedule.to_json(orient='records', date_format = 'iso'))
         return(json_response)
 
@@ -1,7 +1,7 @@
 from flask import current_app
 from flask_restful import Resource
-from helpers import fetch_dataframe, get_team_info, weightedonbasepercentage, var_dump
-from cache import cache_timeout, cache_invalidate_hour
+from helpers import fetch_dataframe, validate_team, weightedonbasepercentage, var_dump
+from cache import cache_timeout, cache_invalidate_hour, fetch_cached
 from datetime import date, datetime
 from webargs import fields, validate
 from webargs.flaskparser import use_kwargs, parser, abort
@@ -11,15 +11,13 @@ import json as json
 # This is the flask_restful Resource Class for the Leaderboard API.
 ##
 class Leaderboard(Resource):
-    teams = get_team_info()
-    valid_teams = list(teams.keys())
     current_date = date.today()
     leaderboard_kwargs = {
         "handedness": fields.Str(required=False, missing="NA", validate=validate.OneOf(["R","L","NA"])),
         "opponent_handedness": fields.Str(required=False, missing="NA", validate=validate.OneOf(["R","L","NA"])),
         "league": fields.Str(required=False, missing="NA", validate=validate.OneOf(["AL","NL","NA"])),
         "division": fields.Str(required=False, missing="NA", validate=validate.OneOf(["East","Central","West","NA"])),
-        "team": fields.Str(required=False, missing="NA", validate=validate.OneOf(valid_teams)),
+        "team": fields.Str(required=False, missing="NA", validate=validate_team(allow_na=False)),
         "home_away": fields.Str(required=False, missing="NA", validate=validate.OneOf(["Home","Away","NA"])),
         "year": fields.Str(required=False, missing=current_date.year),
         "month": fields.Str(required=False, missing="NA", validate=validate.OneOf(["1","2","3","4","5","6","7","8","9","10","11","12","NA"])),
@@ -309,11 +307,7 @@ class Leaderboard(Resource):
             cache_key_version = 'v3'
 
             cache_key = f'{cache_key_resource_type}-{cache_key_version}-{query_type}-{cache_key_date}'
-            result = current_app.cache.get(cache_key)
-            if (result is None):
-                result = self.fetch_data(query_type, **query_args)
-                # Set Cache expiration to 5 mins
-                current_app.cache.set(cache_key, result, 300)
+            result = fetch_cached(cache_key, lambda: self.fetch_data(query_type, **query_args), 300)
 
         return result
 
@@ -417,7 +411,7 @@ class Leaderboard(Resource):
 
         def hitter():
             if (self.tab == 'overview'):
-                data['woba'] = data.apply(lambda row: round(weightedonbasepercentage(self.woba_year, row['num_ab'], row['num_bb'], row['num_ibb'], row['num_hbp'], row['num_sacrifice'], row['num_1b'],row['num_2b'], row['num_3b'], row['num_hr']), 3), axis=1)
+                data['woba'] = weightedonbasepercentage(self.woba_year, data['num_ab'], data['num_bb'], data['num_ibb'], data['num_hbp'], data['num_sacrifice'], data['num_1b'], data['num_2b'], data['num_3b'], data['num_hr']).round(3)
                 data.drop(['num_ab', 'num_bb', 'num_ibb', 'num_hbp', 'num_sacrifice', 'num_1b', 'num_2b', 'num_3b'], axis=1, inplace=True)
             return data
 
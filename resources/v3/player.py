@@ -1,7 +1,7 @@
 from flask import current_app
 from flask_restful import Resource
-from helpers import fetch_dataframe, var_dump
-from cache import cache_timeout, cache_invalidate_hour
+from helpers import fetch_dataframe, index_records, var_dump
+from cache import cache_timeout, cache_invalidate_hour, fetch_cached
 import json as json
 import pandas as pd
 
@@ -65,10 +65,7 @@ class Player(Resource):
                 cache_key_player_id = 'all'
 
             cache_key = f'{cache_key_resource_type}-{cache_key_version}-{query_type}-{cache_key_player_id}'
-            result = current_app.cache.get(cache_key)
-            if (result is None):
-                result = self.fetch_data(query_type, player_id)
-                current_app.cache.set(cache_key, result,cache_timeout(cache_invalidate_hour()))
+            result = fetch_cached(cache_key, lambda: self.fetch_data(query_type, player_id), cache_timeout(cache_invalidate_hour()))
 
         return result
 
@@ -798,8 +795,6 @@ class Player(Resource):
 
             output_dict = { 'player_id': player_id, 'is_pitcher': self.is_pitcher, 'is_active': self.is_active, 'logs': {} }
 
-            # Ensure we have valid data for NaN entries using json.dumps of Python None object
-            result_dict = json.loads(results.to_json(orient='index'))
             
             if (self.is_pitcher):
 
@@ -807,10 +802,7 @@ class Player(Resource):
                 # TODO: Add cols here that can safely be dropped as they are not used on the frontend.
                 #results.drop(columns=['start','sac','csw'], inplace=True)
 
-                for keys, value in result_dict.items():
-
-                    # json coversion returns tuple string
-                    key = eval(keys)
+                for key, value in index_records(results):
                     gameid_key = key[0]
                     if gameid_key not in output_dict['logs']:
                         output_dict['logs'][gameid_key] = { 'game': {
@@ -859,10 +851,7 @@ class Player(Resource):
                 return output_dict
 
             else:
-                for keys, value in result_dict.items():
-
-                    # json coversion returns tuple string
-                    key = eval(keys)
+                for key, value in index_records(results):
                     gameid_key = key[0]
                     if gameid_key not in output_dict['logs']:
                         output_dict['logs'][gameid_key] = { 'game': {
@@ -904,11 +893,8 @@ class Player(Resource):
         def locationlogs():
             output_dict = { 'player_id': player_id, 'is_pitcher': self.is_pitcher, 'is_active': self.is_active, 'logs': {} }
             results.fillna(value=0, inplace=True)
-            result_dict = json.loads(results.to_json(orient='index'))
             
-            for keys, value in result_dict.items():
-                # json coversion returns tuple string
-                key = eval(keys)
+            for key, value in index_records(results):
                 gameid_key = key[0]
                 if gameid_key not in output_dict['logs']:
                     output_dict['logs'][gameid_key] = {'pitches':{}}
@@ -928,16 +914,12 @@ class Player(Resource):
             # Ensure we have valid data for NaN entries using json.dumps of Python None object
             results.fillna(value=json.dumps(None), inplace=True)
 
-            result_dict = json.loads(results.to_json(orient='index'))
-
             if (self.is_pitcher):
                 # Sort our DataFrame so we have a prettier JSON format for the API
                 output_dict = { 'player_id': player_id, 'is_pitcher': self.is_pitcher, 'is_active': self.is_active, query_type: {'pitches':{}} }
 
                 # Make sure our index keys exist in our dict structure then push on our data values
-                for keys, value in result_dict.items():
-                    # json coversion returns tuple string
-                    key = eval(keys)
+                for key, value in index_records(results):
                     pitch_key = key[0].upper()
 
                     if pitch_key not in output_dict[query_type]['pitches']:
@@ -959,9 +941,7 @@ class Player(Resource):
                 output_dict = { 'player_id': player_id, 'is_pitcher': self.is_pitcher, 'is_active': self.is_active, query_type: {'years':{}} }
 
                 # Make sure our index keys exist in our dict structure then push on our data values
-                for keys, value in result_dict.items():
-                    # json coversion returns tuple string
-                    key = eval(keys)
+                for key, value in index_records(results):
 
                     year_key = key[0]
                     stats = { 'total': self.career_stats[year_key], 'splits':{} }
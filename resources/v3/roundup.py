@@ -1,6 +1,7 @@
 from flask import current_app
 from flask_restful import Resource
 from helpers import fetch_dataframe, date_validate, var_dump
+from cache import fetch_cached
 import json as json
 
 ##
@@ -55,11 +56,7 @@ class Roundup(Resource):
             cache_key_version = 'v3'
 
             cache_key = f'{cache_key_resource_type}-{cache_key_version}-{player_type}-{day}'
-            result = current_app.cache.get(cache_key)
-            if (result is None):
-                result = self.fetch_data(player_type, day)
-                # Set expiration for cache to 5 mins.
-                current_app.cache.set(cache_key, result, 300)
+            result = fetch_cached(cache_key, lambda: self.fetch_data(player_type, day), 300)
 
         return result
 